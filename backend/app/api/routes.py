@@ -14,8 +14,11 @@ from app.models.settings import AppSettings, SettingsUpdate
 from app.services.bot_engine import bot_engine
 from app.services.staking import staking_service
 from app.services.settings_manager import settings_manager
-from app.services.google_sheets import google_sheets_client
+from app.services.google_sheets import async_google_sheets_client
 from app.services.betfair_client import betfair_client
+from app.services.market_frame import MarketBookFrame
+from app.services.odds_history import odds_recorder, records_to_dicts
+from app.services.tick_ladder import snap_price
 from app.services.auth import authenticate, get_current_user
 
 router = APIRouter()
@@ -53,51 +56,58 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
 
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Metrici în format Prometheus: latența și weight-ul request-urilor
+    Betfair per endpoint, durata apelurilor Google Sheets și a fazelor bot-ului.
+    """
+    from fastapi.responses import PlainTextResponse
+    from app.services.metrics import metrics
+
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @router.get("/stats", response_model=DashboardStats)
 async def get_dashboard_stats():
     """Returnează statisticile pentru dashboard."""
-    return bot_engine.get_dashboard_stats()
+    return await bot_engine.get_dashboard_stats()
 
 
 @router.get("/stats/history")
 async def get_stats_history(days: int = 30):
     """
     Returnează istoricul statisticilor pentru grafice.
-    Doar citește date - nu modifică nimic.
+    Doar citește date - nu modifică nimic. Rezultatul e servit din cache-ul
+    de citiri Google Sheets (invalidat la fiecare scriere).
     """
-    from app.services.google_sheets import google_sheets_client
+    from app.config import get_settings
+    from app.services.google_sheets import async_google_sheets_client
     from collections import defaultdict
 
-    cache_key = f"stats_history_{days}"
-    cached = google_sheets_client._get_cached(cache_key)
-    if cached is not None:
-        return cached
-
-    daily_data = defaultdict(lambda: {"profit": 0.0, "won": 0, "lost": 0, "pending": 0, "staked": 0.0})
-    team_profits = []
+    async def load():
+        daily_data = defaultdict(lambda: {"profit": 0.0, "won": 0, "lost": 0, "pending": 0, "staked": 0.0})
+        team_profits = []
 
-    try:
-        if not google_sheets_client.is_connected():
-            google_sheets_client.connect()
+        if not async_google_sheets_client.is_connected():
+            await async_google_sheets_client.connect()
 
-        if not google_sheets_client.is_connected():
-            return {"daily": [], "team_profits": []}
+        if not async_google_sheets_client.is_ready():
+            return None
 
-        teams_data = google_sheets_client.load_teams()
+        teams_data = await async_google_sheets_client.load_teams()
 
-        for team_data in teams_data:
-            team_name = team_data.get("name", "")
-            if not team_name:
-                continue
+        # Toate sheet-urile echipelor într-o singură citire
+        records_by_team = await async_google_sheets_client.load_team_records(
+            [t.get("name", "") for t in teams_data if t.get("name")]
+        )
 
+        for team_name, all_records in records_by_team.items():
             team_profit = 0.0
             team_won = 0
             team_lost = 0
 
             try:
-                sheet = google_sheets_client._spreadsheet.worksheet(team_name)
-                all_records = sheet.get_all_records()
-
                 for match in all_records:
                     status = str(match.get("Status", "")).strip().upper()
                     date_str = str(match.get("Data", ""))[:10]  # YYYY-MM-DD
@@ -155,16 +165,18 @@ async def get_stats_history(days: int = 30):
 
         team_profits_sorted = sorted(team_profits, key=lambda x: x["profit"], reverse=True)
 
-        result = {
+        return {
             "daily": daily_sorted,
             "team_profits": team_profits_sorted
         }
 
-        google_sheets_client._set_cached(cache_key, result)
-        return result
-
+    try:
+        result = await async_google_sheets_client.cached(
+            f"stats_history_{days}", load, ttl=get_settings().stats_history_cache_ttl_seconds
+        )
     except Exception as e:
         return {"daily": [], "team_profits": [], "error": str(e)}
+    return result if result is not None else {"daily": [], "team_profits": []}
 
 
 @router.get("/bot/state", response_model=BotState)
@@ -236,6 +248,7 @@ async def search_teams_betfair(q: str = ""):
 
         teams_dict = {}
 
+        event_ids = []
         for event in events[:20]:
             event_data = event.get("event", {})
             event_id = event_data.get("id", "")
@@ -244,32 +257,32 @@ async def search_teams_betfair(q: str = ""):
             if any(kw in event_name for kw in skip_keywords):
                 continue
 
-            if not event_id:
-                continue
+            if event_id:
+                event_ids.append(event_id)
 
-            try:
-                markets = await betfair_client.list_market_catalogue(
-                    event_ids=[event_id],
-                    market_type_codes=["MATCH_ODDS"]
-                )
-
-                if markets:
-                    market = markets[0]
-                    runners = market.get("runners", [])
+        # Un singur listMarketCatalogue pentru toate evenimentele găsite
+        markets = await betfair_client.list_market_catalogue(
+            event_ids=event_ids,
+            market_type_codes=["MATCH_ODDS"]
+        )
+        market_by_event = {}
+        for market in markets:
+            market_by_event.setdefault(market.get("event", {}).get("id", ""), market)
 
-                    for runner in runners:
-                        runner_name = runner.get("runnerName", "")
-                        selection_id = str(runner.get("selectionId", ""))
+        for event_id in event_ids:
+            market = market_by_event.get(event_id)
+            if not market:
+                continue
 
-                        if any(kw in runner_name for kw in skip_keywords):
-                            continue
+            for runner in market.get("runners", []):
+                runner_name = runner.get("runnerName", "")
+                selection_id = str(runner.get("selectionId", ""))
 
-                        if q.lower() in runner_name.lower() and runner_name not in teams_dict:
-                            teams_dict[runner_name] = selection_id
+                if any(kw in runner_name for kw in skip_keywords):
+                    continue
 
-            except Exception as e:
-                logger.warning(f"Eroare la preluarea runners pentru {event_name}: {e}")
-                continue
+                if q.lower() in runner_name.lower() and runner_name not in teams_dict:
+                    teams_dict[runner_name] = selection_id
 
         results = sorted(
             [{"name": name, "selectionId": sel_id} for name, sel_id in teams_dict.items()],
@@ -289,7 +302,7 @@ async def get_teams(active_only: bool = False):
     """Returnează lista de echipe."""
     if active_only:
         return bot_engine.get_active_teams()
-    return bot_engine.get_all_teams()
+    return await bot_engine.get_all_teams()
 
 
 @router.get("/teams/{team_id}", response_model=Team)
@@ -307,7 +320,7 @@ async def get_team(team_id: str):
 @router.post("/teams", response_model=Team, status_code=status.HTTP_201_CREATED)
 async def create_team(team_create: TeamCreate):
     """Creează o echipă nouă și preia următoarele 20 de meciuri."""
-    from app.services.google_sheets import google_sheets_client
+    from app.services.google_sheets import async_google_sheets_client
     from app.services.betfair_client import betfair_client
     from app.config import get_settings
     import logging
@@ -335,17 +348,17 @@ async def create_team(team_create: TeamCreate):
     result = bot_engine.add_team(team)
 
     # Save to Google Sheets and fetch matches
-    if not google_sheets_client.is_connected():
-        google_sheets_client.connect()
+    if not async_google_sheets_client.is_connected():
+        await async_google_sheets_client.connect()
 
-    if google_sheets_client.is_connected():
+    if async_google_sheets_client.is_connected():
         # Save team to Index sheet and create team sheet
         team_data = team.model_dump()
         team_data["initial_stake"] = initial_stake
         # Convert datetime to string for JSON serialization
         team_data["created_at"] = team_data["created_at"].isoformat() if team_data.get("created_at") else ""
         team_data["updated_at"] = team_data["updated_at"].isoformat() if team_data.get("updated_at") else ""
-        google_sheets_client.save_team(team_data)
+        await async_google_sheets_client.save_team(team_data)
 
         # Fetch next 20 matches from Betfair with odds
         try:
@@ -360,85 +373,85 @@ async def create_team(team_create: TeamCreate):
                     text_query=team.name
                 )
 
-                matches = []
+                # Skip reserve/youth teams
+                skip_keywords = ["(Res)", "U19", "U20", "U21", "U23", "Women", "Feminin", "II", "B)", "(W)"]
+                candidate_events = []
                 for event in events[:20]:
+                    event_name = event.get("event", {}).get("name", "")
+                    if any(kw in event_name for kw in skip_keywords):
+                        logger.info(f"Skip echipă rezerve/tineret: {event_name}")
+                        continue
+                    candidate_events.append(event)
+
+                # Un singur listMarketCatalogue + listMarketBook pentru toate evenimentele
+                event_ids = [e.get("event", {}).get("id", "") for e in candidate_events]
+                markets = await betfair_client.list_market_catalogue(
+                    event_ids=[eid for eid in event_ids if eid],
+                    market_type_codes=["MATCH_ODDS"]
+                )
+                market_by_event = {}
+                for market in markets:
+                    market_by_event.setdefault(market.get("event", {}).get("id", ""), market)
+
+                market_ids = [m.get("marketId") for m in market_by_event.values() if m.get("marketId")]
+                frame = MarketBookFrame.from_books(await betfair_client.list_market_book(market_ids))
+
+                # Runner-ul echipei noastre în fiecare piață: după betfair_id (selectionId)
+                # dacă îl avem, altfel după nume exact; cotele sunt citite apoi toate odată din frame
+                betfair_id = team.betfair_id
+                team_selections = {}
+                for market in market_by_event.values():
+                    for mr in market.get("runners", []):
+                        runner_name = mr.get("runnerName", "")
+                        runner_sel_id = str(mr.get("selectionId", ""))
+
+                        if betfair_id and runner_sel_id == betfair_id:
+                            team_selections[market.get("marketId")] = mr.get("selectionId")
+                            logger.info(f"Găsit runner după betfair_id: {runner_name} (ID: {runner_sel_id})")
+                            break
+                        elif not betfair_id and team.name.lower() == runner_name.lower():
+                            team_selections[market.get("marketId")] = mr.get("selectionId")
+                            logger.info(f"Găsit runner după nume: {runner_name}")
+                            break
+                team_odds = frame.back_prices(team_selections)
+
+                matches = []
+                for event in candidate_events:
                     event_data = event.get("event", {})
                     event_id = event_data.get("id", "")
                     event_name = event_data.get("name", "")
                     competition = event.get("competitionName", "")
 
-                    # Skip reserve/youth teams
-                    skip_keywords = ["(Res)", "U19", "U20", "U21", "U23", "Women", "Feminin", "II", "B)", "(W)"]
-                    if any(kw in event_name for kw in skip_keywords):
-                        logger.info(f"Skip echipă rezerve/tineret: {event_name}")
-                        continue
-
                     # Get odds and start time from market catalogue
                     odds = ""
                     market_start_time = ""
-                    if event_id:
+                    market = market_by_event.get(event_id) if event_id else None
+                    if market:
                         try:
-                            markets = await betfair_client.list_market_catalogue(
-                                event_ids=[event_id],
-                                market_type_codes=["MATCH_ODDS"]
-                            )
-                            if markets:
-                                market = markets[0]
-                                market_id = market.get("marketId", "")
-                                market_start_time_utc = market.get("marketStartTime", "")
-
-                                # Convert UTC to Europe/Bucharest
-                                if market_start_time_utc:
-                                    try:
-                                        from datetime import datetime as dt
-                                        import pytz
-                                        utc_time = dt.fromisoformat(market_start_time_utc.replace("Z", "+00:00"))
-                                        bucharest_tz = pytz.timezone("Europe/Bucharest")
-                                        local_time = utc_time.astimezone(bucharest_tz)
-                                        market_start_time = local_time.strftime("%Y-%m-%dT%H:%M")
-                                    except:
-                                        market_start_time = market_start_time_utc
-                                else:
-                                    market_start_time = ""
-
-                                if market_id:
-                                    # Get runner prices
-                                    prices = await betfair_client.list_market_book([market_id])
-                                    if prices and prices[0].get("runners"):
-                                        price_runners = prices[0].get("runners", [])
-                                        market_runners = market.get("runners", [])
-
-                                        # Găsim runner-ul echipei noastre
-                                        # Dacă avem betfair_id (selectionId), căutăm după el
-                                        # Altfel, căutăm după nume exact
-                                        team_selection_id = None
-                                        betfair_id = team.betfair_id
-
-                                        for mr in market_runners:
-                                            runner_name = mr.get("runnerName", "")
-                                            runner_sel_id = str(mr.get("selectionId", ""))
-
-                                            if betfair_id and runner_sel_id == betfair_id:
-                                                team_selection_id = mr.get("selectionId")
-                                                logger.info(f"Găsit runner după betfair_id: {runner_name} (ID: {runner_sel_id})")
-                                                break
-                                            elif not betfair_id and team.name.lower() == runner_name.lower():
-                                                team_selection_id = mr.get("selectionId")
-                                                logger.info(f"Găsit runner după nume: {runner_name}")
-                                                break
-
-                                        # IMPORTANT: Skip meciul dacă echipa noastră NU e găsită
-                                        if not team_selection_id:
-                                            logger.info(f"Skip {event_name} - echipa {team.name} nu e găsită în runners: {[mr.get('runnerName') for mr in market_runners]}")
-                                            continue
-
-                                        # Luăm cota pentru echipa noastră
-                                        for pr in price_runners:
-                                            if pr.get("selectionId") == team_selection_id:
-                                                back_prices = pr.get("ex", {}).get("availableToBack", [])
-                                                if back_prices:
-                                                    odds = back_prices[0].get("price", "")
-                                                break
+                            market_id = market.get("marketId", "")
+                            market_start_time_utc = market.get("marketStartTime", "")
+
+                            # Convert UTC to Europe/Bucharest
+                            if market_start_time_utc:
+                                try:
+                                    from datetime import datetime as dt
+                                    import pytz
+                                    utc_time = dt.fromisoformat(market_start_time_utc.replace("Z", "+00:00"))
+                                    bucharest_tz = pytz.timezone("Europe/Bucharest")
+                                    local_time = utc_time.astimezone(bucharest_tz)
+                                    market_start_time = local_time.strftime("%Y-%m-%dT%H:%M")
+                                except:
+                                    market_start_time = market_start_time_utc
+
+                            if market_id in frame:
+                                # IMPORTANT: Skip meciul dacă echipa noastră NU e găsită
+                                if not team_selections.get(market_id):
+                                    logger.info(f"Skip {event_name} - echipa {team.name} nu e găsită în runners: {[mr.get('runnerName') for mr in market.get('runners', [])]}")
+                                    continue
+
+                                # Luăm cota pentru echipa noastră
+                                odds = team_odds.get(market_id)
+                                odds = snap_price(odds, "BACK") if odds else ""
 
                         except Exception as e:
                             logger.warning(f"Could not get odds for {event_name}: {e}")
@@ -454,7 +467,7 @@ async def create_team(team_create: TeamCreate):
                 if matches:
                     # Sortare meciuri cronologic după start_time
                     matches_sorted = sorted(matches, key=lambda x: x.get("start_time", ""))
-                    google_sheets_client.save_matches_for_team(team.name, matches_sorted)
+                    await async_google_sheets_client.save_matches_for_team(team.name, matches_sorted)
                     logger.info(f"Saved {len(matches_sorted)} matches for {team.name} (sorted by date)")
 
                     # Plasează pariu imediat pe primul meci dacă e azi și nu a început încă
@@ -507,7 +520,7 @@ async def update_team(team_id: str, team_update: TeamUpdate):
 @router.delete("/teams/{team_id}", response_model=ApiResponse)
 async def delete_team(team_id: str):
     """Șterge o echipă."""
-    success = bot_engine.delete_team(team_id)
+    success = await bot_engine.delete_team(team_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -572,7 +585,7 @@ async def get_team_progression(team_id: str, next_odds: float = 1.5):
 @router.put("/teams/{team_id}/initial-stake")
 async def update_team_initial_stake(team_id: str, initial_stake: float):
     """Actualizează miza inițială pentru o echipă."""
-    from app.services.google_sheets import google_sheets_client
+    from app.services.google_sheets import async_google_sheets_client
 
     team = bot_engine.get_team(team_id)
     if not team:
@@ -587,10 +600,10 @@ async def update_team_initial_stake(team_id: str, initial_stake: float):
             detail="Miza inițială trebuie să fie > 0"
         )
 
-    if not google_sheets_client.is_connected():
-        google_sheets_client.connect()
+    if not async_google_sheets_client.is_connected():
+        await async_google_sheets_client.connect()
 
-    success = google_sheets_client.update_team_initial_stake(team.name, initial_stake)
+    success = await async_google_sheets_client.update_team_initial_stake(team.name, initial_stake)
 
     if success:
         return {"success": True, "message": f"Miză inițială actualizată: {initial_stake} RON"}
@@ -748,7 +761,35 @@ async def get_betfair_status():
     """Returnează statusul conexiunii Betfair."""
     return {
         "connected": betfair_client.is_connected(),
-        "configured": True  # Always true since auto-configured from .env
+        "configured": True,  # Always true since auto-configured from .env
+        "event_cache": betfair_client.event_cache_stats(),
+        "event_index": betfair_client.event_index_stats(),
+        "odds_recorder": odds_recorder.stats(),
+        "endpoints": betfair_client.endpoint_stats()
+    }
+
+
+@router.get("/odds-history/{market_id}")
+async def get_odds_history(market_id: str, selection_id: Optional[int] = None, hours: float = 24):
+    """
+    Istoricul cotelor unei piețe din ultimele ore (snapshot-uri ladder).
+
+    Args:
+        market_id: ID-ul pieței Betfair
+        selection_id: Runner-ul (opțional, implicit toți)
+        hours: Câte ore în urmă
+    """
+    import asyncio
+    from datetime import timedelta
+
+    end = datetime.utcnow()
+    records = await asyncio.to_thread(
+        odds_recorder.store.slice, end - timedelta(hours=hours), end, market_id, selection_id
+    )
+    return {
+        "market_id": market_id,
+        "count": len(records),
+        "snapshots": records_to_dicts(records)
     }
 
 
@@ -781,12 +822,12 @@ async def test_google_sheets_connection():
             message="Google Sheets nu este configurat"
         )
 
-    google_sheets_client.configure(
+    async_google_sheets_client.configure(
         spreadsheet_id=settings.google_sheets_spreadsheet_id,
         credentials_path=app_settings.google_sheets_credentials_path
     )
 
-    connected = google_sheets_client.connect()
+    connected = await async_google_sheets_client.connect()
     settings_manager.set_google_sheets_connected(connected)
 
     if connected:
@@ -829,10 +870,41 @@ async def clear_ai_chat():
 @router.post("/sheets/apply-formatting")
 async def apply_sheets_formatting(username: str = Depends(get_current_user)):
     """Aplică conditional formatting pe toate sheet-urile echipelor."""
-    count = google_sheets_client.apply_formatting_to_all_teams()
+    count = await async_google_sheets_client.apply_formatting_to_all_teams()
     return {"success": True, "sheets_updated": count}
 
 
+@router.get("/sheets/write-queue")
+async def get_sheets_write_queue():
+    """Starea cozii de scrieri Google Sheets (pending, în curs, comasate)."""
+    return async_google_sheets_client.write_queue_stats()
+
+
+@router.get("/sheets/read-cache")
+async def get_sheets_read_cache():
+    """Starea cache-ului de statistici Google Sheets (hit-uri, valori servite vechi, recalculări)."""
+    return async_google_sheets_client.read_cache_stats()
+
+
+@router.post("/sheets/flush")
+async def flush_sheets_writes(username: str = Depends(get_current_user)):
+    """Scrie imediat toate scrierile Google Sheets din coadă."""
+    remaining = await async_google_sheets_client.drain_writes()
+    return {"success": remaining == 0, "pending": remaining}
+
+
+@router.post("/sheets/import")
+async def import_sheets(username: str = Depends(get_current_user)):
+    """Importă în starea locală editările făcute direct în Google Sheets."""
+    if not async_google_sheets_client.is_connected():
+        await async_google_sheets_client.connect()
+        # connect() face și importul
+        return {"success": async_google_sheets_client.is_connected()}
+
+    success = await async_google_sheets_client.import_from_sheet()
+    return {"success": success}
+
+
 @router.get("/logs")
 async def get_logs(lines: int = 100):
     """Returnează ultimele N linii din logs."""
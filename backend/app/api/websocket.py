@@ -62,7 +62,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
     try:
         state = bot_engine.get_state()
-        stats = bot_engine.get_dashboard_stats()
+        stats = await bot_engine.get_dashboard_stats()
         await manager.send_personal(websocket, {
             "type": "initial_state",
             "data": {
@@ -111,7 +111,7 @@ async def handle_websocket_message(websocket: WebSocket, message: dict):
         })
 
     elif msg_type == "get_stats":
-        stats = bot_engine.get_dashboard_stats()
+        stats = await bot_engine.get_dashboard_stats()
         await manager.send_personal(websocket, {
             "type": "stats",
             "data": stats.model_dump(),
@@ -119,7 +119,7 @@ async def handle_websocket_message(websocket: WebSocket, message: dict):
         })
 
     elif msg_type == "get_teams":
-        teams = bot_engine.get_all_teams()
+        teams = await bot_engine.get_all_teams()
         await manager.send_personal(websocket, {
             "type": "teams",
             "data": [t.model_dump() for t in teams],
@@ -154,7 +154,7 @@ async def broadcast_bot_state():
 
 async def broadcast_stats():
     """Broadcast statisticile către toți clienții."""
-    stats = bot_engine.get_dashboard_stats()
+    stats = await bot_engine.get_dashboard_stats()
     await manager.broadcast({
         "type": "stats",
         "data": stats.model_dump(),
@@ -12,18 +12,86 @@ class Settings(BaseSettings):
     betfair_cert_path: str = Field(default="./certs/betfair.crt", description="Path to Betfair SSL Certificate")
     betfair_key_path: str = Field(default="./certs/betfair.key", description="Path to Betfair SSL Key")
 
+    # Betfair HTTP transport (pool partajat pentru toate request-urile)
+    betfair_http_max_connections: int = Field(default=20, ge=1, description="Max open connections in the Betfair HTTP pool")
+    betfair_http_max_keepalive: int = Field(default=10, ge=0, description="Max idle keep-alive connections kept in the pool")
+    betfair_http_keepalive_expiry: float = Field(default=60.0, gt=0, description="Seconds an idle connection is kept alive")
+    betfair_http_timeout: float = Field(default=30.0, gt=0, description="Timeout in seconds for Betfair HTTP requests")
+    betfair_http2: bool = Field(default=False, description="Use HTTP/2 for Betfair requests (requires the h2 package)")
+    betfair_session_renew_minutes: float = Field(
+        default=120.0, gt=0,
+        description="Minutes after which the session token is renewed via the identity keepAlive endpoint"
+    )
+    betfair_coalesce_window_ms: float = Field(
+        default=10.0, ge=0,
+        description="Window (ms) for merging concurrent listMarketBook/listMarketCatalogue calls (0 = disabled)"
+    )
+    betfair_event_cache_ttl_minutes: float = Field(
+        default=90.0, ge=0,
+        description="Minutes a listEvents lookup is reused from the event cache (0 = disabled)"
+    )
+    betfair_event_cache_size: int = Field(default=512, ge=1, description="Max listEvents lookups kept in the event cache")
+
+    # Betfair rate limiting (request-uri pe secundă per clasă de operație)
+    betfair_rate_navigation: float = Field(default=10.0, gt=0, description="Requests/s for listEvents/listMarketCatalogue")
+    betfair_rate_prices: float = Field(default=20.0, gt=0, description="Requests/s for listMarketBook")
+    betfair_rate_orders: float = Field(default=5.0, gt=0, description="Requests/s for placeOrders")
+    betfair_rate_account: float = Field(default=2.0, gt=0, description="Requests/s for order history and account calls")
+    betfair_max_retries: int = Field(default=3, ge=0, description="Retries for temporary API errors (TOO_MANY_REQUESTS, SERVICE_BUSY)")
+    betfair_backoff_base_ms: float = Field(default=250.0, gt=0, description="First backoff delay (ms), doubled on every retry")
+
+    # Failover între api.betfair.com și api.betfair.ro (circuit breaker + hedging pe citiri)
+    betfair_failover_enabled: bool = Field(default=True, description="Fall back to the secondary API-NG endpoint when the primary fails")
+    betfair_hedge_reads: bool = Field(default=False, description="Send slow idempotent reads to the secondary endpoint too")
+    betfair_circuit_failure_threshold: int = Field(default=5, ge=1, description="Consecutive failures before an endpoint is bypassed")
+    betfair_circuit_reset_seconds: float = Field(default=30.0, gt=0, description="Seconds before a bypassed endpoint is probed again")
+    betfair_hedge_min_delay_ms: float = Field(default=200.0, ge=0, description="Minimum wait (ms) before a hedged read is sent")
+
+    # Endpoint-uri alternative (ex: python -m app.testing.fixture_server) și înregistrare pentru replay
+    betfair_api_url: str = Field(default="", description="Override for the API-NG betting REST base URL")
+    betfair_identity_url: str = Field(default="", description="Override for the certlogin endpoint")
+    betfair_keep_alive_url: str = Field(default="", description="Override for the identity keepAlive endpoint")
+    betfair_record_dir: str = Field(default="", description="Record API-NG requests/responses to this directory")
+
+    # Betfair Exchange Stream API (prețuri live din cache în loc de polling)
+    betfair_stream_enabled: bool = Field(default=False, description="Read prices from the Exchange Stream cache")
+    betfair_stream_host: str = Field(default="stream-api.betfair.com", description="Exchange Stream API host")
+    betfair_stream_port: int = Field(default=443, description="Exchange Stream API port")
+    betfair_stream_ssl: bool = Field(default=True, description="Use SSL for the stream (disable only for the local fake server)")
+    betfair_stream_heartbeat_ms: int = Field(default=5000, ge=500, le=5000, description="Stream heartbeat interval (ms)")
+    betfair_stream_conflate_ms: int = Field(default=0, ge=0, description="Stream conflation (ms, 0 = none)")
+    betfair_stream_max_markets: int = Field(default=200, ge=1, description="Max markets subscribed on the stream")
+
+    # Istoric cote (snapshot-uri listMarketBook pentru meciurile programate)
+    odds_recorder_enabled: bool = Field(default=True, description="Record price ladders of scheduled markets in the background")
+    odds_recorder_interval_seconds: float = Field(default=60.0, ge=5, description="Seconds between odds history snapshots")
+    odds_history_retention_days: int = Field(default=30, ge=1, description="Days of odds history kept on disk")
+
     # Google Sheets
     google_sheets_credentials_path: str = Field(
         default="./credentials/google_service_account.json",
         description="Path to Google Service Account JSON"
     )
     google_sheets_spreadsheet_id: str = Field(default="", description="Google Sheets Spreadsheet ID")
+    sheets_write_behind_enabled: bool = Field(default=True, description="Queue Google Sheets row writes and flush them in the background")
+    sheets_flush_interval_seconds: float = Field(default=5.0, ge=0.5, description="Seconds between background flushes of queued Sheets writes")
+    sheets_flush_max_pending: int = Field(default=50, ge=1, description="Queued Sheets writes that trigger an immediate flush")
+    sheets_max_workers: int = Field(default=4, ge=1, le=32, description="Threads (and HTTP connections) used for blocking Google Sheets calls")
+    sheets_import_interval_minutes: int = Field(default=15, ge=0, description="Minutes between imports of edits made directly in the sheet (0 = only on connect)")
+    sheets_read_cache_size: int = Field(default=64, ge=1, description="Max derived values (dashboard stats, stats history) kept in the Sheets read cache")
+    sheets_read_cache_stale_seconds: float = Field(
+        default=300.0, ge=0,
+        description="Seconds an expired stats value is still served while it is recomputed in the background (0 = disabled)"
+    )
+    stats_cache_ttl_seconds: float = Field(default=60.0, ge=0, description="Seconds the dashboard stats are served from the read cache")
+    stats_history_cache_ttl_seconds: float = Field(default=300.0, ge=0, description="Seconds the stats history is served from the read cache")
 
     # Bot Configuration
     bot_timezone: str = Field(default="Europe/Bucharest", description="Timezone for bot execution")
     bot_run_hour: int = Field(default=13, ge=0, le=23, description="Hour to run bot (0-23)")
     bot_run_minute: int = Field(default=0, ge=0, le=59, description="Minute to run bot (0-59)")
     bot_initial_stake: float = Field(default=100.0, gt=0, description="Initial stake in RON")
+    bot_max_concurrent_teams: int = Field(default=8, ge=1, description="Teams prepared in parallel during a bot cycle (1 = sequential)")
     bot_max_progression_steps: int = Field(default=7, ge=1, le=20, description="Maximum progression steps before stop loss")
 
     # Server
@@ -102,7 +102,7 @@ async def scheduled_refresh_matches():
 async def scheduled_betfair_keepalive():
     """
     Menține session-ul Betfair activ pentru a preveni expirarea token-ului.
-    Rulează la fiecare 4 ore.
+    Rulează la intervalul BETFAIR_SESSION_RENEW_MINUTES (identity keepAlive).
     """
     from app.services.betfair_client import betfair_client
 
@@ -116,6 +116,19 @@ async def scheduled_betfair_keepalive():
         logger.error("Failed to keep Betfair session alive")
 
 
+async def scheduled_sheets_import():
+    """
+    Importă în starea locală editările făcute direct în Google Sheets.
+    Rulează la intervalul SHEETS_IMPORT_INTERVAL_MINUTES.
+    """
+    from app.services.google_sheets import async_google_sheets_client
+
+    if not async_google_sheets_client.is_connected():
+        return
+
+    await async_google_sheets_client.import_from_sheet()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifecycle manager pentru aplicație."""
@@ -164,15 +177,25 @@ async def lifespan(app: FastAPI):
         replace_existing=True
     )
 
-    # Job pentru menținerea session-ului Betfair activ - rulează la fiecare 4 ore
+    # Job pentru menținerea session-ului Betfair activ (identity keepAlive)
     scheduler.add_job(
         scheduled_betfair_keepalive,
-        trigger=IntervalTrigger(hours=4),
+        trigger=IntervalTrigger(minutes=settings.betfair_session_renew_minutes),
         id="betfair_keepalive_job",
         name="Betfair session keep-alive",
         replace_existing=True
     )
 
+    # Job pentru importul editărilor făcute direct în Google Sheets
+    if settings.sheets_import_interval_minutes:
+        scheduler.add_job(
+            scheduled_sheets_import,
+            trigger=IntervalTrigger(minutes=settings.sheets_import_interval_minutes),
+            id="sheets_import_job",
+            name="Import editări Google Sheets",
+            replace_existing=True
+        )
+
     scheduler.start()
     logger.info(
         f"Scheduler pornit - Bot programat la {settings.bot_run_hour:02d}:{settings.bot_run_minute:02d} "
@@ -180,7 +203,24 @@ async def lifespan(app: FastAPI):
     )
     logger.info("Verificare rezultate programată la fiecare 30 minute")
     logger.info(f"Actualizare meciuri programată la {refresh_hour:02d}:00")
-    logger.info("Betfair keep-alive programat la fiecare 4 ore")
+    logger.info(f"Betfair keep-alive programat la fiecare {settings.betfair_session_renew_minutes:g} minute")
+
+    from app.services.betfair_client import betfair_client
+    from app.services.google_sheets import async_google_sheets_client
+    from app.services.odds_history import odds_recorder
+
+    if settings.sheets_write_behind_enabled:
+        async_google_sheets_client.start_write_behind(
+            interval_seconds=settings.sheets_flush_interval_seconds,
+            max_pending=settings.sheets_flush_max_pending
+        )
+
+    if settings.odds_recorder_enabled:
+        odds_recorder.configure(
+            interval_seconds=settings.odds_recorder_interval_seconds,
+            retention_days=settings.odds_history_retention_days
+        )
+        odds_recorder.start(betfair_client)
 
     yield
 
@@ -188,6 +228,11 @@ async def lifespan(app: FastAPI):
     scheduler.shutdown()
     logger.info("Scheduler oprit")
 
+    await odds_recorder.stop()
+    # Scrierile Google Sheets din coadă sunt golite înainte de oprire
+    await async_google_sheets_client.stop_write_behind()
+    await betfair_client.close()
+
 
 app = FastAPI(
     title="Betfair Bot API",
@@ -1,4 +1,5 @@
 import logging
+import math
 from typing import List, Dict, Any
 from datetime import datetime
 import anthropic
@@ -102,6 +103,8 @@ Oferă:
                 context += f"- {match.get('home_team', 'N/A')} vs {match.get('away_team', 'N/A')}"
                 if match.get('home_odds'):
                     context += f" | Cote: 1={match.get('home_odds')}, X={match.get('draw_odds')}, 2={match.get('away_odds')}"
+                if match.get('overround'):
+                    context += f" | Marjă piață: {(match['overround'] - 1) * 100:.1f}%"
                 context += f" | Start: {match.get('start_time', 'N/A')}\n"
 
         full_message = message
@@ -113,6 +116,7 @@ Oferă:
     async def fetch_betfair_matches(self, sport: str = "football", search_query: str = None) -> List[Dict[str, Any]]:
         """Preia meciuri live de pe Betfair."""
         from app.services.betfair_client import betfair_client
+        from app.services.market_frame import MarketBookFrame
 
         matches = []
 
@@ -152,20 +156,19 @@ Oferă:
             market_ids = [m.get("marketId") for m in markets[:20] if m.get("marketId")]
 
             # Get prices
-            market_books = await betfair_client.list_market_book(market_ids) if market_ids else []
-
-            # Build price lookup
-            price_lookup = {}
-            for book in market_books:
-                market_id = book.get("marketId")
-                runners = book.get("runners", [])
-                if len(runners) >= 2:
-                    prices = {}
-                    for runner in runners:
-                        back_prices = runner.get("ex", {}).get("availableToBack", [])
-                        if back_prices:
-                            prices[runner.get("selectionId")] = back_prices[0].get("price", 0)
-                    price_lookup[market_id] = prices
+            frame = MarketBookFrame.from_books(
+                await betfair_client.list_market_book(market_ids) if market_ids else []
+            )
+            # Marja pieței (suma probabilităților implicite), calculată vectorizat pe toate piețele
+            overrounds = dict(zip(frame.market_ids, frame.overround().tolist()))
+            # Cotele gazdă / deplasare / egal (runnerii 0, 1, 2), citite vectorizat din frame
+            runner_odds = [
+                frame.back_prices({
+                    m.get("marketId"): m["runners"][i].get("selectionId")
+                    for m in markets if len(m.get("runners", [])) > i
+                })
+                for i in range(3)
+            ]
 
             # Combine data
             for market in markets:
@@ -185,17 +188,14 @@ Oferă:
                     }
 
                     # Add prices if available
-                    if market_id in price_lookup:
-                        prices = price_lookup[market_id]
-                        for i, runner in enumerate(runners[:3]):
-                            selection_id = runner.get("selectionId")
-                            if selection_id in prices:
-                                if i == 0:
-                                    match_data["home_odds"] = prices[selection_id]
-                                elif i == 1:
-                                    match_data["away_odds"] = prices[selection_id]
-                                elif i == 2:
-                                    match_data["draw_odds"] = prices[selection_id]
+                    if market_id in frame:
+                        for key, odds in zip(("home_odds", "away_odds", "draw_odds"), runner_odds):
+                            if odds.get(market_id) is not None:
+                                match_data[key] = odds[market_id]
+
+                        overround = overrounds[market_id]
+                        if not math.isnan(overround):
+                            match_data["overround"] = round(overround, 3)
 
                     matches.append(match_data)
 
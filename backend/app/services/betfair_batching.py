@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Betfair limitează fiecare request la 200 puncte de "weight"
+MAX_REQUEST_WEIGHT = 200
+
+# Weight per piață pentru listMarketBook, în funcție de priceData
+PRICE_DATA_WEIGHTS = {
+    "SP_AVAILABLE": 3,
+    "SP_TRADED": 7,
+    "EX_BEST_OFFERS": 5,
+    "EX_ALL_OFFERS": 17,
+    "EX_TRADED": 17,
+}
+
+# listMarketCatalogue: maxResults maxim acceptat de API
+CATALOGUE_MAX_RESULTS = 1000
+
+# Weight per piață pentru listMarketCatalogue, în funcție de marketProjection
+MARKET_PROJECTION_WEIGHTS = {
+    "MARKET_DESCRIPTION": 1,
+    "RUNNER_METADATA": 1,
+}
+
+
+def market_book_batch_size(price_data: List[str]) -> int:
+    """
+    Numărul maxim de piețe dintr-un listMarketBook care încape în bugetul de weight.
+
+    Args:
+        price_data: Lista priceData din priceProjection
+
+    Returns:
+        Numărul de market ID-uri per request
+    """
+    weight = sum(PRICE_DATA_WEIGHTS.get(p, 0) for p in price_data) or 2
+    return max(1, MAX_REQUEST_WEIGHT // weight)
+
+
+def market_catalogue_max_results(market_projection: List[str]) -> int:
+    """
+    Valoarea maxResults pentru listMarketCatalogue care încape în bugetul de weight.
+
+    Args:
+        market_projection: Lista marketProjection
+
+    Returns:
+        maxResults permis pentru proiecția dată
+    """
+    weight = sum(MARKET_PROJECTION_WEIGHTS.get(p, 0) for p in market_projection)
+    if weight == 0:
+        return CATALOGUE_MAX_RESULTS
+    return max(1, min(CATALOGUE_MAX_RESULTS, MAX_REQUEST_WEIGHT // weight))
+
+
+def request_weight(endpoint: str, params: Dict[str, Any]) -> int:
+    """
+    Weight-ul consumat de un request (0 pentru endpoint-urile fără weight).
+
+    Args:
+        endpoint: Endpoint-ul API-NG
+        params: Parametrii request-ului
+    """
+    if endpoint == "listMarketBook":
+        price_data = params.get("priceProjection", {}).get("priceData", [])
+        per_market = sum(PRICE_DATA_WEIGHTS.get(p, 0) for p in price_data) or 2
+        return per_market * len(params.get("marketIds", []))
+    if endpoint == "listMarketCatalogue":
+        per_market = sum(MARKET_PROJECTION_WEIGHTS.get(p, 0) for p in params.get("marketProjection", []))
+        return per_market * int(params.get("maxResults", 0))
+    return 0
+
+
+class RequestCoalescer:
+    """
+    Grupează ID-urile cerute concurent într-o fereastră scurtă de timp și
+    execută un singur request per lot, apoi distribuie rezultatele fiecărui apelant.
+
+    Exemplu: 20 de apeluri list_market_book([market_id]) venite în aceeași
+    fereastră devin un singur listMarketBook cu 20 de ID-uri.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_batch: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+        key_of: Callable[[Dict[str, Any]], Optional[str]],
+        max_batch_size: int,
+        window: float = 0.01
+    ):
+        """
+        Args:
+            name: Numele operației (pentru log-uri)
+            fetch_batch: Funcția care execută request-ul pentru un lot de ID-uri
+            key_of: Extrage ID-ul (cheia) dintr-un element al răspunsului
+            max_batch_size: Numărul maxim de ID-uri per request
+            window: Fereastra de colectare în secunde
+        """
+        self.name = name
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._fetch_batch = fetch_batch
+        self._key_of = key_of
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.requests_sent = 0
+        self.keys_requested = 0
+
+    async def fetch(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """
+        Cere rezultatele pentru o listă de ID-uri.
+
+        Args:
+            keys: ID-urile cerute (market ID-uri, event ID-uri)
+
+        Returns:
+            Elementele răspunsului pentru ID-urile cerute, în ordinea cererii
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for key in dict.fromkeys(str(k) for k in keys if k):
+            future = loop.create_future()
+            self._pending.setdefault(key, []).append(future)
+            futures.append(future)
+
+        if not futures:
+            return []
+
+        self.keys_requested += len(futures)
+
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_after_window())
+
+        results = await asyncio.gather(*futures)
+
+        items: List[Dict[str, Any]] = []
+        for result in results:
+            items.extend(result)
+        return items
+
+    async def _flush_after_window(self) -> None:
+        """Așteaptă fereastra de colectare și trimite loturile acumulate."""
+        await asyncio.sleep(self.window)
+
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+
+        keys = list(pending.keys())
+        batches = [
+            keys[i:i + self.max_batch_size]
+            for i in range(0, len(keys), self.max_batch_size)
+        ]
+
+        logger.debug(f"{self.name}: {len(keys)} ID-uri grupate în {len(batches)} request(uri)")
+
+        await asyncio.gather(*(self._run_batch(batch, pending) for batch in batches))
+
+    async def _run_batch(self, keys: List[str], pending: Dict[str, List[asyncio.Future]]) -> None:
+        """Execută un lot și setează rezultatul pe fiecare future în așteptare."""
+        self.requests_sent += 1
+
+        try:
+            items = await self._fetch_batch(keys)
+        except Exception as e:
+            logger.error(f"{self.name}: eroare la request-ul grupat: {e}")
+            for key in keys:
+                for future in pending[key]:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in items:
+            key = self._key_of(item)
+            if key is not None:
+                grouped[str(key)].append(item)
+
+        for key in keys:
+            for future in pending[key]:
+                if not future.done():
+                    future.set_result(grouped.get(key, []))
@@ -1,12 +1,37 @@
+import asyncio
 import logging
 import httpx
+import numpy as np
 import os
+import time
 import base64
 import tempfile
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-
-from app.models.schemas import Match, PlaceOrderResponse
+from typing import AsyncIterator, List, Optional, Dict, Any
+from datetime import datetime, timedelta, timezone
+
+from app.models.schemas import Match, PlaceOrderRequest, PlaceOrderResponse
+from app.services.betfair_batching import (
+    RequestCoalescer,
+    market_book_batch_size,
+    market_catalogue_max_results,
+    request_weight
+)
+from app.services.betfair_failover import HEDGED_ENDPOINTS, EndpointPool
+from app.services.betfair_rate_limit import (
+    CONFIG_ERRORS,
+    RETRYABLE_ERRORS,
+    SESSION_ERRORS,
+    THROTTLE_ERRORS,
+    RateGovernor,
+    parse_aping_error
+)
+from app.services.betfair_session import BetfairSessionManager
+from app.services.betfair_stream import MarketStreamClient
+from app.services.cache import AsyncTTLCache
+from app.services.event_index import EventIndex, team_name_variants
+from app.services.market_frame import MarketBookFrame
+from app.services.tick_ladder import format_price, is_valid_price, snap_prices
+from app.services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -25,22 +50,83 @@ class BetfairClient:
 
     # Fallback endpoints
     IDENTITY_URL_GLOBAL = "https://identitysso-cert.betfair.com/api/certlogin"
+    KEEP_ALIVE_URL = "https://identitysso.betfair.ro/api/keepAlive"
     API_URL_RO = "https://api.betfair.ro/exchange/betting/rest/v1.0"
 
     FOOTBALL_EVENT_TYPE_ID = "1"
     BASKETBALL_EVENT_TYPE_ID = "7522"
 
+    # Granularitatea ferestrei de timp pentru listEvents (cheia cache-ului)
+    EVENT_WINDOW_BUCKET_HOURS = 6
+
+    # Competiții per listEvents la descoperirea evenimentelor și vârsta maximă a indexului
+    DISCOVERY_COMPETITIONS_PER_REQUEST = 25
+    EVENT_INDEX_MAX_AGE = 2 * 3600
+
+    # Limita Betfair de instrucțiuni per placeOrders
+    MAX_INSTRUCTIONS_PER_ORDER = 200
+
+    # listClearedOrders / listCurrentOrders: recordCount maxim și betIds per request
+    CLEARED_ORDERS_PAGE_SIZE = 1000
+    CLEARED_ORDERS_BET_IDS_PER_REQUEST = 250
+
+    MARKET_BOOK_PRICE_DATA = ["EX_BEST_OFFERS"]
+    MARKET_CATALOGUE_PROJECTION = [
+        "COMPETITION",
+        "EVENT",
+        "EVENT_TYPE",
+        "RUNNER_DESCRIPTION",
+        "MARKET_START_TIME"
+    ]
+
+    # Request-uri pe secundă per clasă de operație
+    DEFAULT_RATE_LIMITS = {
+        "navigation": 10.0,
+        "prices": 20.0,
+        "orders": 5.0,
+        "account": 2.0
+    }
+
     def __init__(self):
         self._app_key: Optional[str] = None
-        self._session_token: Optional[str] = None
         self._username: Optional[str] = None
         self._password: Optional[str] = None
         self._cert_path: Optional[str] = None
         self._key_path: Optional[str] = None
         self._temp_cert_file: Optional[str] = None
         self._temp_key_file: Optional[str] = None
-        self._connected = False
+        self._session = BetfairSessionManager(
+            login_url=self.IDENTITY_URL,
+            keep_alive_url=self.KEEP_ALIVE_URL,
+            fallback_login_url=self.IDENTITY_URL_GLOBAL
+        )
+        self._api_url = self.API_URL
+        self._secondary_api_url: Optional[str] = self.API_URL_RO
+        self._failover_options: Dict[str, Any] = {"enabled": True, "hedge_reads": False}
+        self._endpoints = EndpointPool([self.API_URL, self.API_URL_RO])
+        self._hedge_reads = False
+        self._recorder = None
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_limits = httpx.Limits(
+            max_connections=20,
+            max_keepalive_connections=10,
+            keepalive_expiry=60.0
+        )
+        self._http_timeout = 30.0
+        self._http2 = False
+        self._coalesce_window = 0.01
+        self._market_book_coalescer = RequestCoalescer(
+            name="listMarketBook",
+            fetch_batch=self._fetch_market_books,
+            key_of=lambda book: book.get("marketId"),
+            max_batch_size=market_book_batch_size(self.MARKET_BOOK_PRICE_DATA),
+            window=self._coalesce_window
+        )
+        self._catalogue_coalescers: Dict[tuple, RequestCoalescer] = {}
+        self._rate_governor = RateGovernor(self.DEFAULT_RATE_LIMITS)
+        self._event_cache = AsyncTTLCache("betfair_events", maxsize=512, ttl=90 * 60)
+        self.event_index = EventIndex()
+        self._stream: Optional[MarketStreamClient] = None
 
     def configure(
         self,
@@ -96,11 +182,302 @@ class BetfairClient:
             except Exception as e:
                 logger.error(f"Failed to load certificates from env: {e}")
 
+        # Contextul SSL se construiește o singură dată; fișierele temporare
+        # nu mai sunt necesare după încărcarea certificatului
+        self._session.build_ssl_context(
+            self._cert_path,
+            self._key_path,
+            remove_files=self._temp_cert_file is not None
+        )
+
         return True
 
+    def configure_session(self, renew_after_minutes: float = 120.0) -> None:
+        """
+        Configurează reînnoirea proactivă a session token-ului.
+
+        Args:
+            renew_after_minutes: Minute de la ultima reînnoire după care se apelează keepAlive
+        """
+        self._session.renew_after = renew_after_minutes * 60
+
+    def configure_endpoints(
+        self,
+        api_url: Optional[str] = None,
+        identity_url: Optional[str] = None,
+        keep_alive_url: Optional[str] = None,
+        secondary_api_url: Optional[str] = None,
+        fallback_identity_url: Optional[str] = None
+    ) -> None:
+        """
+        Suprascrie URL-urile Betfair (ex: serverul local din app.testing.fixture_server).
+        Valorile goale păstrează endpoint-urile implicite; endpoint-urile de rezervă
+        implicite (API_URL_RO, IDENTITY_URL_GLOBAL) se folosesc doar cu URL-urile implicite.
+
+        Args:
+            api_url: Baza API-NG betting REST
+            identity_url: Endpoint-ul certlogin
+            keep_alive_url: Endpoint-ul identity keepAlive
+            secondary_api_url: Baza API-NG de rezervă (failover / hedging)
+            fallback_identity_url: Endpoint certlogin de rezervă
+        """
+        self._api_url = (api_url or self.API_URL).rstrip("/")
+        self._secondary_api_url = secondary_api_url or (None if api_url else self.API_URL_RO)
+        self._session.login_url = identity_url or self.IDENTITY_URL
+        self._session.fallback_login_url = fallback_identity_url or (None if identity_url else self.IDENTITY_URL_GLOBAL)
+        self._session.keep_alive_url = keep_alive_url or self.KEEP_ALIVE_URL
+        self.configure_failover(**self._failover_options)
+        if api_url or identity_url or keep_alive_url:
+            logger.info(f"Endpoint-uri Betfair: {self._api_url}, {self._session.login_url}")
+
+    def configure_failover(
+        self,
+        enabled: bool = True,
+        hedge_reads: bool = False,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        hedge_min_delay_ms: float = 200.0
+    ) -> None:
+        """
+        Configurează failover-ul între endpoint-ul API-NG principal și cel de rezervă.
+
+        Args:
+            enabled: Folosește endpoint-ul de rezervă când principalul e ocolit / nu răspunde
+            hedge_reads: Trimite citirile idempotente și pe rezervă dacă principalul
+                nu răspunde în p95 din latențele recente
+            failure_threshold: Erori consecutive (rețea / 5xx) după care endpoint-ul e ocolit
+            reset_seconds: Secunde până la request-ul de probă pe endpoint-ul ocolit
+            hedge_min_delay_ms: Pauza minimă înainte de request-ul pe rezervă
+        """
+        self._failover_options = {
+            "enabled": enabled,
+            "hedge_reads": hedge_reads,
+            "failure_threshold": failure_threshold,
+            "reset_seconds": reset_seconds,
+            "hedge_min_delay_ms": hedge_min_delay_ms
+        }
+        urls = [self._api_url]
+        if enabled and self._secondary_api_url:
+            urls.append(self._secondary_api_url)
+        self._endpoints = EndpointPool(
+            urls,
+            failure_threshold=failure_threshold,
+            reset_timeout=reset_seconds,
+            hedge_min_delay=hedge_min_delay_ms / 1000.0,
+            hedge_default_delay=max(hedge_min_delay_ms / 1000.0, 1.0)
+        )
+        self._hedge_reads = hedge_reads
+
+    def endpoint_stats(self) -> Dict[str, Any]:
+        """Starea endpoint-urilor API-NG (circuit breaker, p95, hedging)."""
+        return self._endpoints.stats()
+
+    def configure_recording(self, directory: Optional[str]) -> None:
+        """
+        Înregistrează request-urile API-NG și răspunsurile în directorul dat,
+        pentru replay cu app.testing.fixture_server.
+
+        Args:
+            directory: Directorul de înregistrări (None/gol = dezactivat)
+        """
+        if not directory:
+            self._recorder = None
+            return
+
+        from app.testing.fixture_server import ApiRecorder
+        self._recorder = ApiRecorder(directory)
+        logger.info(f"Înregistrare request-uri Betfair în {directory}")
+
+    @property
+    def _session_token(self) -> Optional[str]:
+        return self._session.token
+
+    def session_info(self) -> Dict[str, Any]:
+        """Starea session-ului (pentru status/diagnoză)."""
+        age = self._session.token_age()
+        return {
+            "connected": self.is_connected(),
+            "token_age_seconds": round(age, 1) if age is not None else None,
+            "needs_renewal": self._session.needs_renewal(),
+            "logins": self._session.logins,
+            "keep_alives": self._session.keep_alives
+        }
+
+    def configure_transport(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 30.0,
+        http2: bool = False
+    ) -> None:
+        """
+        Configurează pool-ul HTTP partajat folosit pentru login și request-uri API.
+
+        Args:
+            max_connections: Numărul maxim de conexiuni deschise
+            max_keepalive_connections: Numărul maxim de conexiuni idle păstrate
+            keepalive_expiry: Secunde după care o conexiune idle este închisă
+            timeout: Timeout per request (secunde)
+            http2: Activează HTTP/2 (necesită pachetul h2)
+        """
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 cerut dar pachetul h2 nu este instalat - folosesc HTTP/1.1")
+                http2 = False
+
+        self._http_limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._http_timeout = timeout
+        self._http2 = http2
+
+    def configure_batching(self, window_ms: float = 10.0) -> None:
+        """
+        Configurează fereastra în care cererile concurente de listMarketBook /
+        listMarketCatalogue sunt grupate într-un singur request.
+
+        Args:
+            window_ms: Fereastra de colectare în milisecunde (0 = fără grupare)
+        """
+        self._coalesce_window = max(0.0, window_ms) / 1000.0
+        self._market_book_coalescer.window = self._coalesce_window
+        for coalescer in self._catalogue_coalescers.values():
+            coalescer.window = self._coalesce_window
+
+    def configure_rate_limits(
+        self,
+        navigation: float,
+        prices: float,
+        orders: float,
+        account: float,
+        max_retries: int = 3,
+        backoff_base_ms: float = 250.0
+    ) -> None:
+        """
+        Configurează limitele de request-uri per clasă de operație și backoff-ul.
+
+        Args:
+            navigation: req/s pentru listEvents / listMarketCatalogue
+            prices: req/s pentru listMarketBook
+            orders: req/s pentru placeOrders
+            account: req/s pentru listCurrentOrders / listClearedOrders / getAccountFunds
+            max_retries: Reîncercări pentru erori temporare (TOO_MANY_REQUESTS, SERVICE_BUSY...)
+            backoff_base_ms: Prima pauză de backoff în milisecunde
+        """
+        self._rate_governor = RateGovernor(
+            {
+                "navigation": navigation,
+                "prices": prices,
+                "orders": orders,
+                "account": account
+            },
+            max_retries=max_retries,
+            backoff_base=backoff_base_ms / 1000.0
+        )
+
+    def configure_event_cache(self, ttl_minutes: float = 90.0, maxsize: int = 512) -> None:
+        """
+        Configurează cache-ul de evenimente folosit de list_events.
+
+        Args:
+            ttl_minutes: Durata de viață a unei căutări în cache (0 = fără cache)
+            maxsize: Numărul maxim de căutări păstrate
+        """
+        self._event_cache = AsyncTTLCache("betfair_events", maxsize=maxsize, ttl=ttl_minutes * 60)
+
+    def event_cache_stats(self) -> Dict[str, Any]:
+        """Statistici hit/miss pentru cache-ul de evenimente."""
+        return self._event_cache.stats()
+
+    def configure_stream(
+        self,
+        enabled: bool,
+        host: str = "stream-api.betfair.com",
+        port: int = 443,
+        use_ssl: bool = True,
+        heartbeat_ms: int = 5000,
+        conflate_ms: int = 0,
+        max_markets: int = 200
+    ) -> None:
+        """
+        Activează modul streaming: prețurile sunt citite din cache-ul alimentat
+        de Exchange Stream API în loc de polling listMarketBook.
+
+        Args:
+            enabled: Activează/dezactivează streaming-ul
+            host: Host-ul Exchange Stream API
+            port: Portul Exchange Stream API
+            use_ssl: Conexiune SSL (False doar pentru serverul local de test)
+            heartbeat_ms: Intervalul de heartbeat cerut serverului
+            conflate_ms: Conflatarea update-urilor (0 = fără)
+            max_markets: Numărul maxim de piețe subscrise simultan
+        """
+        if not enabled:
+            self._stream = None
+            return
+
+        self._stream = MarketStreamClient(
+            host=host,
+            port=port,
+            use_ssl=use_ssl,
+            heartbeat_ms=heartbeat_ms,
+            conflate_ms=conflate_ms,
+            max_markets=max_markets
+        )
+        self._stream.set_credentials(
+            app_key=self._app_key or "",
+            token_provider=lambda: self._session_token,
+            on_auth_failure=self.connect
+        )
+        logger.info(f"Streaming Betfair activat ({host}:{port})")
+
+    def get_cached_back_price(self, market_id: str, selection_id: Any) -> Optional[float]:
+        """
+        Returnează cea mai bună cotă BACK din cache-ul de stream, fără request în rețea.
+
+        Returns:
+            Cota sau None dacă streaming-ul nu e activ / piața nu e în cache
+        """
+        if self._stream is None or self._stream.get_market_book(market_id) is None:
+            return None
+        return self._stream.cache.get_back_price(market_id, selection_id)
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Returnează clientul HTTP partajat, creându-l la prima utilizare.
+        Conexiunile (TCP + TLS) sunt refolosite între request-uri.
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                verify=self._session.ssl_context or True,
+                timeout=self._http_timeout,
+                limits=self._http_limits,
+                http2=self._http2
+            )
+            logger.info(
+                f"Pool HTTP Betfair creat (max_connections={self._http_limits.max_connections}, "
+                f"http2={self._http2})"
+            )
+        return self._http_client
+
+    async def close(self) -> None:
+        """Închide stream-ul și pool-ul HTTP partajat (apelat la oprirea aplicației)."""
+        if self._stream is not None:
+            await self._stream.stop()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            logger.info("Pool HTTP Betfair închis")
+
     async def connect(self) -> bool:
         """
-        Autentifică la Betfair API.
+        Autentifică la Betfair API. Apelurile concurente (bot, scheduler, rute)
+        așteaptă același login în loc să facă fiecare câte unul.
 
         Returns:
             True dacă autentificarea a reușit
@@ -110,46 +487,39 @@ class BetfairClient:
             return False
 
         try:
-            cert = None
-            if self._cert_path and self._key_path:
-                cert = (self._cert_path, self._key_path)
-
-            async with httpx.AsyncClient(cert=cert, timeout=30.0) as client:
-                response = await client.post(
-                    self.IDENTITY_URL,
-                    headers={"X-Application": self._app_key},
-                    data={
-                        "username": self._username,
-                        "password": self._password
-                    }
-                )
-
-                result = response.json()
-
-                if result.get("loginStatus") == "SUCCESS":
-                    self._session_token = result.get("sessionToken")
-                    self._connected = True
-                    logger.info("Autentificat la Betfair API")
-                    return True
-                else:
-                    logger.error(f"Autentificare eșuată: {result.get('loginStatus')}")
-                    return False
-
+            return await self._session.login(
+                self._get_http_client,
+                self._app_key,
+                self._username,
+                self._password
+            )
         except Exception as e:
             logger.error(f"Eroare la autentificarea Betfair: {e}")
-            self._connected = False
+            self._session.invalidate()
             return False
 
+    async def _ensure_session(self) -> bool:
+        """
+        Asigură un token valid înainte de request. Dacă token-ul e vechi,
+        keepAlive rulează în fundal fără a întârzia request-ul curent.
+        """
+        if not self.is_connected():
+            logger.info("Not connected, attempting to reconnect...")
+            return await self.connect()
+
+        if self._session.needs_renewal():
+            self._session.renew_in_background(self._get_http_client, self._app_key or "")
+
+        return True
+
     def is_connected(self) -> bool:
         """Verifică dacă clientul este conectat."""
-        return self._connected and self._session_token is not None
+        return self._session.token is not None
 
     async def disconnect(self) -> None:
         """Deconectează clientul."""
-        if self._http_client:
-            await self._http_client.aclose()
-        self._session_token = None
-        self._connected = False
+        await self.close()
+        self._session.invalidate()
 
         # Cleanup temp certificate files
         if self._temp_cert_file and os.path.exists(self._temp_cert_file):
@@ -185,55 +555,92 @@ class BetfairClient:
         Returns:
             Răspunsul API ca dicționar
         """
-        if not self.is_connected():
-            # Try to reconnect
-            logger.info("Not connected, attempting to reconnect...")
-            connected = await self.connect()
-            if not connected:
-                raise Exception("Nu sunt conectat la Betfair API")
+        if not await self._ensure_session():
+            raise Exception("Nu sunt conectat la Betfair API")
 
-        url = f"{self.API_URL}/{endpoint}/"
+        is_order = self._rate_governor.op_class(endpoint) == "orders"
+        weight = request_weight(endpoint, params)
+        relogged = False
+        attempt = 0
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    url,
-                    headers=self._get_headers(use_live_key=use_live_key),
-                    json=params
-                )
+        while True:
+            await self._rate_governor.acquire(endpoint)
+            token = self._session.token
+            if weight:
+                metrics.inc("betfair_api_weight_total", weight, endpoint=endpoint)
+
+            try:
+                client = self._get_http_client()
+                headers = self._get_headers(use_live_key=use_live_key)
+                # Ordinele nu sunt retrimise pe alt endpoint (pot fi fost deja plasate)
+                with metrics.timer("betfair_api_request_seconds", endpoint=endpoint):
+                    response = await self._endpoints.send(
+                        lambda base: client.post(f"{base}/{endpoint}/", headers=headers, json=params),
+                        failover=not is_order,
+                        hedge=self._hedge_reads and endpoint in HEDGED_ENDPOINTS
+                    )
+            except httpx.TransportError as e:
+                # Un ordin trimis poate fi fost plasat: nu îl retrimitem
+                if is_order or attempt >= self._rate_governor.max_retries:
+                    logger.error(f"Eroare request API: {e}")
+                    self._rate_governor.record_error(endpoint, "TRANSPORT_ERROR")
+                    return {"error": str(e), "errorCode": "TRANSPORT_ERROR"}
+                delay = self._rate_governor.backoff_delay(attempt)
+                logger.warning(f"{endpoint}: eroare de rețea ({e}), reîncerc în {delay:.2f}s")
+                metrics.inc("betfair_api_retries_total", endpoint=endpoint)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                logger.error(f"Eroare request API: {e}")
+                return {"error": str(e)}
+
+            if self._recorder is not None:
+                self._record(endpoint, params, response)
 
             if response.status_code == 200:
+                self._rate_governor.record_success(endpoint)
+                metrics.inc("betfair_api_requests_total", endpoint=endpoint, status="ok", http_status=200)
                 return response.json()
-            else:
-                error_text = response.text
-                logger.error(f"Eroare API: {response.status_code} - {error_text}")
-
-                # Check if session expired - try to reconnect once
-                if "INVALID_SESSION_INFORMATION" in error_text or response.status_code == 400:
-                    logger.warning("Session token invalid - attempting reconnect...")
-                    self._connected = False
-                    reconnected = await self.connect()
-
-                    if reconnected:
-                        logger.info("Reconnected successfully - retrying request...")
-                        # Retry the request once with new session
-                        async with httpx.AsyncClient(timeout=30.0) as retry_client:
-                            retry_response = await retry_client.post(
-                                url,
-                                headers=self._get_headers(use_live_key=use_live_key),
-                                json=params
-                            )
-                            if retry_response.status_code == 200:
-                                return retry_response.json()
-                            else:
-                                logger.error(f"Retry failed: {retry_response.status_code} - {retry_response.text}")
-                                return {"error": retry_response.text}
-
-                return {"error": error_text}
 
-        except Exception as e:
-            logger.error(f"Eroare request API: {e}")
-            return {"error": str(e)}
+            error_text = response.text
+            error_code = parse_aping_error(error_text)
+            self._rate_governor.record_error(endpoint, error_code)
+            metrics.inc("betfair_api_requests_total", endpoint=endpoint, status="error", http_status=response.status_code)
+            logger.error(f"Eroare API {endpoint}: {response.status_code} - {error_code or error_text}")
+
+            if error_code in CONFIG_ERRORS:
+                logger.error(f"{endpoint}: {error_code} - verifică BETFAIR_APP_KEY")
+                return {"error": error_text, "errorCode": error_code}
+
+            if error_code in SESSION_ERRORS and not relogged:
+                logger.warning("Session token invalid - attempting reconnect...")
+                # Dacă alt request a obținut deja un token nou, doar reîncercăm
+                self._session.invalidate(token)
+                relogged = True
+                if self.is_connected() or await self.connect():
+                    logger.info("Reconnected successfully - retrying request...")
+                    continue
+
+            # Ordinele se reîncearcă doar când serverul le-a refuzat explicit pentru throttling
+            retryable = THROTTLE_ERRORS if is_order else RETRYABLE_ERRORS
+            if (error_code in retryable or response.status_code in (429, 503)) \
+                    and attempt < self._rate_governor.max_retries:
+                delay = self._rate_governor.backoff_delay(attempt)
+                logger.warning(f"{endpoint}: {error_code or response.status_code}, reîncerc în {delay:.2f}s")
+                metrics.inc("betfair_api_retries_total", endpoint=endpoint)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+
+            return {"error": error_text, "errorCode": error_code}
+
+    def _record(self, endpoint: str, params: Dict[str, Any], response: httpx.Response) -> None:
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        self._recorder.record(endpoint, params, response.status_code, body)
 
     async def list_events(
         self,
@@ -252,11 +659,56 @@ class BetfairClient:
         Returns:
             Lista de evenimente
         """
+        # Fereastra de timp e aliniată la intervale fixe (UTC), astfel încât
+        # căutările repetate din același interval folosesc aceeași intrare din cache
+        bucket_seconds = self.EVENT_WINDOW_BUCKET_HOURS * 3600
+        bucket_start = int(time.time() // bucket_seconds * bucket_seconds)
+
+        key = (
+            event_type_id,
+            tuple(sorted(competition_ids or [])),
+            (text_query or "").strip().lower(),
+            bucket_start
+        )
+
+        events = await self._event_cache.get_or_load(
+            key,
+            lambda: self._fetch_events(event_type_id, competition_ids, text_query, bucket_start)
+        )
+        if not events:
+            return []
+
+        # Fereastra din cache începe cu până la 3h înaintea intervalului: meciurile
+        # începute cu mai mult de 3h în urmă (deja terminate) sunt eliminate
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=3)
+        return [e for e in events if not self._started_before(e, cutoff)]
+
+    @staticmethod
+    def _started_before(event: Dict[str, Any], cutoff: datetime) -> bool:
+        open_date = event.get("event", {}).get("openDate")
+        if not open_date:
+            return False
+        try:
+            return datetime.fromisoformat(open_date.replace("Z", "+00:00")) < cutoff
+        except ValueError:
+            return False
+
+    async def _fetch_events(
+        self,
+        event_type_id: str,
+        competition_ids: Optional[List[str]],
+        text_query: Optional[str],
+        bucket_start: int
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Execută listEvents pentru fereastra intervalului; None la eroare (nu se salvează în cache)."""
+        window_start = datetime.utcfromtimestamp(bucket_start)
+        window_end = window_start + timedelta(hours=self.EVENT_WINDOW_BUCKET_HOURS)
+
         market_filter = {
             "eventTypeIds": [event_type_id],
             "marketStartTime": {
-                "from": (datetime.utcnow() - timedelta(hours=3)).isoformat() + "Z",  # Include LIVE matches (started in last 3h)
-                "to": (datetime.utcnow() + timedelta(days=7)).isoformat() + "Z"
+                "from": (window_start - timedelta(hours=3)).isoformat() + "Z",  # Include LIVE matches (started in last 3h)
+                "to": (window_end + timedelta(days=7)).isoformat() + "Z"
             }
         }
 
@@ -269,10 +721,83 @@ class BetfairClient:
         result = await self._api_request("listEvents", {"filter": market_filter})
 
         if "error" in result:
-            return []
+            return None
 
         return result if isinstance(result, list) else []
 
+    async def discover_events(self, teams: List[tuple], event_type_id: str = "1") -> int:
+        """
+        Reconstruiește indexul echipă -> evenimente din competițiile cunoscute
+        ale echipelor: câteva listEvents pe competiții și un listMarketCatalogue
+        grupat, în loc de câte o căutare text per echipă.
+
+        Args:
+            teams: Perechi (nume echipă, betfair_id)
+            event_type_id: Tipul de eveniment (1=Football)
+
+        Returns:
+            Numărul de evenimente indexate
+        """
+        competition_ids = sorted(self.event_index.competitions_for(teams))
+        if not competition_ids:
+            logger.info("Index evenimente: nicio competiție cunoscută încă, se folosește căutarea text")
+            return 0
+
+        chunk = self.DISCOVERY_COMPETITIONS_PER_REQUEST
+        results = await asyncio.gather(*(
+            self.list_events(event_type_id, competition_ids=competition_ids[i:i + chunk])
+            for i in range(0, len(competition_ids), chunk)
+        ))
+        event_ids = list(dict.fromkeys(
+            e.get("event", {}).get("id") for events in results for e in events if e.get("event", {}).get("id")
+        ))
+
+        self.event_index.reset(competition_ids)
+        # Catalogul (cu runner-ii) populează indexul prin event_index.learn
+        await self.list_market_catalogue(event_ids, market_type_codes=["MATCH_ODDS"])
+
+        logger.info(
+            f"Index evenimente: {len(event_ids)} evenimente din {len(competition_ids)} competiții "
+            f"pentru {len(teams)} echipe"
+        )
+        return len(event_ids)
+
+    async def find_team_events(
+        self,
+        team_name: str,
+        betfair_id: Optional[str] = None,
+        event_type_id: str = "1"
+    ) -> List[Dict[str, Any]]:
+        """
+        Evenimentele unei echipe: din indexul local dacă echipa e acoperită,
+        altfel prin listEvents(textQuery) cu numele și variantele fără sufix.
+
+        Args:
+            team_name: Numele echipei
+            betfair_id: Selection ID-ul echipei (opțional)
+            event_type_id: Tipul de eveniment (1=Football)
+
+        Returns:
+            Lista de evenimente (format listEvents)
+        """
+        if self.event_index.is_fresh(self.EVENT_INDEX_MAX_AGE):
+            events = self.event_index.lookup(team_name, betfair_id)
+            if events:
+                logger.debug(f"{team_name}: {len(events)} evenimente din index")
+                return events
+
+        for search_term in team_name_variants(team_name):
+            events = await self.list_events(event_type_id=event_type_id, text_query=search_term)
+            if events:
+                logger.info(f"Găsit evenimente cu search term: {search_term}")
+                return events
+
+        return []
+
+    def event_index_stats(self) -> Dict[str, Any]:
+        """Statistici pentru indexul de evenimente."""
+        return self.event_index.stats()
+
     async def list_market_catalogue(
         self,
         event_ids: List[str],
@@ -280,6 +805,7 @@ class BetfairClient:
     ) -> List[Dict[str, Any]]:
         """
         Listează piețele pentru evenimente.
+        Cererile concurente cu aceleași tipuri de piață sunt grupate într-un singur request.
 
         Args:
             event_ids: Lista de ID-uri evenimente
@@ -291,42 +817,119 @@ class BetfairClient:
         if market_type_codes is None:
             market_type_codes = ["MATCH_ODDS"]
 
+        if not event_ids:
+            return []
+
+        if self._coalesce_window <= 0:
+            return await self._fetch_market_catalogue(event_ids, market_type_codes)
+
+        key = tuple(sorted(market_type_codes))
+        coalescer = self._catalogue_coalescers.get(key)
+        if coalescer is None:
+            max_results = market_catalogue_max_results(self.MARKET_CATALOGUE_PROJECTION)
+            coalescer = RequestCoalescer(
+                name=f"listMarketCatalogue[{','.join(key)}]",
+                fetch_batch=lambda ids, codes=list(key): self._fetch_market_catalogue(ids, codes),
+                key_of=lambda market: market.get("event", {}).get("id"),
+                max_batch_size=max(1, max_results // len(key)),
+                window=self._coalesce_window
+            )
+            self._catalogue_coalescers[key] = coalescer
+
+        return await coalescer.fetch(event_ids)
+
+    async def _fetch_market_catalogue(
+        self,
+        event_ids: List[str],
+        market_type_codes: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Execută un singur listMarketCatalogue pentru un lot de evenimente."""
         params = {
             "filter": {
                 "eventIds": event_ids,
                 "marketTypeCodes": market_type_codes
             },
-            "maxResults": "100",
-            "marketProjection": [
-                "COMPETITION",
-                "EVENT",
-                "EVENT_TYPE",
-                "RUNNER_DESCRIPTION",
-                "MARKET_START_TIME"
-            ]
+            "maxResults": str(market_catalogue_max_results(self.MARKET_CATALOGUE_PROJECTION)),
+            "marketProjection": self.MARKET_CATALOGUE_PROJECTION
         }
 
         result = await self._api_request("listMarketCatalogue", params)
 
+        if isinstance(result, list):
+            self.event_index.learn(result)
+
         if "error" in result:
+            if result.get("errorCode") == "TOO_MUCH_DATA" and len(event_ids) > 1:
+                middle = len(event_ids) // 2
+                halves = await asyncio.gather(
+                    self._fetch_market_catalogue(event_ids[:middle], market_type_codes),
+                    self._fetch_market_catalogue(event_ids[middle:], market_type_codes)
+                )
+                return halves[0] + halves[1]
             return []
 
         return result if isinstance(result, list) else []
 
-    async def list_market_book(self, market_ids: List[str]) -> List[Dict[str, Any]]:
+    async def list_market_book(self, market_ids: List[str], subscribe: bool = True) -> List[Dict[str, Any]]:
         """
         Obține prețurile pentru piețe.
+        Cererile concurente sunt grupate în loturi care respectă limita de weight.
 
         Args:
             market_ids: Lista de ID-uri piețe
+            subscribe: Cu streaming activ, adaugă piețele citite prin REST la subscripție
+                (False pentru citiri de fundal, ca să nu evacueze piețele botului)
 
         Returns:
             Lista de market books cu prețuri
         """
+        if not market_ids:
+            return []
+
+        if self._stream is not None:
+            return await self._list_market_book_streamed(market_ids, subscribe)
+
+        if self._coalesce_window <= 0:
+            return await self._fetch_market_books(market_ids)
+
+        return await self._market_book_coalescer.fetch(market_ids)
+
+    async def _list_market_book_streamed(self, market_ids: List[str], subscribe: bool = True) -> List[Dict[str, Any]]:
+        """
+        Servește piețele din cache-ul de stream; cele lipsă sunt citite prin REST
+        și (cu subscribe) adăugate la subscripție, ca următoarele citiri să fie locale.
+        """
+        cached = {}
+        for market_id in market_ids:
+            book = self._stream.get_market_book(market_id)
+            if book is not None:
+                cached[market_id] = book
+
+        missing = [m for m in market_ids if m not in cached]
+        if missing:
+            if self._coalesce_window <= 0:
+                fetched = await self._fetch_market_books(missing)
+            else:
+                fetched = await self._market_book_coalescer.fetch(missing)
+            for book in fetched:
+                cached[book.get("marketId")] = book
+            if subscribe and self.is_connected():
+                await self._stream.subscribe(missing)
+
+        return [cached[m] for m in market_ids if m in cached]
+
+    async def _fetch_market_books(self, market_ids: List[str]) -> List[Dict[str, Any]]:
+        """Execută listMarketBook, împărțind ID-urile în loturi de weight maxim 200."""
+        batch_size = market_book_batch_size(self.MARKET_BOOK_PRICE_DATA)
+        if len(market_ids) > batch_size:
+            batches = [market_ids[i:i + batch_size] for i in range(0, len(market_ids), batch_size)]
+            results = await asyncio.gather(*(self._fetch_market_books(b) for b in batches))
+            return [book for books in results for book in books]
+
         params = {
             "marketIds": market_ids,
             "priceProjection": {
-                "priceData": ["EX_BEST_OFFERS"],
+                "priceData": self.MARKET_BOOK_PRICE_DATA,
                 "virtualise": True
             }
         }
@@ -334,6 +937,13 @@ class BetfairClient:
         result = await self._api_request("listMarketBook", params)
 
         if "error" in result:
+            if result.get("errorCode") == "TOO_MUCH_DATA" and len(market_ids) > 1:
+                middle = len(market_ids) // 2
+                halves = await asyncio.gather(
+                    self._fetch_market_books(market_ids[:middle]),
+                    self._fetch_market_books(market_ids[middle:])
+                )
+                return halves[0] + halves[1]
             return []
 
         return result if isinstance(result, list) else []
@@ -370,9 +980,14 @@ class BetfairClient:
             return []
 
         market_ids = [m["marketId"] for m in markets]
-        market_books = await self.list_market_book(market_ids)
+        frame = MarketBookFrame.from_books(await self.list_market_book(market_ids))
 
-        market_prices = {mb["marketId"]: mb for mb in market_books}
+        # Cotele gazdă / deplasare / egal (runnerii 0, 1, 2), citite vectorizat din frame
+        match_odds = [m for m in markets if m.get("marketName") == "Match Odds" and len(m.get("runners", [])) >= 3]
+        home_odds, away_odds, draw_odds = (
+            frame.back_prices({m["marketId"]: m["runners"][i].get("selectionId") for m in match_odds})
+            for i in range(3)
+        )
 
         matches = []
         for market in markets:
@@ -386,27 +1001,15 @@ class BetfairClient:
             if len(runners) < 3:
                 continue
 
-            market_book = market_prices.get(market["marketId"], {})
-            runner_prices = {
-                r["selectionId"]: r
-                for r in market_book.get("runners", [])
-            }
-
+            market_id = market["marketId"]
             home_runner = runners[0]
             away_runner = runners[1]
             draw_runner = runners[2]
 
-            def get_back_price(selection_id: int) -> Optional[float]:
-                runner = runner_prices.get(selection_id, {})
-                back_prices = runner.get("ex", {}).get("availableToBack", [])
-                if back_prices:
-                    return back_prices[0].get("price")
-                return None
-
             match = Match(
                 event_id=event.get("id", ""),
                 event_name=event.get("name", ""),
-                market_id=market["marketId"],
+                market_id=market_id,
                 competition_id=competition.get("id", ""),
                 competition_name=competition.get("name", ""),
                 start_time=datetime.fromisoformat(
@@ -417,10 +1020,10 @@ class BetfairClient:
                 home_selection_id=str(home_runner.get("selectionId", "")),
                 away_selection_id=str(away_runner.get("selectionId", "")),
                 draw_selection_id=str(draw_runner.get("selectionId", "")),
-                home_odds=get_back_price(home_runner.get("selectionId")),
-                away_odds=get_back_price(away_runner.get("selectionId")),
-                draw_odds=get_back_price(draw_runner.get("selectionId")),
-                total_matched=market_book.get("totalMatched", 0)
+                home_odds=home_odds.get(market_id),
+                away_odds=away_odds.get(market_id),
+                draw_odds=draw_odds.get(market_id),
+                total_matched=frame.total_matched_of(market_id)
             )
 
             matches.append(match)
@@ -448,89 +1051,241 @@ class BetfairClient:
         Returns:
             Răspunsul plasării
         """
+        results = await self.place_bets([
+            PlaceOrderRequest(
+                market_id=market_id,
+                selection_id=selection_id,
+                side=side,
+                size=stake,
+                price=odds
+            )
+        ])
+        return results[0]
+
+    async def place_bets(self, orders: List[PlaceOrderRequest]) -> List[PlaceOrderResponse]:
+        """
+        Plasează mai multe pariuri: instrucțiunile sunt grupate pe piață
+        (maxim MAX_INSTRUCTIONS_PER_ORDER per placeOrders), iar request-urile
+        pentru piețe diferite sunt trimise concurent.
+
+        Args:
+            orders: Ordinele de plasat
+
+        Returns:
+            Câte un răspuns pentru fiecare ordin, în ordinea primită
+        """
         # Use LIVE KEY for placing bets (if available), otherwise use regular app key
         live_key = os.environ.get("BETFAIR_LIVE_KEY") or self._app_key
         if not live_key:
             logger.error("BETFAIR_APP_KEY not configured - cannot place bets")
-            return PlaceOrderResponse(
-                success=False,
-                status="ERROR",
-                error_message="App key not configured"
-            )
+            return [
+                PlaceOrderResponse(
+                    success=False,
+                    status="ERROR",
+                    error_message="App key not configured"
+                )
+                for _ in orders
+            ]
+
+        orders = self._snap_order_prices(orders)
+
+        # Indexul fiecărui ordin, grupat pe piață
+        by_market: Dict[str, List[int]] = {}
+        for index, order in enumerate(orders):
+            by_market.setdefault(order.market_id, []).append(index)
+
+        chunks = []
+        for market_id, indexes in by_market.items():
+            for i in range(0, len(indexes), self.MAX_INSTRUCTIONS_PER_ORDER):
+                chunks.append((market_id, indexes[i:i + self.MAX_INSTRUCTIONS_PER_ORDER]))
+
+        if len(orders) > 1:
+            logger.info(f"Plasare grupată: {len(orders)} pariuri în {len(chunks)} request(uri) placeOrders")
+
+        responses: List[Optional[PlaceOrderResponse]] = [None] * len(orders)
+        chunk_results = await asyncio.gather(*(
+            self._place_orders_for_market(market_id, [orders[i] for i in indexes])
+            for market_id, indexes in chunks
+        ))
+        for (market_id, indexes), chunk_responses in zip(chunks, chunk_results):
+            for index, response in zip(indexes, chunk_responses):
+                responses[index] = response
+
+        return responses
+
+    @staticmethod
+    def _snap_order_prices(orders: List[PlaceOrderRequest]) -> List[PlaceOrderRequest]:
+        """
+        Aduce cotele ordinelor pe ladder-ul Betfair (BACK în jos, LAY în sus),
+        ca să nu fie respinse cu INVALID_ODDS.
+        """
+        prices = np.array([order.price for order in orders], dtype=float)
+        is_lay = np.array([order.side == "LAY" for order in orders], dtype=bool)
+        snapped = np.where(is_lay, snap_prices(prices, "LAY"), snap_prices(prices, "BACK"))
+
+        result = []
+        for order, price in zip(orders, snapped.tolist()):
+            if price != order.price:
+                logger.info(f"Cotă {order.price} ajustată la {price} (ladder Betfair) pentru {order.market_id}")
+                order = order.model_copy(update={"price": price})
+            result.append(order)
+        return result
+
+    async def _place_orders_for_market(
+        self,
+        market_id: str,
+        orders: List[PlaceOrderRequest],
+        retry_rejected: bool = True
+    ) -> List[PlaceOrderResponse]:
+        """
+        Un singur placeOrders pentru instrucțiunile unei piețe. Rapoartele
+        (instructionReports) vin în ordinea instrucțiunilor trimise.
+
+        Ordinele cu cote în afara ladder-ului sunt respinse local (INVALID_ODDS),
+        fără să fie trimise; altfel Betfair ar respinge tot request-ul.
+        """
+        invalid = [i for i, order in enumerate(orders) if not is_valid_price(order.price)]
+        if invalid:
+            responses: List[Optional[PlaceOrderResponse]] = [None] * len(orders)
+            for i in invalid:
+                logger.error(f"Cotă invalidă {orders[i].price} pentru {market_id}, ordin netrimis")
+                responses[i] = PlaceOrderResponse(
+                    success=False,
+                    status="ERROR",
+                    error_code="INVALID_ODDS",
+                    error_message=f"Cotă în afara ladder-ului Betfair: {orders[i].price}"
+                )
+            valid = [i for i in range(len(orders)) if responses[i] is None]
+            if valid:
+                sent = await self._place_orders_for_market(
+                    market_id, [orders[i] for i in valid], retry_rejected
+                )
+                for i, response in zip(valid, sent):
+                    responses[i] = response
+            return responses
 
         params = {
             "marketId": market_id,
-            "instructions": [{
-                "selectionId": selection_id,
-                "handicap": "0",
-                "side": side,
-                "orderType": "LIMIT",
-                "limitOrder": {
-                    "size": str(round(stake, 2)),
-                    "price": str(odds),
-                    "persistenceType": "LAPSE"
+            "instructions": [
+                {
+                    "selectionId": order.selection_id,
+                    "handicap": "0",
+                    "side": order.side,
+                    "orderType": order.order_type,
+                    "limitOrder": {
+                        "size": str(round(order.size, 2)),
+                        "price": format_price(order.price),
+                        "persistenceType": order.persistence_type
+                    }
                 }
-            }]
+                for order in orders
+            ]
         }
 
         # Use live key for placing orders
         result = await self._api_request("placeOrders", params, use_live_key=True)
 
         if "error" in result:
-            return PlaceOrderResponse(
-                success=False,
-                status="ERROR",
-                error_message=result.get("error", "Unknown error")
-            )
+            return [
+                PlaceOrderResponse(
+                    success=False,
+                    status="ERROR",
+                    error_code=result.get("errorCode"),
+                    error_message=result.get("error", "Unknown error")
+                )
+                for _ in orders
+            ]
 
         status = result.get("status", "FAILURE")
         instruction_reports = result.get("instructionReports", [])
-
-        if status == "SUCCESS" and instruction_reports:
-            report = instruction_reports[0]
-            return PlaceOrderResponse(
-                success=True,
-                bet_id=report.get("betId"),
-                status=report.get("status", "SUCCESS"),
-                size_matched=report.get("sizeMatched", 0),
-                average_price_matched=report.get("averagePriceMatched", 0),
-                placed_date=datetime.fromisoformat(
-                    report.get("placedDate", "").replace("Z", "+00:00")
-                ) if report.get("placedDate") else None
-            )
-        else:
-            error_code = result.get("errorCode", "UNKNOWN")
-            return PlaceOrderResponse(
-                success=False,
-                status="FAILURE",
-                error_code=error_code,
-                error_message=f"Plasare eșuată: {error_code}"
+        responses = []
+
+        for index, order in enumerate(orders):
+            report = instruction_reports[index] if index < len(instruction_reports) else {}
+
+            if report.get("status") == "SUCCESS" or (status == "SUCCESS" and report):
+                responses.append(PlaceOrderResponse(
+                    success=True,
+                    bet_id=report.get("betId"),
+                    status=report.get("status", "SUCCESS"),
+                    size_matched=report.get("sizeMatched", 0),
+                    average_price_matched=report.get("averagePriceMatched", 0),
+                    placed_date=datetime.fromisoformat(
+                        report.get("placedDate", "").replace("Z", "+00:00")
+                    ) if report.get("placedDate") else None
+                ))
+            else:
+                error_code = report.get("errorCode") or result.get("errorCode", "UNKNOWN")
+                responses.append(PlaceOrderResponse(
+                    success=False,
+                    status="FAILURE",
+                    error_code=error_code,
+                    error_message=f"Plasare eșuată: {error_code}"
+                ))
+
+        # Un ordin invalid respinge tot request-ul; celelalte (ERROR_IN_ORDER)
+        # sunt retrimise o singură dată, fără ordinele cu erori proprii
+        rejected = [i for i, r in enumerate(responses) if r.error_code == "ERROR_IN_ORDER"]
+        if retry_rejected and rejected and len(rejected) < len(orders):
+            logger.warning(f"placeOrders {market_id}: retrimit {len(rejected)} ordin(e) respinse din cauza altor instrucțiuni")
+            retried = await self._place_orders_for_market(
+                market_id, [orders[i] for i in rejected], retry_rejected=False
             )
+            for i, response in zip(rejected, retried):
+                responses[i] = response
+
+        return responses
 
     async def get_account_funds(self) -> Dict[str, Any]:
         """Obține fondurile din cont."""
         result = await self._api_request("getAccountFunds", {})
         return result
 
-    async def get_current_orders(self) -> List[Dict[str, Any]]:
+    async def get_current_orders(self, bet_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Obține pariurile curente (nefinalizate) din cont.
+        Obține pariurile curente (nefinalizate) din cont, toate paginile.
+
+        Args:
+            bet_ids: Doar aceste pariuri (opțional)
 
         Returns:
             Lista de pariuri active
         """
-        params = {
-            "orderProjection": "ALL",
-            "dateRange": {}
-        }
+        if bet_ids is not None and not bet_ids:
+            return []
+
+        if bet_ids is None:
+            id_chunks: List[Optional[List[str]]] = [None]
+        else:
+            size = self.CLEARED_ORDERS_BET_IDS_PER_REQUEST
+            id_chunks = [bet_ids[i:i + size] for i in range(0, len(bet_ids), size)]
+
+        orders = []
+        for chunk in id_chunks:
+            from_record = 0
+            while True:
+                params = {
+                    "orderProjection": "ALL",
+                    "dateRange": {},
+                    "fromRecord": from_record,
+                    "recordCount": self.CLEARED_ORDERS_PAGE_SIZE
+                }
+                if chunk:
+                    params["betIds"] = chunk
 
-        result = await self._api_request("listCurrentOrders", params)
+                result = await self._api_request("listCurrentOrders", params)
 
-        if "error" in result:
-            logger.error(f"Error getting current orders: {result.get('error')}")
-            return []
+                if "error" in result:
+                    logger.error(f"Error getting current orders: {result.get('error')}")
+                    return orders
+
+                page = result.get("currentOrders", [])
+                orders.extend(page)
+
+                if not result.get("moreAvailable") or not page:
+                    break
+                from_record += len(page)
 
-        orders = result.get("currentOrders", [])
         logger.info(f"Found {len(orders)} current orders")
         return orders
 
@@ -544,27 +1299,78 @@ class BetfairClient:
         Returns:
             Lista de pariuri finalizate
         """
-        from_date = (datetime.utcnow() - timedelta(days=days)).isoformat() + "Z"
-        to_date = datetime.utcnow().isoformat() + "Z"
-
-        params = {
-            "betStatus": "SETTLED",
-            "settledDateRange": {
-                "from": from_date,
-                "to": to_date
-            }
-        }
-
-        result = await self._api_request("listClearedOrders", params)
-
-        if "error" in result:
-            logger.error(f"Error getting settled orders: {result.get('error')}")
+        orders = []
+        try:
+            async for order in self.iter_cleared_orders(datetime.utcnow() - timedelta(days=days)):
+                orders.append(order)
+        except Exception as e:
+            logger.error(f"Error getting settled orders: {e}")
             return []
 
-        orders = result.get("clearedOrders", [])
         logger.info(f"Found {len(orders)} settled orders in last {days} days")
         return orders
 
+    async def iter_cleared_orders(
+        self,
+        settled_from: Optional[datetime] = None,
+        settled_to: Optional[datetime] = None,
+        bet_ids: Optional[List[str]] = None,
+        bet_status: str = "SETTLED"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Parcurge listClearedOrders pagină cu pagină (fromRecord / moreAvailable).
+
+        Args:
+            settled_from: Începutul intervalului settledDateRange (UTC; None = implicit Betfair, 90 zile)
+            settled_to: Sfârșitul intervalului (default: acum)
+            bet_ids: Doar aceste pariuri (None = toate; listă goală = niciunul)
+            bet_status: SETTLED, VOIDED, LAPSED sau CANCELLED
+
+        Yields:
+            Câte un cleared order
+
+        Raises:
+            Exception: dacă un request eșuează (paginarea nu poate continua)
+        """
+        if bet_ids is not None and not bet_ids:
+            return
+
+        date_range = {}
+        if settled_from is not None:
+            date_range["from"] = settled_from.isoformat() + "Z"
+        if settled_to is not None:
+            date_range["to"] = settled_to.isoformat() + "Z"
+
+        if bet_ids is None:
+            id_chunks: List[Optional[List[str]]] = [None]
+        else:
+            size = self.CLEARED_ORDERS_BET_IDS_PER_REQUEST
+            id_chunks = [bet_ids[i:i + size] for i in range(0, len(bet_ids), size)]
+
+        for chunk in id_chunks:
+            from_record = 0
+            while True:
+                params = {
+                    "betStatus": bet_status,
+                    "settledDateRange": date_range,
+                    "fromRecord": from_record,
+                    "recordCount": self.CLEARED_ORDERS_PAGE_SIZE
+                }
+                if chunk:
+                    params["betIds"] = chunk
+
+                result = await self._api_request("listClearedOrders", params)
+                if "error" in result:
+                    raise Exception(f"listClearedOrders: {result.get('errorCode') or result.get('error')}")
+
+                orders = result.get("clearedOrders", [])
+                for order in orders:
+                    yield order
+
+                if not result.get("moreAvailable") or not orders:
+                    break
+                from_record += len(orders)
+
     async def get_all_bets_summary(self) -> Dict[str, Any]:
         """
         Obține un rezumat al tuturor pariurilor (active + finalizate).
@@ -595,27 +1401,25 @@ class BetfairClient:
 
     async def keep_alive(self) -> bool:
         """
-        Menține session-ul Betfair activ prin verificarea periodică.
-        Apelează un endpoint simplu pentru a preveni expirarea token-ului.
+        Menține session-ul Betfair activ prin endpoint-ul identity keepAlive.
+        Dacă token-ul a expirat sau lipsește, face un nou login.
 
         Returns:
             True dacă session-ul este activ sau a fost reconectat cu succes
         """
-        try:
-            # Simple ping to keep session alive
-            result = await self.get_account_funds()
-
-            # If we got an error, try to reconnect
-            if "error" in result:
-                logger.warning("Keep-alive failed, attempting reconnect...")
-                return await self.connect()
+        if not self.is_connected():
+            return await self.connect()
 
+        if await self._session.keep_alive(self._get_http_client, self._app_key or ""):
             logger.info("Betfair session keep-alive successful")
             return True
 
-        except Exception as e:
-            logger.error(f"Keep-alive error: {e}, attempting reconnect...")
-            return await self.connect()
+        if self.is_connected():
+            # Eroare de rețea: token-ul nu a fost respins, se reîncearcă la următorul job
+            return False
+
+        logger.warning("Keep-alive failed, attempting reconnect...")
+        return await self.connect()
 
 
 betfair_client = BetfairClient()
@@ -626,6 +1430,41 @@ def auto_configure_betfair():
     from app.config import get_settings
     settings = get_settings()
 
+    betfair_client.configure_transport(
+        max_connections=settings.betfair_http_max_connections,
+        max_keepalive_connections=settings.betfair_http_max_keepalive,
+        keepalive_expiry=settings.betfair_http_keepalive_expiry,
+        timeout=settings.betfair_http_timeout,
+        http2=settings.betfair_http2
+    )
+    betfair_client.configure_batching(window_ms=settings.betfair_coalesce_window_ms)
+    betfair_client.configure_endpoints(
+        api_url=settings.betfair_api_url,
+        identity_url=settings.betfair_identity_url,
+        keep_alive_url=settings.betfair_keep_alive_url
+    )
+    betfair_client.configure_failover(
+        enabled=settings.betfair_failover_enabled,
+        hedge_reads=settings.betfair_hedge_reads,
+        failure_threshold=settings.betfair_circuit_failure_threshold,
+        reset_seconds=settings.betfair_circuit_reset_seconds,
+        hedge_min_delay_ms=settings.betfair_hedge_min_delay_ms
+    )
+    betfair_client.configure_recording(settings.betfair_record_dir)
+    betfair_client.configure_session(renew_after_minutes=settings.betfair_session_renew_minutes)
+    betfair_client.configure_event_cache(
+        ttl_minutes=settings.betfair_event_cache_ttl_minutes,
+        maxsize=settings.betfair_event_cache_size
+    )
+    betfair_client.configure_rate_limits(
+        navigation=settings.betfair_rate_navigation,
+        prices=settings.betfair_rate_prices,
+        orders=settings.betfair_rate_orders,
+        account=settings.betfair_rate_account,
+        max_retries=settings.betfair_max_retries,
+        backoff_base_ms=settings.betfair_backoff_base_ms
+    )
+
     if settings.betfair_app_key and settings.betfair_username and settings.betfair_password:
         betfair_client.configure(
             app_key=settings.betfair_app_key,
@@ -634,6 +1473,15 @@ def auto_configure_betfair():
             cert_path=settings.betfair_cert_path,
             key_path=settings.betfair_key_path
         )
+        betfair_client.configure_stream(
+            enabled=settings.betfair_stream_enabled,
+            host=settings.betfair_stream_host,
+            port=settings.betfair_stream_port,
+            use_ssl=settings.betfair_stream_ssl,
+            heartbeat_ms=settings.betfair_stream_heartbeat_ms,
+            conflate_ms=settings.betfair_stream_conflate_ms,
+            max_markets=settings.betfair_stream_max_markets
+        )
         logger.info("Betfair client auto-configured from environment variables")
     else:
         logger.warning("Betfair credentials not found in environment variables")
@@ -0,0 +1,253 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Citiri idempotente care pot fi trimise în paralel pe endpoint-ul secundar
+HEDGED_ENDPOINTS = {"listEvents", "listMarketCatalogue", "listMarketBook", "listClearedOrders"}
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker pentru un endpoint: după failure_threshold erori
+    consecutive (rețea / 5xx) endpoint-ul e ocolit reset_timeout secunde,
+    apoi un singur request de probă decide dacă revine în uz.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        if self._opened_at is None:
+            return CircuitState.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return CircuitState.HALF_OPEN
+        return CircuitState.OPEN
+
+    def available(self) -> bool:
+        """Verifică dacă un request poate fi trimis (în HALF_OPEN, doar proba)."""
+        state = self.state
+        return state == CircuitState.CLOSED or (state == CircuitState.HALF_OPEN and not self._probe_in_flight)
+
+    def begin(self) -> None:
+        """Marchează începutul unui request (în HALF_OPEN, acesta e proba)."""
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def abandon(self) -> None:
+        """Request anulat înainte de răspuns: nu contează nici ca succes, nici ca eroare."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info(f"Endpoint {self.name} disponibil din nou")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning(f"Endpoint {self.name} ocolit după {self._failures} erori consecutive")
+            self._opened_at = time.monotonic()
+
+
+class EndpointPool:
+    """
+    Endpoint-urile API-NG (primar + secundar) cu circuit breaker și latențe
+    per endpoint. Request-urile merg la primul endpoint disponibil; citirile
+    idempotente pot fi trimise și pe al doilea (hedging) dacă primul nu
+    răspunde în p95 din latențele recente.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge_min_delay: float = 0.2,
+        hedge_default_delay: float = 1.0,
+        latency_window: int = 200
+    ):
+        """
+        Args:
+            urls: Baza URL-urilor API-NG, în ordinea preferinței
+            failure_threshold: Erori consecutive după care endpoint-ul e ocolit
+            reset_timeout: Secunde până la request-ul de probă
+            hedge_min_delay: Pauza minimă înainte de request-ul pe secundar
+            hedge_default_delay: Pauza folosită până există destule latențe măsurate
+            latency_window: Câte latențe recente intră în calculul p95
+        """
+        self.urls = list(dict.fromkeys(u.rstrip("/") for u in urls if u))
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self._breakers = {
+            url: CircuitBreaker(url, failure_threshold, reset_timeout) for url in self.urls
+        }
+        self._latencies: Dict[str, Deque[float]] = {
+            url: deque(maxlen=latency_window) for url in self.urls
+        }
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def candidates(self) -> List[str]:
+        """Endpoint-urile disponibile, în ordinea preferinței (toate, dacă niciunul nu e)."""
+        available = [url for url in self.urls if self._breakers[url].available()]
+        return available or list(self.urls)
+
+    def p95(self, url: str) -> Optional[float]:
+        samples = self._latencies[url]
+        if len(samples) < 20:
+            return None
+        ordered = sorted(samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def hedge_delay(self, url: str) -> float:
+        """Cât se așteaptă răspunsul endpoint-ului înainte de request-ul pe secundar."""
+        p95 = self.p95(url)
+        return max(self.hedge_min_delay, p95 if p95 is not None else self.hedge_default_delay)
+
+    async def _observe(self, url: str, request: Awaitable[httpx.Response]) -> httpx.Response:
+        self._breakers[url].begin()
+        started = time.monotonic()
+        try:
+            response = await request
+        except httpx.TransportError:
+            self._breakers[url].record_failure()
+            metrics.inc("betfair_endpoint_failures_total", endpoint=url)
+            raise
+        except asyncio.CancelledError:
+            # Request-ul pierdut în hedging nu afectează starea endpoint-ului
+            self._breakers[url].abandon()
+            raise
+
+        if response.status_code >= 500:
+            self._breakers[url].record_failure()
+            metrics.inc("betfair_endpoint_failures_total", endpoint=url)
+        else:
+            self._breakers[url].record_success()
+            self._latencies[url].append(time.monotonic() - started)
+        return response
+
+    async def send(
+        self,
+        send: Callable[[str], Awaitable[httpx.Response]],
+        failover: bool,
+        hedge: bool = False
+    ) -> httpx.Response:
+        """
+        Trimite un request pe endpoint-urile disponibile.
+
+        Args:
+            send: Funcție care trimite request-ul la o bază URL
+            failover: Reîncearcă pe următorul endpoint la erori de rețea / 5xx
+                (doar pentru request-uri care pot fi repetate fără efecte)
+            hedge: Trimite și pe secundar dacă primul nu răspunde la timp
+
+        Returns:
+            Primul răspuns valid (sau ultimul răspuns 5xx)
+        """
+        urls = self.candidates()
+        if hedge and len(urls) > 1:
+            return await self._send_hedged(send, urls[0], urls[1])
+
+        last_error: Optional[Exception] = None
+        response: Optional[httpx.Response] = None
+        for url in urls if failover else urls[:1]:
+            try:
+                response = await self._observe(url, send(url))
+            except httpx.TransportError as e:
+                last_error = e
+                logger.warning(f"Endpoint {url} indisponibil: {e}")
+                continue
+            if response.status_code < 500:
+                return response
+
+        if response is not None:
+            return response
+        raise last_error
+
+    async def _send_hedged(
+        self,
+        send: Callable[[str], Awaitable[httpx.Response]],
+        primary: str,
+        secondary: str
+    ) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        tasks = {loop.create_task(self._observe(primary, send(primary))): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(primary))
+            for task in done:
+                if task.exception() is None and task.result().status_code < 500:
+                    return task.result()
+
+            self.hedged += 1
+            metrics.inc("betfair_hedged_requests_total")
+            tasks[loop.create_task(self._observe(secondary, send(secondary)))] = secondary
+
+            pending = {t for t in tasks if not t.done()}
+            last_error: Optional[BaseException] = None
+            last_response: Optional[httpx.Response] = None
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                else:
+                    last_response = task.result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code < 500:
+                        if tasks[task] == secondary:
+                            self.hedge_wins += 1
+                        return response
+                    last_response = response
+
+            if last_response is not None:
+                return last_response
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Starea fiecărui endpoint (pentru status/diagnoză)."""
+        return {
+            "endpoints": [
+                {
+                    "url": url,
+                    "state": self._breakers[url].state.value,
+                    "p95_ms": round(self.p95(url) * 1000, 1) if self.p95(url) is not None else None
+                }
+                for url in self.urls
+            ],
+            "hedged_requests": self.hedged,
+            "hedge_wins": self.hedge_wins
+        }
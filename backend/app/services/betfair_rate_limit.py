@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Dict, Optional
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Clasa de operație pentru fiecare endpoint API-NG (fiecare are bucket-ul ei)
+ENDPOINT_CLASSES = {
+    "listEventTypes": "navigation",
+    "listCompetitions": "navigation",
+    "listEvents": "navigation",
+    "listMarketCatalogue": "navigation",
+    "listMarketBook": "prices",
+    "listRunnerBook": "prices",
+    "placeOrders": "orders",
+    "cancelOrders": "orders",
+    "replaceOrders": "orders",
+    "updateOrders": "orders",
+    "listCurrentOrders": "account",
+    "listClearedOrders": "account",
+    "getAccountFunds": "account",
+}
+
+# Erori APING după care request-ul e reîncercat cu backoff
+RETRYABLE_ERRORS = {"TOO_MANY_REQUESTS", "SERVICE_BUSY", "TIMEOUT_ERROR", "UNEXPECTED_ERROR"}
+
+# Erori care înseamnă session expirat / invalid
+SESSION_ERRORS = {"INVALID_SESSION_INFORMATION", "NO_SESSION"}
+
+# Erori de configurare (app key greșit): nici re-login, nici reîncercare
+CONFIG_ERRORS = {"INVALID_APP_KEY"}
+
+# Erori care reduc rata bucket-ului (serverul ne cere să încetinim)
+THROTTLE_ERRORS = {"TOO_MANY_REQUESTS", "SERVICE_BUSY"}
+
+
+def parse_aping_error(text: str) -> Optional[str]:
+    """
+    Extrage errorCode dintr-un răspuns de eroare API-NG.
+
+    Răspunsul REST are forma:
+        {"faultcode": "Client", "faultstring": "DSC-0018",
+         "detail": {"APINGException": {"errorCode": "TOO_MUCH_DATA", ...}}}
+
+    Returns:
+        errorCode sau None dacă nu poate fi determinat
+    """
+    try:
+        data = json.loads(text)
+    except (ValueError, TypeError):
+        data = None
+
+    if isinstance(data, dict):
+        detail = data.get("detail") or {}
+        for exception in detail.values() if isinstance(detail, dict) else []:
+            if isinstance(exception, dict) and exception.get("errorCode"):
+                return exception["errorCode"]
+        if data.get("errorCode"):
+            return data["errorCode"]
+
+    for code in SESSION_ERRORS | RETRYABLE_ERRORS | CONFIG_ERRORS | {"TOO_MUCH_DATA"}:
+        if code in (text or ""):
+            return code
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket asincron cu rată adaptivă: rata scade la erori de throttling
+    și revine treptat după request-uri reușite.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float):
+        """
+        Args:
+            name: Clasa de operație (navigation, prices, orders, account)
+            rate: Request-uri pe secundă
+            capacity: Burst maxim
+        """
+        self.name = name
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Așteaptă un token.
+
+        Returns:
+            Timpul petrecut în așteptare (secunde)
+        """
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited = delay
+                self._refill()
+            self._tokens -= 1
+        return waited
+
+    def throttle(self) -> None:
+        """Înjumătățește rata (minim 10% din rata configurată) și golește burst-ul."""
+        self.rate = max(self.base_rate * 0.1, self.rate * 0.5)
+        self._tokens = min(self._tokens, 0)
+        logger.warning(f"Rate limit {self.name}: rata redusă la {self.rate:.2f} req/s")
+
+    def recover(self) -> None:
+        """Crește rata cu 5% din rata configurată, până la valoarea inițială."""
+        if self.rate < self.base_rate:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * 0.05)
+
+
+class RateGovernor:
+    """
+    Limitează request-urile Betfair pe clase de operații și calculează
+    backoff-ul exponențial cu jitter pentru reîncercări.
+    """
+
+    def __init__(
+        self,
+        rates: Dict[str, float],
+        burst: float = 2.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.25,
+        backoff_max: float = 8.0
+    ):
+        """
+        Args:
+            rates: Request-uri pe secundă per clasă de operație
+            burst: Capacitatea bucket-ului ca multiplu al ratei
+            max_retries: Numărul maxim de reîncercări pentru erori temporare
+            backoff_base: Prima pauză de backoff (secunde)
+            backoff_max: Pauza maximă de backoff (secunde)
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets = {
+            name: TokenBucket(name, rate, max(1.0, rate * burst))
+            for name, rate in rates.items()
+        }
+
+    def op_class(self, endpoint: str) -> str:
+        """Clasa de operație pentru un endpoint (default: navigation)."""
+        return ENDPOINT_CLASSES.get(endpoint, "navigation")
+
+    async def acquire(self, endpoint: str) -> None:
+        """Așteaptă permisiunea de a trimite un request către endpoint."""
+        op_class = self.op_class(endpoint)
+        bucket = self._buckets.get(op_class)
+        if bucket is None:
+            return
+        waited = await bucket.acquire()
+        if waited > 0:
+            metrics.inc("betfair_rate_limit_wait_seconds", waited, op_class=op_class)
+        metrics.set_gauge("betfair_rate_limit_rate", bucket.rate, op_class=op_class)
+
+    def record_success(self, endpoint: str) -> None:
+        bucket = self._buckets.get(self.op_class(endpoint))
+        if bucket is not None:
+            bucket.recover()
+
+    def record_error(self, endpoint: str, error_code: Optional[str]) -> None:
+        op_class = self.op_class(endpoint)
+        metrics.inc("betfair_api_errors_total", endpoint=endpoint, error_code=error_code or "UNKNOWN")
+        bucket = self._buckets.get(op_class)
+        if bucket is not None and error_code in THROTTLE_ERRORS:
+            bucket.throttle()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Pauza înainte de reîncercarea `attempt` (0-based): backoff exponențial
+        cu jitter între 50% și 100%, ca reîncercările concurente să nu se sincronizeze.
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def rates(self) -> Dict[str, float]:
+        """Rata curentă per clasă de operație."""
+        return {name: round(bucket.rate, 2) for name, bucket in self._buckets.items()}
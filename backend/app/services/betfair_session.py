@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import os
+import ssl
+import time
+from typing import Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class BetfairSessionManager:
+    """
+    Gestionează session token-ul Betfair:
+    - un singur login în desfășurare, oricâți apelanți concurenți (single-flight)
+    - vârsta token-ului și reînnoire proactivă prin endpoint-ul identity keepAlive
+    - contextul SSL cu certificatul client, construit o singură dată
+    """
+
+    def __init__(
+        self,
+        login_url: str,
+        keep_alive_url: str,
+        renew_after: float = 2 * 3600,
+        fallback_login_url: Optional[str] = None
+    ):
+        """
+        Args:
+            login_url: Endpoint-ul certlogin
+            keep_alive_url: Endpoint-ul identity keepAlive
+            renew_after: Secunde de la ultima reînnoire după care token-ul e reînnoit
+            fallback_login_url: Endpoint certlogin folosit dacă primul nu răspunde
+        """
+        self.login_url = login_url
+        self.fallback_login_url = fallback_login_url
+        self.keep_alive_url = keep_alive_url
+        self.renew_after = renew_after
+
+        self._token: Optional[str] = None
+        self._issued_at: Optional[float] = None
+        self._renewed_at: Optional[float] = None
+        self._login_task: Optional[asyncio.Task] = None
+        self._keep_alive_task: Optional[asyncio.Task] = None
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+        self.logins = 0
+        self.keep_alives = 0
+
+    @property
+    def token(self) -> Optional[str]:
+        """Session token-ul curent."""
+        return self._token
+
+    @property
+    def ssl_context(self) -> Optional[ssl.SSLContext]:
+        """Contextul SSL cu certificatul client (None dacă nu e configurat)."""
+        return self._ssl_context
+
+    def token_age(self) -> Optional[float]:
+        """Secunde de la obținerea token-ului prin login."""
+        if self._issued_at is None:
+            return None
+        return time.monotonic() - self._issued_at
+
+    def needs_renewal(self) -> bool:
+        """Verifică dacă token-ul trebuie reînnoit (keepAlive)."""
+        if self._token is None or self._renewed_at is None:
+            return False
+        return time.monotonic() - self._renewed_at >= self.renew_after
+
+    def build_ssl_context(
+        self,
+        cert_path: Optional[str],
+        key_path: Optional[str],
+        remove_files: bool = False
+    ) -> Optional[ssl.SSLContext]:
+        """
+        Construiește contextul SSL cu certificatul client o singură dată.
+
+        Args:
+            cert_path: Calea către certificat
+            key_path: Calea către cheie
+            remove_files: Șterge fișierele după încărcare (fișiere temporare din env)
+
+        Returns:
+            Contextul SSL sau None dacă certificatul nu a putut fi încărcat
+        """
+        if not cert_path or not key_path:
+            self._ssl_context = None
+            return None
+
+        try:
+            context = ssl.create_default_context()
+            context.load_cert_chain(cert_path, key_path)
+            self._ssl_context = context
+            logger.info("Context SSL Betfair creat din certificat")
+        except Exception as e:
+            logger.error(f"Nu s-a putut încărca certificatul Betfair: {e}")
+            self._ssl_context = None
+        finally:
+            if remove_files:
+                for path in (cert_path, key_path):
+                    if os.path.exists(path):
+                        os.unlink(path)
+
+        return self._ssl_context
+
+    def invalidate(self, token: Optional[str] = None) -> None:
+        """
+        Marchează token-ul ca invalid. Dacă se primește token-ul folosit de un
+        request eșuat și între timp a fost obținut altul, nu se invalidează nimic.
+        """
+        if token is not None and token != self._token:
+            return
+        self._token = None
+        self._issued_at = None
+        self._renewed_at = None
+
+    async def login(
+        self,
+        client_provider: Callable[[], httpx.AsyncClient],
+        app_key: str,
+        username: str,
+        password: str
+    ) -> bool:
+        """
+        Autentificare certlogin. Apelurile concurente așteaptă același login.
+
+        Returns:
+            True dacă există un token valid după login
+        """
+        if self._login_task is None or self._login_task.done():
+            self._login_task = asyncio.get_running_loop().create_task(
+                self._do_login(client_provider(), app_key, username, password)
+            )
+        return await asyncio.shield(self._login_task)
+
+    async def _do_login(self, client: httpx.AsyncClient, app_key: str, username: str, password: str) -> bool:
+        self.logins += 1
+        urls = [url for url in (self.login_url, self.fallback_login_url) if url]
+        for index, url in enumerate(urls):
+            try:
+                response = await client.post(
+                    url,
+                    headers={"X-Application": app_key},
+                    data={"username": username, "password": password}
+                )
+            except httpx.TransportError as e:
+                if index == len(urls) - 1:
+                    raise
+                logger.warning(f"Login {url} indisponibil ({e}), încerc {urls[index + 1]}")
+                continue
+            if response.status_code >= 500 and index < len(urls) - 1:
+                logger.warning(f"Login {url}: HTTP {response.status_code}, încerc {urls[index + 1]}")
+                continue
+            break
+        result = response.json()
+
+        if result.get("loginStatus") == "SUCCESS":
+            self._token = result.get("sessionToken")
+            self._issued_at = time.monotonic()
+            self._renewed_at = self._issued_at
+            logger.info("Autentificat la Betfair API")
+            return True
+
+        logger.error(f"Autentificare eșuată: {result.get('loginStatus')}")
+        self.invalidate()
+        return False
+
+    async def keep_alive(self, client_provider: Callable[[], httpx.AsyncClient], app_key: str) -> bool:
+        """
+        Prelungește session-ul prin identity keepAlive. Apelurile concurente
+        folosesc același request.
+
+        Returns:
+            True dacă session-ul a fost prelungit
+        """
+        if self._token is None:
+            return False
+        if self._keep_alive_task is None or self._keep_alive_task.done():
+            self._keep_alive_task = asyncio.get_running_loop().create_task(
+                self._do_keep_alive(client_provider(), app_key)
+            )
+        return await asyncio.shield(self._keep_alive_task)
+
+    async def _do_keep_alive(self, client: httpx.AsyncClient, app_key: str) -> bool:
+        token = self._token
+        self.keep_alives += 1
+        try:
+            response = await client.post(
+                self.keep_alive_url,
+                headers={
+                    "Accept": "application/json",
+                    "X-Application": app_key,
+                    "X-Authentication": token or ""
+                }
+            )
+            result = response.json()
+        except Exception as e:
+            logger.error(f"Eroare keepAlive Betfair: {e}")
+            return False
+
+        if result.get("status") == "SUCCESS":
+            if token == self._token:
+                self._token = result.get("token") or token
+                self._renewed_at = time.monotonic()
+            logger.info("Session Betfair prelungit (keepAlive)")
+            return True
+
+        logger.warning(f"keepAlive eșuat: {result.get('error')}")
+        self.invalidate(token)
+        return False
+
+    def renew_in_background(self, client_provider: Callable[[], httpx.AsyncClient], app_key: str) -> None:
+        """Pornește un keepAlive fără a bloca request-ul curent."""
+        if self._keep_alive_task is None or self._keep_alive_task.done():
+            self._keep_alive_task = asyncio.get_running_loop().create_task(
+                self._do_keep_alive(client_provider(), app_key)
+            )
@@ -0,0 +1,425 @@
+import asyncio
+import json
+import logging
+import ssl
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MarketCache:
+    """
+    Cache în memorie cu prețurile piețelor, construit din mesajele `mcm` ale
+    Exchange Stream API. Returnează market books în același format ca listMarketBook.
+    """
+
+    # Câmpurile ladder din stream (bdatb/bdatl = prețuri virtuale, ca "virtualise": True)
+    BACK_FIELDS = ("bdatb", "batb")
+    LAY_FIELDS = ("bdatl", "batl")
+
+    def __init__(self):
+        self._markets: Dict[str, Dict[str, Any]] = {}
+
+    def clear(self) -> None:
+        """Golește cache-ul (la o imagine nouă de subscripție)."""
+        self._markets.clear()
+
+    def market_ids(self) -> List[str]:
+        """Returnează ID-urile piețelor din cache."""
+        return list(self._markets.keys())
+
+    def has(self, market_id: str) -> bool:
+        """Verifică dacă piața există în cache."""
+        return market_id in self._markets
+
+    def apply_market_change(self, mc: Dict[str, Any], publish_time: Optional[int] = None) -> None:
+        """
+        Aplică o modificare de piață (element din `mc`).
+
+        Args:
+            mc: Market change din mesajul `mcm`
+            publish_time: Timestamp-ul mesajului (ms)
+        """
+        market_id = mc.get("id")
+        if not market_id:
+            return
+
+        if mc.get("img") or market_id not in self._markets:
+            self._markets[market_id] = {"status": "OPEN", "tv": 0.0, "runners": {}}
+
+        market = self._markets[market_id]
+        market["updated_at"] = time.time()
+        if publish_time:
+            market["publish_time"] = publish_time
+
+        definition = mc.get("marketDefinition")
+        if definition:
+            market["status"] = definition.get("status", market["status"])
+            market["inPlay"] = definition.get("inPlay", False)
+            for rd in definition.get("runners", []):
+                runner = self._get_runner(market, rd.get("id"))
+                runner["status"] = rd.get("status", runner["status"])
+
+        if "tv" in mc:
+            market["tv"] = mc["tv"]
+
+        for rc in mc.get("rc", []):
+            runner = self._get_runner(market, rc.get("id"))
+            if rc.get("img"):
+                runner["back"].clear()
+                runner["lay"].clear()
+            for field in self.BACK_FIELDS:
+                self._apply_ladder(runner["back"], rc.get(field))
+            for field in self.LAY_FIELDS:
+                self._apply_ladder(runner["lay"], rc.get(field))
+            if "ltp" in rc:
+                runner["ltp"] = rc["ltp"]
+            if "tv" in rc:
+                runner["tv"] = rc["tv"]
+
+    def _get_runner(self, market: Dict[str, Any], selection_id: Optional[int]) -> Dict[str, Any]:
+        runners = market["runners"]
+        if selection_id not in runners:
+            runners[selection_id] = {"status": "ACTIVE", "back": {}, "lay": {}, "ltp": None, "tv": 0.0}
+        return runners[selection_id]
+
+    @staticmethod
+    def _apply_ladder(ladder: Dict[int, List[float]], changes: Optional[List[List[float]]]) -> None:
+        """Aplică delta-uri [level, price, size] pe un ladder; size 0 șterge nivelul."""
+        if not changes:
+            return
+        for level, price, size in changes:
+            level = int(level)
+            if size == 0:
+                ladder.pop(level, None)
+            else:
+                ladder[level] = [price, size]
+
+    def get_market_book(self, market_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returnează piața în formatul listMarketBook.
+
+        Args:
+            market_id: ID-ul pieței
+
+        Returns:
+            Market book sau None dacă piața nu e în cache
+        """
+        market = self._markets.get(market_id)
+        if market is None:
+            return None
+
+        runners = []
+        for selection_id, runner in market["runners"].items():
+            runners.append({
+                "selectionId": selection_id,
+                "status": runner["status"],
+                "lastPriceTraded": runner["ltp"],
+                "totalMatched": runner["tv"],
+                "ex": {
+                    "availableToBack": [
+                        {"price": price, "size": size}
+                        for _, (price, size) in sorted(runner["back"].items())
+                    ],
+                    "availableToLay": [
+                        {"price": price, "size": size}
+                        for _, (price, size) in sorted(runner["lay"].items())
+                    ]
+                }
+            })
+
+        return {
+            "marketId": market_id,
+            "status": market["status"],
+            "inplay": market.get("inPlay", False),
+            "totalMatched": market["tv"],
+            "runners": runners
+        }
+
+    def get_back_price(self, market_id: str, selection_id: Any) -> Optional[float]:
+        """Returnează cea mai bună cotă BACK pentru o selecție din cache."""
+        market = self._markets.get(market_id)
+        if market is None:
+            return None
+        for key in (selection_id, _as_int(selection_id)):
+            runner = market["runners"].get(key)
+            if runner and runner["back"]:
+                return runner["back"][min(runner["back"])][0]
+        return None
+
+
+def _as_int(value: Any) -> Any:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class MarketStreamClient:
+    """
+    Client pentru Betfair Exchange Stream API (subscripție la piețe).
+
+    Protocol: socket SSL, mesaje JSON delimitate de CRLF. După autentificare
+    trimite `marketSubscription`, apoi primește `mcm` cu imagini (`img`) și
+    delta-uri. La reconectare retrimite subscripția cu `initialClk`/`clk`
+    pentru a primi doar modificările pierdute.
+    """
+
+    STREAM_FIELDS = ["EX_BEST_OFFERS_DISP", "EX_LTP", "EX_TRADED_VOL", "EX_MARKET_DEF"]
+
+    def __init__(
+        self,
+        host: str = "stream-api.betfair.com",
+        port: int = 443,
+        use_ssl: bool = True,
+        heartbeat_ms: int = 5000,
+        conflate_ms: int = 0,
+        ladder_levels: int = 3,
+        max_markets: int = 200,
+        resubscribe_delay: float = 0.5
+    ):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.heartbeat_ms = heartbeat_ms
+        self.conflate_ms = conflate_ms
+        self.ladder_levels = ladder_levels
+        self.max_markets = max_markets
+        self.resubscribe_delay = resubscribe_delay
+
+        self.cache = MarketCache()
+
+        self._app_key: Optional[str] = None
+        self._token_provider: Optional[Callable[[], Optional[str]]] = None
+        self._on_auth_failure: Optional[Callable[[], Any]] = None
+
+        self._market_ids: Dict[str, None] = {}
+        self._subscribed_ids: List[str] = []
+        self._initial_clk: Optional[str] = None
+        self._clk: Optional[str] = None
+        self._message_id = 0
+
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._run_task: Optional[asyncio.Task] = None
+        self._resubscribe_task: Optional[asyncio.Task] = None
+        self._authenticated = False
+        self._last_message_at = 0.0
+        self._stopping = False
+
+        self.messages_received = 0
+        self.reconnects = 0
+
+    def set_credentials(
+        self,
+        app_key: str,
+        token_provider: Callable[[], Optional[str]],
+        on_auth_failure: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """
+        Setează credențialele folosite la autentificarea pe stream.
+
+        Args:
+            app_key: Betfair Application Key
+            token_provider: Funcție care returnează session token-ul curent
+            on_auth_failure: Corutină apelată când token-ul este respins (re-login)
+        """
+        self._app_key = app_key
+        self._token_provider = token_provider
+        self._on_auth_failure = on_auth_failure
+
+    def is_running(self) -> bool:
+        """Verifică dacă bucla de stream rulează."""
+        return self._run_task is not None and not self._run_task.done()
+
+    def is_live(self) -> bool:
+        """
+        Verifică dacă datele din cache sunt actuale: conexiune autentificată
+        și un mesaj (inclusiv heartbeat) primit recent.
+        """
+        max_silence = max(3 * self.heartbeat_ms / 1000.0, 5.0)
+        return (
+            self._authenticated
+            and self._writer is not None
+            and time.time() - self._last_message_at < max_silence
+        )
+
+    def get_market_book(self, market_id: str) -> Optional[Dict[str, Any]]:
+        """Returnează piața din cache doar dacă stream-ul este live și piața e subscrisă."""
+        if not self.is_live() or market_id not in self._subscribed_ids:
+            return None
+        return self.cache.get_market_book(market_id)
+
+    async def start(self) -> None:
+        """Pornește bucla de conectare/reconectare în background."""
+        if self.is_running():
+            return
+        self._stopping = False
+        self._run_task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Stream Betfair pornit ({self.host}:{self.port})")
+
+    async def stop(self) -> None:
+        """Oprește stream-ul și închide conexiunea."""
+        self._stopping = True
+        for task in (self._resubscribe_task, self._run_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._run_task = None
+        self._resubscribe_task = None
+        await self._close_writer()
+        logger.info("Stream Betfair oprit")
+
+    async def subscribe(self, market_ids: List[str]) -> None:
+        """
+        Adaugă piețe la subscripție. Cererile apropiate în timp sunt grupate
+        într-o singură re-subscripție.
+
+        Args:
+            market_ids: ID-urile piețelor de urmărit
+        """
+        new_ids = [m for m in market_ids if m and m not in self._market_ids]
+        if not new_ids:
+            return
+
+        for market_id in new_ids:
+            self._market_ids[market_id] = None
+
+        # Păstrăm cele mai recente piețe în limita conexiunii
+        while len(self._market_ids) > self.max_markets:
+            self._market_ids.pop(next(iter(self._market_ids)))
+
+        if not self.is_running():
+            await self.start()
+            return
+
+        if self._resubscribe_task is None or self._resubscribe_task.done():
+            self._resubscribe_task = asyncio.get_running_loop().create_task(self._delayed_resubscribe())
+
+    async def _delayed_resubscribe(self) -> None:
+        await asyncio.sleep(self.resubscribe_delay)
+        if self._authenticated:
+            # Set nou de piețe = subscripție nouă, fără clk (primim imagine completă)
+            self._initial_clk = None
+            self._clk = None
+            await self._send_subscription()
+
+    async def _run(self) -> None:
+        """Bucla principală: conectare, citire mesaje, reconectare cu backoff."""
+        backoff = 1.0
+        while not self._stopping:
+            try:
+                await self._connect_and_read()
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Stream Betfair deconectat: {e}")
+
+            self._authenticated = False
+            await self._close_writer()
+
+            if self._stopping:
+                break
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _connect_and_read(self) -> None:
+        ssl_context = ssl.create_default_context() if self.use_ssl else None
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=ssl_context, limit=16 * 1024 * 1024
+        )
+        self._writer = writer
+
+        await self._send({
+            "op": "authentication",
+            "appKey": self._app_key or "",
+            "session": (self._token_provider() if self._token_provider else None) or ""
+        })
+
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            self._last_message_at = time.time()
+            self.messages_received += 1
+            await self._handle_message(json.loads(line))
+
+    async def _handle_message(self, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+
+        if op == "connection":
+            logger.info(f"Stream Betfair conectat: {message.get('connectionId')}")
+
+        elif op == "status":
+            if message.get("statusCode") == "FAILURE":
+                error_code = message.get("errorCode", "")
+                logger.error(f"Stream Betfair eroare: {error_code} - {message.get('errorMessage')}")
+                if error_code in ("INVALID_SESSION_INFORMATION", "NO_SESSION", "NOT_AUTHORIZED"):
+                    if self._on_auth_failure:
+                        await self._on_auth_failure()
+                if message.get("connectionClosed"):
+                    raise ConnectionError(error_code or "connection closed")
+            elif not self._authenticated:
+                self._authenticated = True
+                if self._market_ids:
+                    await self._send_subscription(resume=True)
+
+        elif op == "mcm":
+            self._handle_mcm(message)
+
+    def _handle_mcm(self, message: Dict[str, Any]) -> None:
+        ct = message.get("ct")
+
+        if ct == "SUB_IMAGE" and message.get("segmentType") in (None, "SEG_START"):
+            self.cache.clear()
+
+        if "initialClk" in message:
+            self._initial_clk = message["initialClk"]
+        if "clk" in message:
+            self._clk = message["clk"]
+
+        for mc in message.get("mc", []):
+            self.cache.apply_market_change(mc, message.get("pt"))
+
+    async def _send_subscription(self, resume: bool = False) -> None:
+        """Trimite marketSubscription; cu resume=True include clk pentru RESUB_DELTA."""
+        self._subscribed_ids = list(self._market_ids.keys())
+        subscription: Dict[str, Any] = {
+            "op": "marketSubscription",
+            "marketFilter": {"marketIds": self._subscribed_ids},
+            "marketDataFilter": {
+                "fields": self.STREAM_FIELDS,
+                "ladderLevels": self.ladder_levels
+            },
+            "heartbeatMs": self.heartbeat_ms
+        }
+        if self.conflate_ms:
+            subscription["conflateMs"] = self.conflate_ms
+        resume = resume and bool(self._initial_clk and self._clk)
+        if resume:
+            subscription["initialClk"] = self._initial_clk
+            subscription["clk"] = self._clk
+
+        await self._send(subscription)
+        logger.info(f"Subscripție stream: {len(self._subscribed_ids)} piețe (resume={resume})")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if self._writer is None:
+            return
+        self._message_id += 1
+        message["id"] = self._message_id
+        self._writer.write(json.dumps(message).encode("utf-8") + b"\r\n")
+        await self._writer.drain()
+
+    async def _close_writer(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
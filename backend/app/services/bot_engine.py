@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
@@ -5,9 +6,13 @@ from uuid import uuid4
 
 from app.models.schemas import (
     Team, TeamStatus, Bet, BetStatus, BetCreate,
-    Match, BotState, BotStatus, DashboardStats
+    Match, BotState, BotStatus, DashboardStats,
+    PlaceOrderRequest, PlaceOrderResponse
 )
 from app.services.staking import staking_service
+from app.services.event_index import team_name_variants
+from app.services.tick_ladder import snap_price
+from app.services.metrics import metrics, PhaseTimer
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -24,6 +29,7 @@ class BotEngine:
         self.state = BotState()
         self._teams: Dict[str, Team] = {}
         self._bets: Dict[str, Bet] = {}
+        self._team_locks: Dict[str, asyncio.Lock] = {}
         self._betfair_client = None
         self._sheets_client = None
 
@@ -60,19 +66,19 @@ class BotEngine:
         logger.info("Bot oprit")
         return True
 
-    def get_all_teams(self) -> List[Team]:
+    async def get_all_teams(self) -> List[Team]:
         """Returnează toate echipele din Google Sheets (Index - fără statistici pentru a evita rate limit)."""
-        from app.services.google_sheets import google_sheets_client
+        from app.services.google_sheets import async_google_sheets_client
 
-        if not google_sheets_client.is_connected():
-            google_sheets_client.connect()
+        if not async_google_sheets_client.is_connected():
+            await async_google_sheets_client.connect()
 
-        if not google_sheets_client.is_connected():
+        if not async_google_sheets_client.is_ready():
             logger.warning("Google Sheets nu este conectat")
             return list(self._teams.values())
 
         try:
-            teams_data = google_sheets_client.load_teams()
+            teams_data = await async_google_sheets_client.load_teams()
             teams = []
 
             for team_data in teams_data:
@@ -141,14 +147,14 @@ class BotEngine:
         logger.info(f"Echipă actualizată: {team.name}")
         return team
 
-    def delete_team(self, team_id: str) -> bool:
+    async def delete_team(self, team_id: str) -> bool:
         """Șterge o echipă din Google Sheets."""
-        from app.services.google_sheets import google_sheets_client
+        from app.services.google_sheets import async_google_sheets_client
 
         if team_id in self._teams:
             self._teams.pop(team_id)
 
-        success = google_sheets_client.delete_team(team_id)
+        success = await async_google_sheets_client.delete_team(team_id)
         if success:
             logger.info(f"Echipă ștearsă: {team_id}")
         return success
@@ -345,14 +351,30 @@ class BotEngine:
             f"Rezultat: {bet.result}, Pierdere cumulată: {team.cumulative_loss}"
         )
 
-    def get_dashboard_stats(self) -> DashboardStats:
-        """Calculează statisticile pentru dashboard din Google Sheets (cu cache 60s)."""
-        from app.services.google_sheets import google_sheets_client
+    async def get_dashboard_stats(self) -> DashboardStats:
+        """
+        Statisticile pentru dashboard, din cache-ul de citiri Google Sheets:
+        recalculate o singură dată pentru apelanții concurenți, servite vechi
+        cât se recalculează după expirare și invalidate la fiecare scriere.
+        """
+        from app.services.google_sheets import async_google_sheets_client
+
+        stats = await async_google_sheets_client.cached(
+            "dashboard_stats",
+            self._compute_dashboard_stats,
+            ttl=self.settings.stats_cache_ttl_seconds
+        )
+        if stats is None:
+            return DashboardStats(
+                total_teams=0, active_teams=0, total_bets=0,
+                won_bets=0, lost_bets=0, pending_bets=0,
+                total_profit=0.0, win_rate=0.0, total_staked=0.0
+            )
+        return stats
 
-        cache_key = "dashboard_stats"
-        cached = google_sheets_client._get_cached(cache_key)
-        if cached is not None:
-            return cached
+    async def _compute_dashboard_stats(self) -> Optional[DashboardStats]:
+        """Calculează statisticile pentru dashboard (None dacă Google Sheets nu e disponibil)."""
+        from app.services.google_sheets import async_google_sheets_client
 
         total_teams = 0
         active_teams = 0
@@ -363,30 +385,24 @@ class BotEngine:
         total_staked = 0.0
 
         try:
-            if not google_sheets_client.is_connected():
-                google_sheets_client.connect()
+            if not async_google_sheets_client.is_connected():
+                await async_google_sheets_client.connect()
 
-            if not google_sheets_client.is_connected():
+            if not async_google_sheets_client.is_ready():
                 logger.warning("Google Sheets nu este conectat pentru stats")
-                return DashboardStats(
-                    total_teams=0, active_teams=0, total_bets=0,
-                    won_bets=0, lost_bets=0, pending_bets=0,
-                    total_profit=0.0, win_rate=0.0, total_staked=0.0
-                )
+                return None
 
-            teams_data = google_sheets_client.load_teams()
+            teams_data = await async_google_sheets_client.load_teams()
             total_teams = len(teams_data)
             active_teams = len([t for t in teams_data if t.get("status") == "active"])
 
-            for team_data in teams_data:
-                team_name = team_data.get("name", "")
-                if not team_name:
-                    continue
+            # Toate sheet-urile echipelor într-o singură citire
+            records_by_team = await async_google_sheets_client.load_team_records(
+                [t.get("name", "") for t in teams_data if t.get("name")]
+            )
 
+            for team_name, all_records in records_by_team.items():
                 try:
-                    sheet = google_sheets_client._spreadsheet.worksheet(team_name)
-                    all_records = sheet.get_all_records()
-
                     for match in all_records:
                         status = str(match.get("Status", "")).strip().upper()
                         stake = 0.0
@@ -424,7 +440,7 @@ class BotEngine:
         settled_bets = won_bets + lost_bets
         win_rate = (won_bets / settled_bets * 100) if settled_bets > 0 else 0.0
 
-        result = DashboardStats(
+        return DashboardStats(
             total_teams=total_teams,
             active_teams=active_teams,
             total_bets=total_bets,
@@ -436,9 +452,6 @@ class BotEngine:
             total_staked=round(total_staked, 2)
         )
 
-        google_sheets_client._set_cached(cache_key, result)
-        return result
-
     async def run_cycle(self) -> Dict[str, Any]:
         """
         Execută un ciclu complet al botului:
@@ -448,6 +461,10 @@ class BotEngine:
         4. Plasează pariurile
         5. Actualizează Google Sheets
         """
+        with metrics.phases("run_cycle") as phases:
+            return await self._run_cycle(phases)
+
+    async def _run_cycle(self, phases: PhaseTimer) -> Dict[str, Any]:
         # Start bot if not running
         if self.state.status != BotStatus.RUNNING:
             self.state.status = BotStatus.RUNNING
@@ -468,27 +485,31 @@ class BotEngine:
         }
 
         try:
-            from app.services.google_sheets import google_sheets_client
+            from app.services.google_sheets import async_google_sheets_client
             from app.services.betfair_client import betfair_client
             from datetime import date
 
+            phases.phase("load_teams")
+
             # Connect to Google Sheets
-            if not google_sheets_client.is_connected():
-                google_sheets_client.connect()
+            if not async_google_sheets_client.is_connected():
+                await async_google_sheets_client.connect()
 
-            if not google_sheets_client.is_connected():
+            if not async_google_sheets_client.is_ready():
                 results["success"] = False
                 results["message"] = "Nu s-a putut conecta la Google Sheets"
                 return results
 
             # Load teams from Google Sheets
-            teams_data = google_sheets_client.load_teams()
+            teams_data = await async_google_sheets_client.load_teams()
             results["teams_checked"] = len(teams_data)
 
             if not teams_data:
                 results["message"] = "Nu există echipe în Google Sheets"
                 return results
 
+            phases.phase("betfair_connect")
+
             # Connect to Betfair
             if not betfair_client.is_connected():
                 await betfair_client.connect()
@@ -500,216 +521,338 @@ class BotEngine:
 
             logger.info("Verificare meciuri PROGRAMAT pentru toate echipele active")
 
+            phases.phase("discover_events")
+
+            # Index echipă -> evenimente din competițiile echipelor (câteva request-uri în total)
+            await betfair_client.discover_events([
+                (t.get("name", ""), str(t.get("betfair_id") or "") or None)
+                for t in teams_data if t.get("status") == "active"
+            ])
+
+            # Faza 1: pregătire (meci, piață, runner, cotă, miză) pentru echipele active,
+            # în paralel, limitată de BOT_MAX_CONCURRENT_TEAMS
+            phases.phase("prepare")
+            # O singură pregătire per echipă: lock-ul echipei rămâne luat până după
+            # gather, deci două rânduri cu același nume (normalizat) s-ar bloca reciproc
+            active_teams = {}
             for team_data in teams_data:
-                team_name = team_data.get("name", "")
                 if team_data.get("status") != "active":
                     continue
+                key = team_data.get("name", "").strip().lower()
+                if key in active_teams:
+                    logger.warning(f"Echipă duplicată în Index, sărită: {team_data.get('name', '')!r}")
+                    continue
+                active_teams[key] = team_data
 
-                try:
-                    # IMPORTANT: Verifică dacă echipa are deja un pariu PENDING
-                    # Dacă da, NU plasa alt pariu până nu se rezolvă cel curent!
-                    pending_bets = google_sheets_client.get_pending_bets(team_name)
-                    if pending_bets:
-                        logger.info(f"Skip {team_name} - are deja {len(pending_bets)} pariu(ri) PENDING")
-                        continue
+            semaphore = asyncio.Semaphore(self.settings.bot_max_concurrent_teams)
+            prepared_all = await asyncio.gather(*(
+                self._prepare_team_bet_locked(team_data, results, semaphore)
+                for team_data in active_teams.values()
+            ))
+            prepared = [bet for bet in prepared_all if bet]
 
-                    # Get scheduled matches from team's sheet
-                    scheduled_matches = google_sheets_client.get_scheduled_matches(team_name)
+            try:
+                # Faza 2: plasare grupată - un placeOrders per piață, trimise concurent
+                phases.phase("place")
+                place_results = []
+                if prepared:
+                    place_results = await betfair_client.place_bets([bet["order"] for bet in prepared])
+
+                # Faza 3: înregistrare rezultate în Google Sheets
+                phases.phase("record")
+                for bet, place_result in zip(prepared, place_results):
+                    try:
+                        await self._record_bet_result(bet, place_result, results)
+                    except Exception as e:
+                        error_msg = f"Eroare procesare {bet['team_name']}: {str(e)}"
+                        logger.error(error_msg)
+                        results["errors"].append(error_msg)
+            finally:
+                for bet in prepared:
+                    bet["lock"].release()
 
-                    if not scheduled_matches:
-                        logger.info(f"Nu există meciuri programate pentru {team_name}")
-                        continue
+            results["message"] = f"Ciclu complet: {results['bets_placed']} pariuri plasate"
 
-                    # Sort matches by date and take only the first one (closest date)
-                    sorted_matches = sorted(scheduled_matches, key=lambda x: x.get("Data", ""))
-                    match = sorted_matches[0] if sorted_matches else None
+        except Exception as e:
+            self.state.status = BotStatus.ERROR
+            self.state.last_error = str(e)
+            results["success"] = False
+            results["message"] = f"Eroare critică: {str(e)}"
+            logger.error(f"Eroare critică în ciclul botului: {e}")
 
-                    if not match:
-                        continue
+        return results
 
-                    event_name = match.get("Meci", "")
-                    match_date_str = match.get("Data", "")  # Format: 2025-11-29T21:45
-                    odds_str = match.get("Cotă", "")
+    def _team_lock(self, team_name: str) -> asyncio.Lock:
+        """Lock-ul unei echipe: un singur flux de plasare (ciclu sau echipă nouă) odată."""
+        key = team_name.strip().lower()
+        lock = self._team_locks.get(key)
+        if lock is None:
+            lock = self._team_locks[key] = asyncio.Lock()
+        return lock
 
-                    if not odds_str:
-                        logger.warning(f"Lipsește cota pentru {event_name}")
-                        continue
+    async def _prepare_team_bet_locked(
+        self,
+        team_data: Dict[str, Any],
+        results: Dict[str, Any],
+        semaphore: asyncio.Semaphore
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pregătește pariul unei echipe ținând lock-ul echipei. Dacă există un pariu
+        pregătit, lock-ul rămâne luat (bet["lock"]) până după înregistrarea rezultatului.
+        """
+        lock = self._team_lock(team_data.get("name", ""))
+        await lock.acquire()
+        try:
+            async with semaphore:
+                bet = await self._prepare_team_bet(team_data, results)
+        except BaseException:
+            lock.release()
+            raise
+
+        if bet is None:
+            lock.release()
+            return None
 
-                    try:
-                        odds = float(odds_str)
-                    except:
-                        logger.warning(f"Cotă invalidă pentru {event_name}: {odds_str}")
-                        continue
+        bet["lock"] = lock
+        return bet
 
-                    results["matches_found"] += 1
+    async def _prepare_team_bet(self, team_data: Dict[str, Any], results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Faza de pregătire a ciclului pentru o echipă: meciul programat, evenimentul
+        și piața Betfair, runner-ul echipei, cota și miza.
 
-                    # Calculate stake - folosim miza inițială per echipă
-                    cumulative_loss = float(team_data.get("cumulative_loss", 0))
-                    progression_step = int(team_data.get("progression_step", 0))
-                    team_initial_stake = float(team_data.get("initial_stake", 5))
+        Args:
+            team_data: Datele echipei din Index
+            results: Rezultatele ciclului (contoare și erori)
 
-                    stake, stop_loss = staking_service.calculate_stake(
-                        cumulative_loss, odds, progression_step, team_initial_stake
-                    )
+        Returns:
+            Pariul pregătit pentru plasare sau None dacă echipa e sărită
+        """
+        from app.services.google_sheets import async_google_sheets_client
+        from app.services.betfair_client import betfair_client
 
-                    logger.info(f"{team_name}: initial_stake={team_initial_stake}, loss={cumulative_loss}, step={progression_step} => miză={stake}")
+        team_name = team_data.get("name", "")
 
-                    if stop_loss:
-                        logger.warning(f"Stop loss atins pentru {team_name}")
-                        continue
+        try:
+            # IMPORTANT: Verifică dacă echipa are deja un pariu PENDING
+            # Dacă da, NU plasa alt pariu până nu se rezolvă cel curent!
+            pending_bets = await async_google_sheets_client.get_pending_bets(team_name)
+            if pending_bets:
+                logger.info(f"Skip {team_name} - are deja {len(pending_bets)} pariu(ri) PENDING")
+                return None
 
-                    logger.info(f"Plasare pariu: {team_name} - {event_name} - Miză: {stake} @ {odds}")
-
-                    # Find market on Betfair and place bet
-                    # Extract main team name (remove FC, United, etc for better matching)
-                    search_terms = [team_name]
-                    # Try without common suffixes
-                    for suffix in [" FC", " United FC", " United"]:
-                        if team_name.endswith(suffix):
-                            search_terms.append(team_name[:-len(suffix)])
-
-                    events = None
-                    for search_term in search_terms:
-                        events = await betfair_client.list_events(
-                            event_type_id="1",
-                            text_query=search_term
-                        )
-                        if events:
-                            logger.info(f"Găsit evenimente cu search term: {search_term}")
-                            break
+            # Get scheduled matches from team's sheet
+            scheduled_matches = await async_google_sheets_client.get_scheduled_matches(team_name)
 
-                    if not events:
-                        logger.warning(f"Nu s-a găsit evenimentul pe Betfair: {event_name}")
-                        continue
+            if not scheduled_matches:
+                logger.info(f"Nu există meciuri programate pentru {team_name}")
+                return None
 
-                    # Find matching event BY DATE
-                    # Extragem doar data (YYYY-MM-DD) din match_date_str pentru comparare
-                    match_date_only = match_date_str[:10] if match_date_str else ""  # "2025-11-29"
+            # Sort matches by date and take only the first one (closest date)
+            sorted_matches = sorted(scheduled_matches, key=lambda x: x.get("Data", ""))
+            match = sorted_matches[0] if sorted_matches else None
 
-                    event_id = None
-                    matched_event_name = None
-                    # Skip keywords pentru echipe rezerve/tineret
-                    skip_keywords = ["(Res)", "U19", "U20", "U21", "U23", "Women", "Feminin", "II", "B)", "(W)"]
+            if not match:
+                return None
 
-                    for ev in events:
-                        ev_data = ev.get("event", {})
-                        ev_name = ev_data.get("name", "")
-                        ev_open_date = ev_data.get("openDate", "")  # "2025-12-04T20:00:00.000Z"
-                        ev_date_only = ev_open_date[:10] if ev_open_date else ""  # "2025-12-04"
+            event_name = match.get("Meci", "")
+            match_date_str = match.get("Data", "")  # Format: 2025-11-29T21:45
+            odds_str = match.get("Cotă", "")
 
-                        # Skip echipe feminine/tineret
-                        if any(kw in ev_name for kw in skip_keywords):
-                            continue
+            if not odds_str:
+                logger.warning(f"Lipsește cota pentru {event_name}")
+                return None
 
-                        # Verificăm dacă numele se potrivește ȘI data e aceeași
-                        name_matches = False
-                        for search_term in search_terms:
-                            if search_term.lower() in ev_name.lower():
-                                name_matches = True
-                                break
+            try:
+                odds = snap_price(float(odds_str), "BACK")
+            except:
+                logger.warning(f"Cotă invalidă pentru {event_name}: {odds_str}")
+                return None
 
-                        if name_matches and ev_date_only == match_date_only:
-                            event_id = ev_data.get("id")
-                            matched_event_name = ev_name
-                            logger.info(f"Match găsit cu data corectă: {ev_name} (event_id: {event_id}, data: {ev_date_only})")
-                            break
-                        elif name_matches:
-                            logger.info(f"Eveniment găsit dar data nu se potrivește: {ev_name} (Betfair: {ev_date_only}, Sheets: {match_date_only})")
+            results["matches_found"] += 1
 
-                    if not event_id:
-                        logger.warning(f"Nu s-a găsit event_id pentru {team_name} cu data {match_date_only}")
-                        continue
+            # Calculate stake - folosim miza inițială per echipă
+            cumulative_loss = float(team_data.get("cumulative_loss", 0))
+            progression_step = int(team_data.get("progression_step", 0))
+            team_initial_stake = float(team_data.get("initial_stake", 5))
 
-                    # Get market
-                    markets = await betfair_client.list_market_catalogue(
-                        event_ids=[event_id],
-                        market_type_codes=["MATCH_ODDS"]
-                    )
+            stake, stop_loss = staking_service.calculate_stake(
+                cumulative_loss, odds, progression_step, team_initial_stake
+            )
 
-                    if not markets:
-                        logger.warning(f"Nu s-a găsit piața pentru {event_name}")
-                        continue
+            logger.info(f"{team_name}: initial_stake={team_initial_stake}, loss={cumulative_loss}, step={progression_step} => miză={stake}")
 
-                    market = markets[0]
-                    market_id = market.get("marketId", "")
+            if stop_loss:
+                logger.warning(f"Stop loss atins pentru {team_name}")
+                return None
 
-                    # Get selection ID - găsim runner-ul care conține numele echipei noastre
-                    runners = market.get("runners", [])
-                    if not runners:
-                        logger.warning(f"Nu s-au găsit runners pentru {event_name}")
-                        continue
+            logger.info(f"Plasare pariu: {team_name} - {event_name} - Miză: {stake} @ {odds}")
 
-                    # Căutăm runner-ul echipei noastre (nu primul runner!)
-                    selection_id = None
-                    selected_runner_name = None
-                    for runner in runners:
-                        runner_name = runner.get("runnerName", "")
-                        # Verificăm dacă numele echipei se potrivește EXACT cu runner-ul
-                        for search_term in search_terms:
-                            if search_term.lower() == runner_name.lower():
-                                selection_id = str(runner.get("selectionId", ""))
-                                selected_runner_name = runner_name
-                                break
-                        if selection_id:
-                            break
+            # Find market on Betfair and place bet
+            # Extract main team name (remove FC, United, etc for better matching)
+            search_terms = team_name_variants(team_name)
+            events = await betfair_client.find_team_events(
+                team_name, str(team_data.get("betfair_id") or "") or None
+            )
 
-                    if not selection_id:
-                        logger.warning(f"Nu s-a găsit runner pentru echipa {team_name} în meciul {event_name}")
-                        logger.warning(f"  Runners disponibili: {[r.get('runnerName') for r in runners]}")
-                        continue
+            if not events:
+                logger.warning(f"Nu s-a găsit evenimentul pe Betfair: {event_name}")
+                return None
 
-                    logger.info(f"Selectat runner: {selected_runner_name} (ID: {selection_id}) pentru {team_name}")
+            # Find matching event BY DATE
+            # Extragem doar data (YYYY-MM-DD) din match_date_str pentru comparare
+            match_date_only = match_date_str[:10] if match_date_str else ""  # "2025-11-29"
 
-                    # Place bet
-                    place_result = await betfair_client.place_bet(
-                        market_id=market_id,
-                        selection_id=selection_id,
-                        stake=stake,
-                        odds=odds
-                    )
+            event_id = None
+            matched_event_name = None
+            # Skip keywords pentru echipe rezerve/tineret
+            skip_keywords = ["(Res)", "U19", "U20", "U21", "U23", "Women", "Feminin", "II", "B)", "(W)"]
 
-                    if place_result.success:
-                        results["bets_placed"] += 1
-                        results["total_stake"] += stake
-                        self.state.bets_placed_today += 1
-                        self.state.total_stake_today += stake
-
-                        # Update Google Sheets - match status
-                        google_sheets_client.update_match_status(
-                            team_name, event_name, "PENDING",
-                            stake=stake, bet_id=place_result.bet_id
-                        )
-
-                        # Update last_stake în Index
-                        google_sheets_client.update_last_stake(team_name, stake)
-
-                        logger.info(
-                            f"Pariu plasat: {team_name} - {event_name} - "
-                            f"Miză: {stake} RON @ {odds} - Bet ID: {place_result.bet_id}"
-                        )
-                    else:
-                        results["errors"].append(
-                            f"Eroare plasare pariu {team_name}: {place_result.error_message}"
-                        )
-                        google_sheets_client.update_match_status(
-                            team_name, event_name, "ERROR"
-                        )
+            for ev in events:
+                ev_data = ev.get("event", {})
+                ev_name = ev_data.get("name", "")
+                ev_open_date = ev_data.get("openDate", "")  # "2025-12-04T20:00:00.000Z"
+                ev_date_only = ev_open_date[:10] if ev_open_date else ""  # "2025-12-04"
 
-                except Exception as e:
-                    error_msg = f"Eroare procesare {team_name}: {str(e)}"
-                    logger.error(error_msg)
-                    results["errors"].append(error_msg)
+                # Skip echipe feminine/tineret
+                if any(kw in ev_name for kw in skip_keywords):
+                    continue
 
-            results["message"] = f"Ciclu complet: {results['bets_placed']} pariuri plasate"
+                # Verificăm dacă numele se potrivește ȘI data e aceeași
+                name_matches = False
+                for search_term in search_terms:
+                    if search_term.lower() in ev_name.lower():
+                        name_matches = True
+                        break
+
+                if name_matches and ev_date_only == match_date_only:
+                    event_id = ev_data.get("id")
+                    matched_event_name = ev_name
+                    logger.info(f"Match găsit cu data corectă: {ev_name} (event_id: {event_id}, data: {ev_date_only})")
+                    break
+                elif name_matches:
+                    logger.info(f"Eveniment găsit dar data nu se potrivește: {ev_name} (Betfair: {ev_date_only}, Sheets: {match_date_only})")
+
+            if not event_id:
+                logger.warning(f"Nu s-a găsit event_id pentru {team_name} cu data {match_date_only}")
+                return None
+
+            # Get market
+            markets = await betfair_client.list_market_catalogue(
+                event_ids=[event_id],
+                market_type_codes=["MATCH_ODDS"]
+            )
+
+            if not markets:
+                logger.warning(f"Nu s-a găsit piața pentru {event_name}")
+                return None
+
+            market = markets[0]
+            market_id = market.get("marketId", "")
+
+            # Get selection ID - găsim runner-ul care conține numele echipei noastre
+            runners = market.get("runners", [])
+            if not runners:
+                logger.warning(f"Nu s-au găsit runners pentru {event_name}")
+                return None
+
+            # Căutăm runner-ul echipei noastre (nu primul runner!)
+            selection_id = None
+            selected_runner_name = None
+            for runner in runners:
+                runner_name = runner.get("runnerName", "")
+                # Verificăm dacă numele echipei se potrivește EXACT cu runner-ul
+                for search_term in search_terms:
+                    if search_term.lower() == runner_name.lower():
+                        selection_id = str(runner.get("selectionId", ""))
+                        selected_runner_name = runner_name
+                        break
+                if selection_id:
+                    break
+
+            if not selection_id:
+                logger.warning(f"Nu s-a găsit runner pentru echipa {team_name} în meciul {event_name}")
+                logger.warning(f"  Runners disponibili: {[r.get('runnerName') for r in runners]}")
+                return None
+
+            logger.info(f"Selectat runner: {selected_runner_name} (ID: {selection_id}) pentru {team_name}")
+
+            # Cota live din cache-ul de stream (fără request în rețea), dacă e disponibilă
+            live_odds = betfair_client.get_cached_back_price(market_id, selection_id)
+            live_odds = snap_price(live_odds, "BACK") if live_odds else None
+            if live_odds and live_odds > 1.0 and live_odds != odds:
+                logger.info(f"Cotă live din stream pentru {team_name}: {live_odds} (Sheets: {odds})")
+                odds = live_odds
+                stake, stop_loss = staking_service.calculate_stake(
+                    cumulative_loss, odds, progression_step, team_initial_stake
+                )
+
+            if stop_loss:
+                logger.warning(f"Stop loss atins pentru {team_name}")
+                return None
+
+            return {
+                "team_name": team_name,
+                "event_name": event_name,
+                "stake": stake,
+                "odds": odds,
+                "order": PlaceOrderRequest(
+                    market_id=market_id,
+                    selection_id=selection_id,
+                    size=stake,
+                    price=odds
+                )
+            }
 
         except Exception as e:
-            self.state.status = BotStatus.ERROR
-            self.state.last_error = str(e)
-            results["success"] = False
-            results["message"] = f"Eroare critică: {str(e)}"
-            logger.error(f"Eroare critică în ciclul botului: {e}")
+            error_msg = f"Eroare procesare {team_name}: {str(e)}"
+            logger.error(error_msg)
+            results["errors"].append(error_msg)
+            return None
 
-        return results
+    async def _record_bet_result(
+        self,
+        bet: Dict[str, Any],
+        place_result: PlaceOrderResponse,
+        results: Dict[str, Any]
+    ) -> None:
+        """
+        Faza de înregistrare: actualizează contoarele ciclului și Google Sheets
+        cu rezultatul plasării unui pariu.
+        """
+        from app.services.google_sheets import async_google_sheets_client
+
+        team_name = bet["team_name"]
+        event_name = bet["event_name"]
+        stake = bet["stake"]
+        odds = bet["odds"]
+
+        if place_result.success:
+            results["bets_placed"] += 1
+            results["total_stake"] += stake
+            self.state.bets_placed_today += 1
+            self.state.total_stake_today += stake
+
+            # Update Google Sheets - match status
+            await async_google_sheets_client.update_match_status(
+                team_name, event_name, "PENDING",
+                stake=stake, bet_id=place_result.bet_id
+            )
+
+            # Update last_stake în Index
+            await async_google_sheets_client.update_last_stake(team_name, stake)
+
+            logger.info(
+                f"Pariu plasat: {team_name} - {event_name} - "
+                f"Miză: {stake} RON @ {odds} - Bet ID: {place_result.bet_id}"
+            )
+        else:
+            results["errors"].append(
+                f"Eroare plasare pariu {team_name}: {place_result.error_message}"
+            )
+            await async_google_sheets_client.update_match_status(
+                team_name, event_name, "ERROR"
+            )
 
     async def place_bet_for_team(self, team_name: str, initial_stake: float) -> bool:
         """
@@ -722,23 +865,35 @@ class BotEngine:
         Returns:
             True dacă pariul a fost plasat cu succes
         """
-        from app.services.google_sheets import google_sheets_client
+        # Același lock ca run_cycle: echipa nu poate primi două pariuri în paralel
+        async with self._team_lock(team_name):
+            return await self._place_bet_for_team(team_name, initial_stake)
+
+    async def _place_bet_for_team(self, team_name: str, initial_stake: float) -> bool:
+        """Plasarea efectivă pentru place_bet_for_team (apelată cu lock-ul echipei luat)."""
+        from app.services.google_sheets import async_google_sheets_client
         from app.services.betfair_client import betfair_client
         from app.services.staking import staking_service
 
         try:
             # Connect to services
-            if not google_sheets_client.is_connected():
-                google_sheets_client.connect()
+            if not async_google_sheets_client.is_connected():
+                await async_google_sheets_client.connect()
             if not betfair_client.is_connected():
                 await betfair_client.connect()
 
-            if not google_sheets_client.is_connected() or not betfair_client.is_connected():
+            if not async_google_sheets_client.is_ready() or not betfair_client.is_connected():
                 logger.warning(f"Nu s-a putut conecta la servicii pentru {team_name}")
                 return False
 
+            # Ciclul programat poate să fi plasat deja un pariu pentru echipă
+            pending_bets = await async_google_sheets_client.get_pending_bets(team_name)
+            if pending_bets:
+                logger.info(f"Skip {team_name} - are deja {len(pending_bets)} pariu(ri) PENDING")
+                return False
+
             # Get scheduled matches
-            scheduled_matches = google_sheets_client.get_scheduled_matches(team_name)
+            scheduled_matches = await async_google_sheets_client.get_scheduled_matches(team_name)
             if not scheduled_matches:
                 logger.info(f"Nu există meciuri programate pentru {team_name}")
                 return False
@@ -758,7 +913,7 @@ class BotEngine:
                 return False
 
             try:
-                odds = float(odds_str)
+                odds = snap_price(float(odds_str), "BACK")
             except:
                 logger.warning(f"Cotă invalidă pentru {event_name}: {odds_str}")
                 return False
@@ -772,17 +927,9 @@ class BotEngine:
 
             logger.info(f"Plasare pariu imediat: {team_name} - {event_name} - Miză: {stake} @ {odds}")
 
-            # Find event on Betfair
-            search_terms = [team_name]
-            for suffix in [" FC", " United FC", " United"]:
-                if team_name.endswith(suffix):
-                    search_terms.append(team_name[:-len(suffix)])
-
-            events = None
-            for search_term in search_terms:
-                events = await betfair_client.list_events(event_type_id="1", text_query=search_term)
-                if events:
-                    break
+            # Find event on Betfair (index local sau căutare text)
+            search_terms = team_name_variants(team_name)
+            events = await betfair_client.find_team_events(team_name)
 
             if not events:
                 logger.warning(f"Nu s-a găsit evenimentul pe Betfair: {event_name}")
@@ -844,13 +991,13 @@ class BotEngine:
             )
 
             if place_result.success:
-                google_sheets_client.update_match_status(team_name, event_name, "PENDING", stake=stake, bet_id=place_result.bet_id)
-                google_sheets_client.update_last_stake(team_name, stake)
+                await async_google_sheets_client.update_match_status(team_name, event_name, "PENDING", stake=stake, bet_id=place_result.bet_id)
+                await async_google_sheets_client.update_last_stake(team_name, stake)
                 logger.info(f"Pariu plasat cu succes: {team_name} - {event_name} - Miză: {stake} RON @ {odds}")
                 return True
             else:
                 logger.error(f"Eroare plasare pariu {team_name}: {place_result.error_message}")
-                google_sheets_client.update_match_status(team_name, event_name, "ERROR")
+                await async_google_sheets_client.update_match_status(team_name, event_name, "ERROR")
                 return False
 
         except Exception as e:
@@ -871,6 +1018,10 @@ class BotEngine:
         Returns:
             Dict cu rezultatele verificării
         """
+        with metrics.phases("check_bet_results") as phases:
+            return await self._check_bet_results(phases)
+
+    async def _check_bet_results(self, phases: PhaseTimer) -> Dict[str, Any]:
         results = {
             "success": True,
             "timestamp": datetime.utcnow().isoformat(),
@@ -879,24 +1030,31 @@ class BotEngine:
             "won": 0,
             "lost": 0,
             "still_pending": 0,
+            "live": 0,
+            "lapsed": 0,
+            "missing": 0,
             "errors": []
         }
 
         try:
-            from app.services.google_sheets import google_sheets_client
+            from app.services.google_sheets import async_google_sheets_client
             from app.services.betfair_client import betfair_client
+            from app.services.settlement_feed import settlement_feed
+            from app.services.reconciliation import PendingBetState, reconcile_pending_bets
+
+            phases.phase("load_pending")
 
             # Connect to Google Sheets
-            if not google_sheets_client.is_connected():
-                google_sheets_client.connect()
+            if not async_google_sheets_client.is_connected():
+                await async_google_sheets_client.connect()
 
-            if not google_sheets_client.is_connected():
+            if not async_google_sheets_client.is_ready():
                 results["success"] = False
                 results["message"] = "Nu s-a putut conecta la Google Sheets"
                 return results
 
             # Get pending bets from Google Sheets
-            pending_bets = google_sheets_client.get_pending_bets()
+            pending_bets = await async_google_sheets_client.get_pending_bets()
             results["pending_checked"] = len(pending_bets)
 
             if not pending_bets:
@@ -905,6 +1063,8 @@ class BotEngine:
 
             logger.info(f"Verificare {len(pending_bets)} pariuri PENDING")
 
+            phases.phase("betfair_connect")
+
             # Connect to Betfair
             if not betfair_client.is_connected():
                 await betfair_client.connect()
@@ -914,8 +1074,14 @@ class BotEngine:
                 results["message"] = "Nu s-a putut conecta la Betfair"
                 return results
 
-            # Get settled orders from Betfair (ultimele 3 zile pentru siguranță)
-            settled_orders = await betfair_client.get_settled_orders(days=3)
+            # Settlement-uri noi (de la ultimul watermark) doar pentru pariurile PENDING
+            phases.phase("settlements")
+            pending_ids = list(dict.fromkeys(
+                str(bet.get("Bet ID", "")) for bet in pending_bets if bet.get("Bet ID")
+            ))
+            settled_orders = []
+            async for order in settlement_feed.iter_settlements(betfair_client, pending_ids):
+                settled_orders.append(order)
 
             # Create a map of bet_id -> settled order
             settled_map = {}
@@ -924,7 +1090,7 @@ class BotEngine:
                 if bet_id:
                     settled_map[bet_id] = order
 
-            logger.info(f"Găsite {len(settled_map)} ordine settled pe Betfair (ultimele 3 zile)")
+            logger.info(f"Găsite {len(settled_map)} ordine settled pe Betfair pentru pariurile PENDING")
 
             # Log detaliat pentru debugging
             if settled_orders:
@@ -937,7 +1103,14 @@ class BotEngine:
             for bet in pending_bets:
                 logger.info(f"  Team: {bet.get('team_name')}, Bet ID: {bet.get('Bet ID')}, Meci: {bet.get('Meci')}")
 
+            # Starea fiecărui pariu PENDING: settled / live / lapsed / lipsă (câte un request per sursă)
+            phases.phase("reconcile")
+            reconciliation = await reconcile_pending_bets(betfair_client, pending_ids, settled_orders)
+            results.update({key: value for key, value in reconciliation.counts().items() if key != "settled"})
+
             # Check each pending bet
+            phases.phase("update_sheets")
+            unsaved_settlements = 0
             for bet in pending_bets:
                 bet_id = str(bet.get("Bet ID", ""))
                 team_name = bet.get("team_name", "")
@@ -948,9 +1121,11 @@ class BotEngine:
                     logger.warning(f"Skip pariu invalid: bet_id={bet_id}, team={team_name}")
                     continue
 
-                if bet_id in settled_map:
+                state, order = reconciliation.classify(bet_id)
+
+                if state == PendingBetState.SETTLED:
                     # Bet is settled
-                    settled_order = settled_map[bet_id]
+                    settled_order = order
                     profit = float(settled_order.get("profit", 0))
 
                     if profit > 0:
@@ -968,23 +1143,30 @@ class BotEngine:
 
                     results["settled_found"] += 1
 
-                    # Update Google Sheets
-                    google_sheets_client.update_bet_result(team_name, bet_id, status, profit)
-                    google_sheets_client.update_team_progression_after_result(team_name, won, stake, profit)
+                    # Update Google Sheets (progresia doar dacă rezultatul a fost salvat,
+                    # altfel pariul rămâne PENDING și ar fi aplicat din nou la următoarea verificare)
+                    if not await async_google_sheets_client.update_bet_result(team_name, bet_id, status, profit):
+                        unsaved_settlements += 1
+                        logger.error(f"Rezultatul pariului {bet_id} ({team_name}) nu a putut fi salvat - watermark-ul nu avansează")
+                        continue
+                    await async_google_sheets_client.update_team_progression_after_result(team_name, won, stake, profit)
 
                 else:
                     # Still pending - log mai detaliat
                     results["still_pending"] += 1
-                    logger.info(f"Pariu încă în așteptare: {team_name} - {meci} - Bet ID: {bet_id} (nu e în settled_map)")
+                    logger.info(f"Pariu încă în așteptare: {team_name} - {meci} - Bet ID: {bet_id} (nu e settled)")
 
-                    # Verifică dacă pariul există măcar în current orders
-                    current_orders = await betfair_client.get_current_orders()
-                    found_in_current = any(str(o.get('betId')) == bet_id for o in current_orders)
-                    if found_in_current:
+                    if state == PendingBetState.LIVE:
                         logger.info(f"  → Pariul {bet_id} există în CURRENT ORDERS (meci în desfășurare sau neterminat)")
+                    elif state == PendingBetState.LAPSED:
+                        logger.warning(f"  → Pariul {bet_id} a fost {order.get('betStatus', 'LAPSED')} pe Betfair (nu a fost matched)")
                     else:
                         logger.warning(f"  → Pariul {bet_id} NU există nici în current orders! Posibil problemă.")
 
+            # Toate settlement-urile au fost salvate: următoarea verificare pornește de aici
+            if unsaved_settlements == 0:
+                settlement_feed.commit()
+
             results["message"] = f"Verificare completă: {results['won']} WIN, {results['lost']} LOST, {results['still_pending']} în așteptare"
 
         except Exception as e:
@@ -1003,6 +1185,10 @@ class BotEngine:
         Returns:
             Dict cu rezultatele actualizării
         """
+        with metrics.phases("refresh_team_matches") as phases:
+            return await self._refresh_all_team_matches(phases)
+
+    async def _refresh_all_team_matches(self, phases: PhaseTimer) -> Dict[str, Any]:
         results = {
             "success": True,
             "timestamp": datetime.utcnow().isoformat(),
@@ -1012,15 +1198,19 @@ class BotEngine:
         }
 
         try:
-            from app.services.google_sheets import google_sheets_client
+            from app.services.google_sheets import async_google_sheets_client
             from app.services.betfair_client import betfair_client
+            from app.services.market_frame import MarketBookFrame
+            from app.services.odds_history import odds_recorder
             import pytz
 
+            phases.phase("connect")
+
             # Connect to services
-            if not google_sheets_client.is_connected():
-                google_sheets_client.connect()
+            if not async_google_sheets_client.is_connected():
+                await async_google_sheets_client.connect()
 
-            if not google_sheets_client.is_connected():
+            if not async_google_sheets_client.is_ready():
                 results["success"] = False
                 results["message"] = "Nu s-a putut conecta la Google Sheets"
                 return results
@@ -1034,114 +1224,124 @@ class BotEngine:
                 return results
 
             # Get all active teams from Index
-            teams_data = google_sheets_client.load_teams()
+            phases.phase("load_teams")
+            teams_data = await async_google_sheets_client.load_teams()
             active_teams = [t for t in teams_data if t.get("status") == "active"]
 
             logger.info(f"Actualizare meciuri pentru {len(active_teams)} echipe active")
 
+            phases.phase("discover_events")
+            await betfair_client.discover_events([
+                (t.get("name", ""), str(t.get("betfair_id") or "") or None) for t in active_teams
+            ])
+
             # Skip keywords pentru echipe rezerve/tineret
             skip_keywords = ["(Res)", "U19", "U20", "U21", "U23", "Women", "Feminin", "II", "B)", "(W)"]
 
+            phases.phase("teams")
             for team_data in active_teams:
                 team_name = team_data.get("name", "")
                 betfair_id = team_data.get("betfair_id", "")
 
                 try:
-                    # Get events from Betfair
-                    events = await betfair_client.list_events(
-                        event_type_id="1",
-                        text_query=team_name
-                    )
+                    # Get events from Betfair (index local sau căutare text)
+                    events = await betfair_client.find_team_events(team_name, str(betfair_id or "") or None)
 
                     if not events:
                         logger.info(f"Nu s-au găsit evenimente pentru {team_name}")
                         continue
 
+                    # Evenimentele candidate (fără rezerve/tineret)
+                    candidate_events = []
+                    for event in events[:20]:
+                        event_data = event.get("event", {})
+                        event_name = event_data.get("name", "")
+                        if not event_data.get("id") or any(kw in event_name for kw in skip_keywords):
+                            continue
+                        candidate_events.append(event)
+
+                    # Un singur listMarketCatalogue + listMarketBook pentru toate evenimentele echipei
+                    markets = await betfair_client.list_market_catalogue(
+                        event_ids=[e["event"]["id"] for e in candidate_events],
+                        market_type_codes=["MATCH_ODDS"]
+                    )
+                    market_by_event = {}
+                    for market in markets:
+                        market_by_event.setdefault(market.get("event", {}).get("id", ""), market)
+
+                    market_ids = [m.get("marketId") for m in market_by_event.values() if m.get("marketId")]
+                    books = await betfair_client.list_market_book(market_ids)
+                    frame = MarketBookFrame.from_books(books)
+
+                    # Piețele meciurilor programate intră în istoricul de cote
+                    odds_recorder.track(market_by_event.values())
+
+                    # Runner-ul echipei noastre în fiecare piață: după betfair_id dacă îl avem,
+                    # altfel după nume exact; cotele sunt citite apoi toate odată din frame
+                    team_selections = {}
+                    for market in market_by_event.values():
+                        for mr in market.get("runners", []):
+                            if betfair_id and str(mr.get("selectionId", "")) == betfair_id:
+                                team_selections[market.get("marketId")] = mr.get("selectionId")
+                                break
+                            elif not betfair_id and team_name.lower() == mr.get("runnerName", "").lower():
+                                team_selections[market.get("marketId")] = mr.get("selectionId")
+                                break
+                    team_odds = frame.back_prices(team_selections)
+
                     matches_to_add = []
 
-                    for event in events[:20]:
+                    for event in candidate_events:
                         event_data = event.get("event", {})
                         event_id = event_data.get("id", "")
                         event_name = event_data.get("name", "")
 
-                        # Skip reserve/youth teams
-                        if any(kw in event_name for kw in skip_keywords):
-                            continue
-
-                        # Get market info
-                        if event_id:
-                            try:
-                                markets = await betfair_client.list_market_catalogue(
-                                    event_ids=[event_id],
-                                    market_type_codes=["MATCH_ODDS"]
-                                )
-
-                                if markets:
-                                    market = markets[0]
-                                    market_id = market.get("marketId", "")
-                                    market_start_time_utc = market.get("marketStartTime", "")
-
-                                    # Convert UTC to Europe/Bucharest
-                                    market_start_time = ""
-                                    if market_start_time_utc:
-                                        try:
-                                            utc_time = datetime.fromisoformat(market_start_time_utc.replace("Z", "+00:00"))
-                                            bucharest_tz = pytz.timezone("Europe/Bucharest")
-                                            local_time = utc_time.astimezone(bucharest_tz)
-                                            market_start_time = local_time.strftime("%Y-%m-%dT%H:%M")
-                                        except:
-                                            market_start_time = market_start_time_utc
-
-                                    # Get odds pentru echipa noastră
-                                    odds = ""
-                                    if market_id:
-                                        prices = await betfair_client.list_market_book([market_id])
-                                        if prices and prices[0].get("runners"):
-                                            price_runners = prices[0].get("runners", [])
-                                            market_runners = market.get("runners", [])
-
-                                            # Găsim runner-ul echipei noastre
-                                            # Dacă avem betfair_id, căutăm după el; altfel după nume exact
-                                            team_selection_id = None
-                                            for mr in market_runners:
-                                                runner_name = mr.get("runnerName", "")
-                                                runner_sel_id = str(mr.get("selectionId", ""))
-
-                                                if betfair_id and runner_sel_id == betfair_id:
-                                                    team_selection_id = mr.get("selectionId")
-                                                    break
-                                                elif not betfair_id and team_name.lower() == runner_name.lower():
-                                                    team_selection_id = mr.get("selectionId")
-                                                    break
-
-                                            # IMPORTANT: Skip meciul dacă echipa noastră NU e găsită
-                                            if not team_selection_id:
-                                                logger.info(f"Skip {event_name} - echipa {team_name} nu e găsită în runners: {[mr.get('runnerName') for mr in market_runners]}")
-                                                continue
-
-                                            # Luăm cota pentru echipa noastră
-                                            for pr in price_runners:
-                                                if pr.get("selectionId") == team_selection_id:
-                                                    back_prices = pr.get("ex", {}).get("availableToBack", [])
-                                                    if back_prices:
-                                                        odds = back_prices[0].get("price", "")
-                                                    break
-
-                                    matches_to_add.append({
-                                        "start_time": market_start_time,
-                                        "event_name": event_name,
-                                        "competition": event.get("competitionName", ""),
-                                        "odds": str(odds) if odds else ""
-                                    })
-                            except Exception as e:
-                                logger.warning(f"Eroare la preluarea datelor pentru {event_name}: {e}")
+                        try:
+                            market = market_by_event.get(event_id)
+                            if not market:
+                                continue
+
+                            market_id = market.get("marketId", "")
+                            market_start_time_utc = market.get("marketStartTime", "")
+
+                            # Convert UTC to Europe/Bucharest
+                            market_start_time = ""
+                            if market_start_time_utc:
+                                try:
+                                    utc_time = datetime.fromisoformat(market_start_time_utc.replace("Z", "+00:00"))
+                                    bucharest_tz = pytz.timezone("Europe/Bucharest")
+                                    local_time = utc_time.astimezone(bucharest_tz)
+                                    market_start_time = local_time.strftime("%Y-%m-%dT%H:%M")
+                                except:
+                                    market_start_time = market_start_time_utc
+
+                            # Get odds pentru echipa noastră
+                            odds = ""
+                            if market_id in frame:
+                                # IMPORTANT: Skip meciul dacă echipa noastră NU e găsită
+                                if not team_selections.get(market_id):
+                                    logger.info(f"Skip {event_name} - echipa {team_name} nu e găsită în runners: {[mr.get('runnerName') for mr in market.get('runners', [])]}")
+                                    continue
+
+                                # Luăm cota pentru echipa noastră
+                                odds = team_odds.get(market_id)
+                                odds = snap_price(odds, "BACK") if odds else ""
+
+                            matches_to_add.append({
+                                "start_time": market_start_time,
+                                "event_name": event_name,
+                                "competition": event.get("competitionName", ""),
+                                "odds": str(odds) if odds else ""
+                            })
+                        except Exception as e:
+                            logger.warning(f"Eroare la preluarea datelor pentru {event_name}: {e}")
 
                     if matches_to_add:
                         # Sort by date
                         matches_sorted = sorted(matches_to_add, key=lambda x: x.get("start_time", ""))
 
                         # Save to Google Sheets (funcția skipă meciurile existente)
-                        saved = google_sheets_client.save_matches_for_team(team_name, matches_sorted)
+                        saved = await async_google_sheets_client.save_matches_for_team(team_name, matches_sorted)
 
                         if saved:
                             results["teams_updated"] += 1
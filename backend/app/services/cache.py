@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """
+    Cache asincron cu expirare (TTL, opțional per cheie), evicție LRU și
+    single-flight per cheie: apelanții concurenți pentru aceeași cheie lipsă
+    așteaptă un singur loader.
+
+    Cu stale_ttl > 0, o intrare expirată mai poate fi servită încă stale_ttl
+    secunde (stale-while-revalidate): apelantul primește imediat valoarea veche,
+    iar o singură reîmprospătare rulează în fundal.
+    """
+
+    def __init__(self, name: str, maxsize: int = 512, ttl: float = 3600.0, stale_ttl: float = 0.0):
+        """
+        Args:
+            name: Numele cache-ului (pentru log-uri și metrici)
+            maxsize: Numărul maxim de intrări păstrate
+            ttl: Durata de viață implicită a unei intrări în secunde
+            stale_ttl: Cât timp după expirare intrarea poate fi servită cât se reîmprospătează (0 = deloc)
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # cheie -> (expiră la, poate fi servită până la, valoare)
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        # Încărcarea curentă a fiecărei chei; invalidarea o scoate de aici, deci
+        # rezultatul ei nu mai e salvat, iar următorul apelant pornește alta
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: Hashable) -> Tuple[Optional[Any], bool]:
+        """Returnează (valoare, proaspătă); (None, False) dacă lipsește sau e prea veche."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        expires_at, stale_until, value = entry
+        now = time.monotonic()
+        if stale_until <= now:
+            del self._entries[key]
+            return None, False
+        self._entries.move_to_end(key)
+        return value, expires_at > now
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returnează valoarea din cache sau None dacă lipsește / a expirat."""
+        value, fresh = self._lookup(key)
+        return value if fresh else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Salvează o valoare (cu TTL-ul dat sau cel implicit) și elimină cele mai vechi intrări peste maxsize."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, expires_at + self.stale_ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            if value is not None and self._inflight.get(key) is task:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def _start_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+        background: bool = False
+    ) -> asyncio.Task:
+        """Pornește loader-ul pentru cheie, dacă nu rulează deja (single-flight)."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._load(key, loader, ttl))
+            task.add_done_callback(lambda t: self._load_done(key, t, background))
+            self._inflight[key] = task
+        return task
+
+    def _load_done(self, key: Hashable, task: asyncio.Task, background: bool) -> None:
+        # Excepția e consumată aici dacă nu așteaptă nimeni rezultatul
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None and background:
+            logger.warning(f"Reîmprospătarea cache-ului {self.name} pentru {key!r} a eșuat: {error}")
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Returnează valoarea din cache sau o încarcă o singură dată pentru toți
+        apelanții concurenți. O valoare expirată, dar încă în fereastra stale_ttl,
+        e returnată imediat, iar reîmprospătarea pornește în fundal.
+        Rezultatele None (erori) nu sunt salvate.
+
+        Args:
+            key: Cheia cache-ului
+            loader: Funcția async care produce valoarea
+            ttl: Durata de viață a valorii încărcate (implicit ttl-ul cache-ului)
+
+        Returns:
+            Valoarea (din cache sau proaspăt încărcată)
+        """
+        value, fresh = self._lookup(key)
+        if value is not None:
+            if fresh:
+                self.hits += 1
+                metrics.inc("cache_hits_total", cache=self.name)
+            else:
+                self.stale_hits += 1
+                metrics.inc("cache_stale_hits_total", cache=self.name)
+                self._start_load(key, loader, ttl, background=True)
+            return value
+
+        if key in self._inflight:
+            self.hits += 1
+            metrics.inc("cache_hits_total", cache=self.name)
+        else:
+            self.misses += 1
+            metrics.inc("cache_misses_total", cache=self.name)
+
+        # shield: anularea unui apelant nu anulează încărcarea așteptată de ceilalți
+        return await asyncio.shield(self._start_load(key, loader, ttl))
+
+    def invalidate(self, key: Hashable) -> None:
+        """Elimină o intrare din cache (o încărcare deja pornită pentru cheie nu o mai salvează)."""
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Golește cache-ul (încărcările deja pornite nu mai sunt salvate)."""
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistici hit/miss și dimensiune."""
+        total = self.hits + self.stale_hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._inflight),
+            "hit_rate": round((self.hits + self.stale_hits) / total, 3) if total else 0.0
+        }
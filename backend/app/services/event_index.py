@@ -0,0 +1,177 @@
+import json
+import logging
+import re
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sufixe încercate pe rând când numele complet nu e găsit (ca în căutarea text)
+NAME_SUFFIXES = [" FC", " United FC", " United"]
+
+
+def normalize_team_name(name: str) -> str:
+    """
+    Normalizează numele unei echipe pentru comparare: fără diacritice,
+    litere mici, fără punctuație, spații simple.
+    """
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def team_name_variants(team_name: str) -> List[str]:
+    """Numele echipei plus variantele fără sufixele comune (FC, United)."""
+    variants = [team_name]
+    for suffix in NAME_SUFFIXES:
+        if team_name.endswith(suffix):
+            variants.append(team_name[:-len(suffix)])
+    return variants
+
+
+class EventIndex:
+    """
+    Index local echipă -> evenimente, construit din câteva listEvents pe
+    competiții în loc de câte un listEvents(textQuery) per echipă.
+
+    Competițiile fiecărei echipe sunt învățate din rezultatele
+    listMarketCatalogue (care includ competiția și runner-ii) și salvate în
+    data/team_competitions.json, ca să fie disponibile după restart.
+    """
+
+    def __init__(self, storage_file: Optional[Path] = None):
+        self._storage_file = storage_file or (
+            Path(__file__).parent.parent.parent / "data" / "team_competitions.json"
+        )
+        # Cheie echipă ("sel:<selectionId>" / "name:<nume normalizat>") -> ID-uri competiții
+        self._team_competitions: Dict[str, Set[str]] = {}
+        # Evenimente indexate: selectionId / nume normalizat -> {event_id: eveniment}
+        self._by_selection: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_name: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._indexed_competitions: Set[str] = set()
+        self.built_at: Optional[float] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self._storage_file.exists():
+            return
+        try:
+            with open(self._storage_file, "r") as f:
+                data = json.load(f)
+            self._team_competitions = {key: set(ids) for key, ids in data.items()}
+            logger.info(f"Index evenimente: {len(self._team_competitions)} echipe cu competiții cunoscute")
+        except Exception as e:
+            logger.error(f"Eroare la încărcarea competițiilor echipelor: {e}")
+
+    def _save(self) -> None:
+        try:
+            self._storage_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._storage_file, "w") as f:
+                json.dump({key: sorted(ids) for key, ids in self._team_competitions.items()}, f, indent=2)
+        except Exception as e:
+            logger.error(f"Eroare la salvarea competițiilor echipelor: {e}")
+
+    @staticmethod
+    def _team_keys(team_name: str, selection_id: Optional[str]) -> List[str]:
+        keys = []
+        if selection_id:
+            keys.append(f"sel:{selection_id}")
+        keys.extend(f"name:{normalize_team_name(v)}" for v in team_name_variants(team_name))
+        return keys
+
+    def learn(self, markets: Iterable[Dict[str, Any]]) -> None:
+        """
+        Învață competițiile echipelor și indexează evenimentele din rezultate
+        listMarketCatalogue (proiecție cu COMPETITION, EVENT și RUNNER_DESCRIPTION).
+        """
+        changed = False
+        for market in markets:
+            competition_id = str(market.get("competition", {}).get("id") or "")
+            event = market.get("event") or {}
+            if not event.get("id"):
+                continue
+
+            for runner in market.get("runners", []):
+                selection_id = str(runner.get("selectionId") or "")
+                name = normalize_team_name(runner.get("runnerName", ""))
+                if not name or name == "the draw":
+                    continue
+
+                entry = {"event": event}
+                if selection_id:
+                    self._by_selection.setdefault(selection_id, {})[event["id"]] = entry
+                self._by_name.setdefault(name, {})[event["id"]] = entry
+
+                if competition_id:
+                    for key in (f"sel:{selection_id}" if selection_id else None, f"name:{name}"):
+                        if key and competition_id not in self._team_competitions.setdefault(key, set()):
+                            self._team_competitions[key].add(competition_id)
+                            changed = True
+
+        if changed:
+            self._save()
+
+    def competitions_for(self, teams: Iterable[Tuple[str, Optional[str]]]) -> Set[str]:
+        """
+        Competițiile cunoscute pentru o listă de echipe.
+
+        Args:
+            teams: Perechi (nume echipă, betfair_id)
+
+        Returns:
+            ID-urile competițiilor în care joacă echipele
+        """
+        competitions: Set[str] = set()
+        for team_name, selection_id in teams:
+            for key in self._team_keys(team_name, selection_id):
+                competitions.update(self._team_competitions.get(key, set()))
+        return competitions
+
+    def reset(self, competition_ids: Iterable[str]) -> None:
+        """Golește evenimentele indexate înaintea unei reconstruiri."""
+        self._by_selection.clear()
+        self._by_name.clear()
+        self._indexed_competitions = set(competition_ids)
+        self.built_at = time.monotonic()
+
+    def is_fresh(self, max_age: float) -> bool:
+        """Verifică dacă indexul a fost construit în ultimele max_age secunde."""
+        return self.built_at is not None and time.monotonic() - self.built_at < max_age
+
+    def lookup(self, team_name: str, selection_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Evenimentele unei echipe din index.
+
+        Returns:
+            Lista de evenimente (format listEvents) sau None dacă echipa nu e
+            acoperită de index și trebuie căutată prin textQuery
+        """
+        known = self.competitions_for([(team_name, selection_id)])
+        if not known or not known <= self._indexed_competitions:
+            return None
+
+        events: Dict[str, Dict[str, Any]] = {}
+        if selection_id:
+            events.update(self._by_selection.get(str(selection_id), {}))
+        if not events:
+            for variant in team_name_variants(team_name):
+                events.update(self._by_name.get(normalize_team_name(variant), {}))
+                if events:
+                    break
+
+        if not events:
+            return None
+
+        return sorted(events.values(), key=lambda e: e["event"].get("openDate", ""))
+
+    def stats(self) -> Dict[str, Any]:
+        """Dimensiunea indexului (pentru status)."""
+        return {
+            "teams_with_competitions": len(self._team_competitions),
+            "indexed_competitions": len(self._indexed_competitions),
+            "indexed_teams": len(self._by_name),
+            "age_seconds": round(time.monotonic() - self.built_at, 1) if self.built_at else None
+        }
@@ -1,15 +1,214 @@
+import asyncio
+import functools
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Optional, Dict, Any, Tuple, TypeVar
 from datetime import datetime
 import time
 
+from app.services.cache import AsyncTTLCache
+from app.services.metrics import metrics
+from app.services.sheets_write_queue import APPEND, PROGRESSION, SET, SheetsWriteQueue, apply_mutation
+from app.services.state_store import MATCH_COLUMNS, TEAM_COLUMNS, SQLiteStateStore, state_store
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Schema sheet-urilor: ordinea coloanelor (header -> coloană), aceeași cu a stării locale
+INDEX_HEADERS = list(TEAM_COLUMNS)
+TEAM_SHEET_HEADERS = list(MATCH_COLUMNS)
+# Câte sheet-uri sunt citite într-un singur values:batchGet (limita e lungimea URL-ului)
+BATCH_GET_CHUNK = 100
+
+# Coloanele după care sunt identificate rândurile (indexul local de rânduri)
+INDEX_KEY_COLUMNS = ("id", "name")
+TEAM_SHEET_KEY_COLUMNS = ("Meci", "Bet ID")
+BET_KEY_COLUMNS = ("id",)
+# După cât timp (secunde) indexul de rânduri e reconstruit la următoarea folosire
+ROW_INDEX_TTL = 300
+BET_HEADERS = [
+    "id", "team_id", "team_name", "event_name", "pronostic",
+    "odds", "stake", "potential_profit", "result", "status",
+    "placed_at", "settled_at", "created_at"
+]
+
+
+def column_index(headers: List[str], name: str) -> int:
+    """Coloana (1-based) a unui header din schema."""
+    return headers.index(name) + 1
+
+
+def column_letter(col: int) -> str:
+    """Litera coloanei în notația A1 (1 -> A, 27 -> AA)."""
+    letters = ""
+    while col > 0:
+        col, remainder = divmod(col - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def row_range(headers: List[str], row: int) -> str:
+    """Range-ul A1 al unui rând complet (ex: A5:P5 pentru Index)."""
+    return f"A{row}:{column_letter(len(headers))}{row}"
+
+
+def row_updates(headers: List[str], row: int, values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Transformă valorile unui rând (header -> valoare) în range-uri contigue
+    pentru Worksheet.batch_update (coloanele alăturate ajung în același range).
+
+    Args:
+        headers: Schema sheet-ului
+        row: Rândul (1-based)
+        values: Valorile de scris, pe nume de coloană
+
+    Returns:
+        Lista {"range", "values"} pentru batch_update
+    """
+    columns = sorted((column_index(headers, name), value) for name, value in values.items())
+    updates: List[Dict[str, Any]] = []
+    start = previous = None
+    run: List[Any] = []
+    for col, value in columns:
+        if previous is not None and col == previous + 1:
+            run.append(value)
+        else:
+            if run:
+                updates.append(_range_update(row, start, previous, run))
+            start, run = col, [value]
+        previous = col
+    if run:
+        updates.append(_range_update(row, start, previous, run))
+    return updates
+
+
+def _range_update(row: int, first_col: int, last_col: int, values: List[Any]) -> Dict[str, Any]:
+    return {
+        "range": f"{column_letter(first_col)}{row}:{column_letter(last_col)}{row}",
+        "values": [values]
+    }
+
+
+def row_record(headers: List[str], row_values: List[Any]) -> Dict[str, Any]:
+    """Valorile unui rând citit din sheet, pe nume de coloană (coloanele lipsă sunt "")."""
+    return {name: row_values[i] if i < len(row_values) else "" for i, name in enumerate(headers)}
+
+
+def sheet_schema(sheet: str) -> Tuple[List[str], Tuple[str, ...]]:
+    """Header-ele și coloanele cheie ale unui worksheet (Index, Istoric sau sheet de echipă)."""
+    if sheet == "Index":
+        return INDEX_HEADERS, INDEX_KEY_COLUMNS
+    if sheet == "Istoric":
+        return BET_HEADERS, BET_KEY_COLUMNS
+    return TEAM_SHEET_HEADERS, TEAM_SHEET_KEY_COLUMNS
+
+
+class RowIndex:
+    """
+    Poziția rândurilor unui worksheet după valorile coloanelor cheie
+    (ex: numele echipei -> rândul din Index, Bet ID -> rândul din sheet-ul echipei),
+    ca rândurile să fie găsite fără worksheet.find().
+
+    E construit din orice citire completă a sheet-ului și actualizat la
+    scrierile, adăugările și ștergerile de rânduri făcute de client.
+    """
+
+    def __init__(self, key_columns: Tuple[str, ...], records: List[Dict[str, Any]]):
+        """
+        Args:
+            key_columns: Coloanele indexate
+            records: Rândurile sheet-ului (fără header), în ordine
+        """
+        self.key_columns = key_columns
+        self.built_at = time.monotonic()
+        self.last_row = len(records) + 1
+        self._rows: Dict[str, Dict[str, int]] = {column: {} for column in key_columns}
+        for row_num, record in enumerate(records, start=2):
+            self._add(row_num, record)
+
+    def _add(self, row_num: int, values: Dict[str, Any]) -> None:
+        for column in self.key_columns:
+            value = str(values.get(column, "")).strip()
+            if value:
+                # Ca la find(): prima apariție câștigă
+                self._rows[column].setdefault(value, row_num)
+
+    def expired(self) -> bool:
+        return time.monotonic() - self.built_at > ROW_INDEX_TTL
+
+    def find(self, column: str, value: Any) -> Optional[int]:
+        """Rândul (1-based) cu valoarea dată în coloana cheie, sau None."""
+        return self._rows.get(column, {}).get(str(value).strip())
+
+    def keys(self, column: str) -> set:
+        """Toate valorile (nevide) ale unei coloane cheie."""
+        return set(self._rows.get(column, {}))
+
+    def updated(self, row_num: int, values: Dict[str, Any]) -> None:
+        """Actualizează cheile după o scriere pe rândul row_num."""
+        for column in self.key_columns:
+            if column in values:
+                keys = self._rows[column]
+                for value in [v for v, row in keys.items() if row == row_num]:
+                    del keys[value]
+        self._add(row_num, values)
+
+    def appended(self, row_num: int, values: Dict[str, Any]) -> None:
+        self.last_row = max(self.last_row, row_num)
+        self._add(row_num, values)
+
+    def deleted(self, row_num: int) -> None:
+        """Rândul row_num a fost șters: rândurile de sub el urcă cu unul."""
+        for column, keys in self._rows.items():
+            self._rows[column] = {
+                value: row - 1 if row > row_num else row
+                for value, row in keys.items() if row != row_num
+            }
+        self.last_row -= 1
+
+
+def appended_row(response: Dict[str, Any]) -> Optional[int]:
+    """Rândul scris de append_row/append_rows (din updates.updatedRange, ex: 'Echipa'!A12:H12)."""
+    import re
+
+    updated_range = (response or {}).get("updates", {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated_range)
+    return int(match.group(1)) if match else None
+
+
+def instrumented(func):
+    """
+    Înregistrează latența (sheets_call_seconds) și statusul (sheets_calls_total)
+    unui apel Google Sheets. Un rezultat False contează ca eroare.
+    """
+    operation = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = func(*args, **kwargs)
+            if result is not False:
+                status = "ok"
+            return result
+        finally:
+            metrics.observe("sheets_call_seconds", time.perf_counter() - started, operation=operation)
+            metrics.inc("sheets_calls_total", operation=operation, status=status)
+
+    return wrapper
+
 
 class GoogleSheetsClient:
     """
     Client pentru Google Sheets API.
-    Gestionează persistența datelor: echipe, pariuri, configurări.
+
+    Starea (echipe, meciuri, pariuri, progresie) e ținută local în SQLite (state_store):
+    citirile sunt locale, iar scrierile ajung întâi în store și sunt replicate
+    în sheet prin coada de scrieri amânate. Editările făcute direct în sheet
+    sunt importate la conectare și periodic (import_from_sheet).
     """
 
     def __init__(self):
@@ -18,9 +217,30 @@ class GoogleSheetsClient:
         self._spreadsheet_id: Optional[str] = None
         self._credentials_path: Optional[str] = None
         self._connected = False
-        self._cache: Dict[str, Any] = {}
-        self._cache_timestamps: Dict[str, float] = {}
-        self._cache_ttl = 60  # Cache TTL in seconds
+        # Apelate după scrierile care schimbă statisticile (invalidează cache-urile de citire)
+        self._write_listeners: List[Callable[[], None]] = []
+        # Scrieri amânate (write-behind): jurnalizate local, scrise în fundal
+        self._writes = SheetsWriteQueue()
+        # Serializează flush-urile și citirile care aplică scrierile din coadă
+        self._flush_lock = threading.RLock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_interval = 5.0
+        self._flush_max_pending = 50
+        self._flush_batch_size = 200
+        # Pool-ul pe care rulează flush-ul din fundal (None = pool-ul implicit asyncio)
+        # și mărimea pool-ului de conexiuni HTTP al sesiunii gspread
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._http_pool_size = 10
+        # Worksheet-urile după titlu și indexul de rânduri al fiecăruia
+        self._worksheets: Dict[str, Any] = {}
+        self._row_indexes: Dict[str, RowIndex] = {}
+        # Starea locală și numărul de scrieri locale per sheet (un import care
+        # a citit sheet-ul în timpul unei scrieri locale nu îl suprascrie)
+        self._store: SQLiteStateStore = state_store
+        self._state_lock = threading.Lock()
+        self._local_writes: Dict[str, int] = {}
 
     def configure(self, spreadsheet_id: str, credentials_path: Optional[str] = None) -> bool:
         """
@@ -37,6 +257,7 @@ class GoogleSheetsClient:
         self._credentials_path = credentials_path
         return True
 
+    @instrumented
     def connect(self) -> bool:
         """
         Conectează la Google Sheets API.
@@ -69,12 +290,15 @@ class GoogleSheetsClient:
                 )
 
             self._client = gspread.authorize(credentials)
+            self._mount_http_pool()
             self._spreadsheet = self._client.open_by_key(self._spreadsheet_id)
+            self._forget_worksheets()
             self._connected = True
 
             logger.info(f"Conectat la Google Sheets: {self._spreadsheet.title}")
 
             self.migrate_index_columns()
+            self.import_from_sheet()
 
             return True
 
@@ -83,6 +307,23 @@ class GoogleSheetsClient:
             self._connected = False
             return False
 
+    def set_executor(self, executor: ThreadPoolExecutor, http_pool_size: int) -> None:
+        """
+        Setează pool-ul de thread-uri pentru flush-ul din fundal și mărimea
+        pool-ului de conexiuni HTTP (cel puțin câte una pentru fiecare thread).
+        """
+        self._executor = executor
+        self._http_pool_size = http_pool_size
+        if self._client is not None:
+            self._mount_http_pool()
+
+    def _mount_http_pool(self) -> None:
+        """Pool de conexiuni keep-alive pe măsura thread-urilor care folosesc sesiunea gspread."""
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self._http_pool_size)
+        self._client.http_client.session.mount("https://", adapter)
+
     def _get_credentials_from_env(self) -> dict:
         """Obține credențialele din variabilele de environment."""
         import os
@@ -107,105 +348,481 @@ class GoogleSheetsClient:
         """Verifică dacă clientul este conectat."""
         return self._connected
 
+    def is_ready(self) -> bool:
+        """
+        Verifică dacă starea poate fi folosită: clientul e conectat sau starea
+        locală a fost importată deja (botul continuă și când Sheets nu răspunde).
+        """
+        return self._connected or self._store.is_seeded()
+
     def disconnect(self) -> None:
         """Deconectează clientul."""
         self._client = None
         self._spreadsheet = None
         self._connected = False
+        self._forget_worksheets()
         logger.info("Deconectat de la Google Sheets")
 
+    # ------------------------------------------------------------------
+    # Worksheet-uri și indexul de rânduri
+    # ------------------------------------------------------------------
+
+    def _worksheet(self, name: str) -> Any:
+        """
+        Worksheet-ul cu titlul dat, din cache. La prima cerere (sau la un titlu
+        necunoscut) toate worksheet-urile sunt încărcate într-un singur request.
+
+        Raises:
+            gspread.exceptions.WorksheetNotFound: Dacă sheet-ul nu există
+        """
+        worksheet = self._worksheets.get(name)
+        if worksheet is None:
+            import gspread
+
+            self._worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+            worksheet = self._worksheets.get(name)
+            if worksheet is None:
+                raise gspread.exceptions.WorksheetNotFound(name)
+        return worksheet
+
+    def _worksheet_titles(self) -> List[str]:
+        """Titlurile tuturor worksheet-urilor (încarcă cache-ul dacă e gol)."""
+        if not self._worksheets:
+            self._worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+        return list(self._worksheets)
+
+    def _forget_worksheets(self, name: str = None) -> None:
+        """Uită worksheet-ul (și indexul lui), sau toate dacă name e None."""
+        if name:
+            self._worksheets.pop(name, None)
+            self._row_indexes.pop(name, None)
+        else:
+            self._worksheets.clear()
+            self._row_indexes.clear()
+
+    def _index_records(self, sheet: str, records: List[Dict[str, Any]]) -> None:
+        """Reconstruiește indexul de rânduri din rândurile tocmai citite (fără header)."""
+        self._row_indexes[sheet] = RowIndex(sheet_schema(sheet)[1], records)
+
+    def _row_index(self, worksheet, rebuild: bool = False) -> RowIndex:
+        """Indexul de rânduri al worksheet-ului (construit dintr-un get_all_values dacă lipsește sau a expirat)."""
+        index = self._row_indexes.get(worksheet.title)
+        if index is None or rebuild or index.expired():
+            headers = sheet_schema(worksheet.title)[0]
+            rows = worksheet.get_all_values()[1:]
+            self._index_records(worksheet.title, [row_record(headers, row) for row in rows])
+            index = self._row_indexes[worksheet.title]
+        return index
+
+    def _index_is_fresh(self, sheet: str) -> bool:
+        """Indexul va fi (re)construit la următoarea folosire, deci reflectă sheet-ul actual."""
+        index = self._row_indexes.get(sheet)
+        return index is None or index.expired()
+
+    def _find_row(self, worksheet, column: str, value: Any) -> Optional[int]:
+        """
+        Rândul cu valoarea dată în coloana cheie. Dacă nu e găsit într-un index
+        mai vechi, indexul e reconstruit o dată (rândul poate fi fost adăugat din afară).
+        """
+        fresh = self._index_is_fresh(worksheet.title)
+        row_num = self._row_index(worksheet).find(column, value)
+        if row_num is None and not fresh:
+            row_num = self._row_index(worksheet, rebuild=True).find(column, value)
+        return row_num
+
+    def _append_row(self, worksheet, headers: List[str], row_data: List[Any]) -> None:
+        """append_row() care ține la zi indexul de rânduri."""
+        self._append_rows(worksheet, headers, [row_data])
+
+    def _append_rows(self, worksheet, headers: List[str], rows: List[List[Any]]) -> None:
+        """Adaugă rândurile printr-un singur append_rows() și ține la zi indexul de rânduri."""
+        response = worksheet.append_rows(rows)
+        index = self._row_indexes.get(worksheet.title)
+        if index is not None:
+            first_row = appended_row(response)
+            if first_row is None:
+                # Poziția nu e cunoscută: indexul e reconstruit la următoarea folosire
+                self._row_indexes.pop(worksheet.title, None)
+            else:
+                for offset, row_data in enumerate(rows):
+                    index.appended(first_row + offset, row_record(headers, row_data))
+
     def _get_or_create_worksheet(self, name: str, headers: List[str]) -> Any:
         """Obține sau creează un worksheet."""
+        import gspread
+
         try:
-            worksheet = self._spreadsheet.worksheet(name)
+            worksheet = self._worksheet(name)
         except gspread.exceptions.WorksheetNotFound:
             worksheet = self._spreadsheet.add_worksheet(title=name, rows=1000, cols=len(headers))
             worksheet.append_row(headers)
+            self._worksheets[name] = worksheet
             logger.info(f"Worksheet creat: {name}")
         except Exception as e:
             logger.error(f"Eroare la accesarea worksheet-ului {name}: {e}")
             raise
         return worksheet
 
-    def _get_cached(self, key: str) -> Optional[Any]:
-        """Returnează valoarea din cache dacă nu a expirat."""
-        if key in self._cache:
-            timestamp = self._cache_timestamps.get(key, 0)
-            if time.time() - timestamp < self._cache_ttl:
-                return self._cache[key]
-        return None
-
-    def _set_cached(self, key: str, value: Any) -> None:
-        """Salvează valoarea în cache."""
-        self._cache[key] = value
-        self._cache_timestamps[key] = time.time()
-
-    def invalidate_cache(self, key: str = None) -> None:
-        """Invalidează cache-ul (tot sau pentru o cheie specifică)."""
-        if key:
-            self._cache.pop(key, None)
-            self._cache_timestamps.pop(key, None)
-        else:
-            self._cache.clear()
-            self._cache_timestamps.clear()
+    def _update_row(self, worksheet, headers: List[str], row: int, values: Dict[str, Any]) -> None:
+        """
+        Scrie mai multe celule ale unui rând printr-un singur request
+        (values.batchUpdate), interpretate ca la update_cell (USER_ENTERED).
+        """
+        worksheet.batch_update(row_updates(headers, row, values), raw=False)
 
-    def load_teams(self) -> List[Dict[str, Any]]:
+    # ------------------------------------------------------------------
+    # Scrieri amânate (write-behind)
+    # ------------------------------------------------------------------
+
+    def _enqueue_write(self, sheet: str, key: Tuple[str, Any], values: Dict[str, Any], kind: str = SET) -> None:
+        """
+        Pune o mutație de rând în coada de replicare în sheet. Apelat sub
+        _state_lock, împreună cu scrierea locală; flush-ul e programat după
+        eliberarea lock-ului (_schedule_flush).
+        """
+        self._writes.put(sheet, key, kind, values)
+        self._local_writes[sheet] = self._local_writes.get(sheet, 0) + 1
+
+    def _schedule_flush(self) -> None:
+        """
+        Fără flush în fundal (scripturi, write-behind dezactivat) coada e scrisă
+        imediat; altfel flush-ul e grăbit când coada ajunge la max_pending.
+        """
+        if self._flush_task is None or self._flush_task.done():
+            self.flush_writes()
+        elif self._writes.depth() >= self._flush_max_pending:
+            self._loop.call_soon_threadsafe(self._flush_wakeup.set)
+
+    def _update_team(self, team_name: str, values: Dict[str, Any]) -> None:
+        """Actualizează echipa în starea locală și o replică în Index."""
+        with self._state_lock:
+            if not self._store.update_team(team_name, values):
+                logger.warning(f"Echipa {team_name} nu există în starea locală")
+            self._enqueue_write("Index", ("name", team_name), values)
+        self._notify_write()
+        self._schedule_flush()
+
+    def _update_match(self, team_name: str, key: Tuple[str, Any], values: Dict[str, Any]) -> bool:
         """
-        Încarcă echipele din Google Sheets (cu cache 60s).
+        Actualizează meciul (după Meci sau Bet ID) în starea locală și îl replică în sheet-ul echipei.
 
         Returns:
-            Lista de echipe ca dicționare
+            False dacă meciul nu există în starea locală (scrierea e totuși pusă în coadă)
+        """
+        with self._state_lock:
+            updated = self._store.update_match(team_name, key, values)
+            if not updated:
+                logger.warning(f"Meciul {key[0]}={key[1]} al echipei {team_name} nu există în starea locală")
+            self._enqueue_write(team_name, key, values)
+        self._schedule_flush()
+        return updated
+
+    def load_team_records(self, team_names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Rândurile sheet-urilor de echipă, din starea locală.
+
+        Args:
+            team_names: Echipele de citit (implicit toate echipele)
+
+        Returns:
+            {nume echipă: rânduri ca la get_all_records()}
+        """
+        return self._store.team_records(team_names)
+
+    @instrumented
+    def _fetch_team_records(self, team_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Citește din sheet rândurile sheet-urilor de echipă printr-un singur
+        values:batchGet (în loc de worksheet() + get_all_records() pentru fiecare echipă).
+
+        Args:
+            team_names: Echipele de citit
+
+        Returns:
+            {nume echipă: rânduri ca la get_all_records()}; echipele fără sheet lipsesc
         """
-        cached = self._get_cached("teams")
-        if cached is not None:
-            return cached
+        from gspread.utils import absolute_range_name, numericise_all
+
+        existing = set(self._worksheet_titles())
+        names = []
+        for name in dict.fromkeys(team_names):
+            if name in existing:
+                names.append(name)
+            else:
+                logger.warning(f"Nu există sheet pentru echipa {name}")
+
+        team_records: Dict[str, List[Dict[str, Any]]] = {}
+        for start in range(0, len(names), BATCH_GET_CHUNK):
+            chunk = names[start:start + BATCH_GET_CHUNK]
+            response = self._spreadsheet.values_batch_get([absolute_range_name(name) for name in chunk])
+
+            for name, value_range in zip(chunk, response.get("valueRanges", [])):
+                rows = value_range.get("values", [])
+                headers = rows[0] if rows else []
+                records = [
+                    dict(zip(headers, numericise_all(row + [""] * (len(headers) - len(row)), default_blank="")))
+                    for row in rows[1:]
+                ]
+                with self._flush_lock:
+                    self._index_records(name, records)
+                team_records[name] = records
+
+        return team_records
 
+    @instrumented
+    def import_from_sheet(self) -> bool:
+        """
+        Importă în starea locală editările făcute direct în sheet (Index și
+        sheet-urile echipelor). Sheet-urile cu scrieri locale încă nereplicate,
+        sau scrise local în timpul citirii, sunt sărite la acest import.
+
+        Returns:
+            True dacă importul a reușit
+        """
         if not self._connected:
-            logger.warning("Nu sunt conectat la Google Sheets")
-            return []
+            return False
 
         try:
-            headers = ["id", "name", "betfair_id", "sport", "league", "country",
-                      "cumulative_loss", "last_stake", "progression_step", "status",
-                      "created_at", "updated_at", "initial_stake", "total_matches", "matches_won", "total_profit"]
-            worksheet = self._get_or_create_worksheet("Index", headers)
+            with self._state_lock:
+                generations = dict(self._local_writes)
+
+            worksheet = self._get_or_create_worksheet("Index", INDEX_HEADERS)
+            index_records = [r for r in worksheet.get_all_records() if r.get("id")]
+            with self._flush_lock:
+                self._index_records("Index", index_records)
+            team_records = self._fetch_team_records([str(r["name"]) for r in index_records if r.get("name")])
+
+            with self._state_lock:
+                skipped = self._writes.pending_sheets() | {
+                    sheet for sheet, count in self._local_writes.items() if generations.get(sheet) != count
+                }
+                self._store.import_snapshot(
+                    None if "Index" in skipped else index_records,
+                    {name: records for name, records in team_records.items() if name not in skipped}
+                )
 
-            records = worksheet.get_all_records()
-            teams = []
+            if skipped:
+                logger.info(f"Import Google Sheets: sărite {len(skipped)} sheet-uri cu scrieri locale nereplicate")
+            logger.info(f"Import Google Sheets: {len(index_records)} echipe, {len(team_records)} sheet-uri de echipă")
+            self._notify_write()
+            return True
 
-            for record in records:
-                if record.get("id"):
-                    teams.append({
-                        "id": str(record["id"]),
-                        "name": record.get("name", ""),
-                        "betfair_id": record.get("betfair_id") or None,
-                        "sport": record.get("sport", "football"),
-                        "league": record.get("league", ""),
-                        "country": record.get("country", ""),
-                        "cumulative_loss": float(record.get("cumulative_loss", 0)),
-                        "last_stake": float(record.get("last_stake", 0)),
-                        "progression_step": int(record.get("progression_step", 0)),
-                        "status": record.get("status", "active"),
-                        "created_at": record.get("created_at", datetime.utcnow().isoformat()),
-                        "updated_at": record.get("updated_at", datetime.utcnow().isoformat()),
-                        "initial_stake": float(record.get("initial_stake", 5)),
-                        "total_matches": int(record.get("total_matches", 0)),
-                        "matches_won": int(record.get("matches_won", 0)),
-                        "total_profit": float(record.get("total_profit", 0))
-                    })
-
-            logger.info(f"Încărcate {len(teams)} echipe din Google Sheets")
-            self._set_cached("teams", teams)
+        except Exception as e:
+            logger.error(f"Eroare la importul din Google Sheets: {e}")
+            return False
+
+    @instrumented
+    def flush_writes(self) -> int:
+        """
+        Scrie mutațiile din coadă: pentru fiecare worksheet un singur
+        batch_update, indiferent de numărul de mutații.
+
+        Returns:
+            Numărul de mutații scrise (sau abandonate pentru rânduri inexistente)
+        """
+        if not self._connected:
+            return 0
+
+        with self._flush_lock:
+            mutations = self._writes.take(self._flush_batch_size)
+            by_sheet: Dict[str, List[Dict[str, Any]]] = {}
+            for mutation in mutations:
+                by_sheet.setdefault(mutation["sheet"], []).append(mutation)
+
+            written = 0
+            for sheet, sheet_mutations in by_sheet.items():
+                try:
+                    self._flush_sheet(sheet, sheet_mutations)
+                except Exception as e:
+                    import gspread
+
+                    # Worksheet-ul și indexul sunt reîncărcate la următoarea încercare
+                    self._forget_worksheets(sheet)
+                    if isinstance(e, gspread.exceptions.WorksheetNotFound):
+                        logger.warning(f"Sheet-ul {sheet} nu mai există, renunț la {len(sheet_mutations)} scrieri")
+                    else:
+                        logger.error(f"Eroare la scrierea în {sheet} (reîncerc la următorul flush): {e}")
+                        self._writes.release(sheet_mutations)
+                        continue
+
+                self._writes.complete(sheet_mutations)
+                written += len(sheet_mutations)
+
+            return written
+
+    def _flush_sheet(self, sheet: str, mutations: List[Dict[str, Any]]) -> None:
+        """
+        Scrie mutațiile unui worksheet: rândurile noi cu un singur append_rows,
+        restul cu un singur batch_update. Rândurile sunt găsite prin indexul
+        local; doar progresiile citesc întâi rândurile lor.
+        """
+        worksheet = self._worksheet(sheet)
+        headers = sheet_schema(sheet)[0]
+
+        fresh = self._index_is_fresh(sheet)
+        index = self._row_index(worksheet)
+        appends = [m for m in mutations if m["kind"] == APPEND]
+        if not fresh and any(index.find(*m["key"]) is None for m in appends):
+            # Rândul poate fi fost adăugat deja (ex: flush întrerupt înainte de confirmare)
+            index = self._row_index(worksheet, rebuild=True)
+            fresh = True
+
+        new_rows = [m for m in appends if index.find(*m["key"]) is None]
+        if new_rows:
+            self._append_rows(worksheet, headers, [[m["values"].get(h, "") for h in headers] for m in new_rows])
+            mutations = [m for m in mutations if all(m is not n for n in new_rows)]
+
+        targets = self._resolve_rows(worksheet, mutations, self._row_index(worksheet))
+        if not fresh and any(row_num is None for row_num, _ in targets):
+            targets = self._resolve_rows(worksheet, mutations, self._row_index(worksheet, rebuild=True))
+
+        # Valorile curente sunt necesare doar pentru progresii (calculate peste rând)
+        progression_rows = sorted({row for row, m in targets if row is not None and m["kind"] == PROGRESSION})
+        state: Dict[int, Dict[str, Any]] = {}
+        if progression_rows:
+            current = worksheet.batch_get([row_range(headers, row) for row in progression_rows])
+            for row_num, value_range in zip(progression_rows, current):
+                state[row_num] = row_record(headers, value_range[0] if value_range else [])
+
+        touched: Dict[int, Dict[str, Any]] = {}
+        for row_num, mutation in targets:
+            if row_num is None:
+                key = mutation["key"]
+                logger.warning(f"Rândul {key[0]}={key[1]} nu există în {sheet}, scriere abandonată")
+                continue
+            record = state.setdefault(row_num, {})
+            before = dict(record)
+            apply_mutation(record, mutation)
+            fields = touched.setdefault(row_num, {})
+            for name, value in record.items():
+                if mutation["kind"] != PROGRESSION and name in mutation["values"] or before.get(name) != value:
+                    fields[name] = value
+
+        updates: List[Dict[str, Any]] = []
+        for row_num, fields in touched.items():
+            updates.extend(row_updates(headers, row_num, fields))
+
+        if updates:
+            worksheet.batch_update(updates, raw=False)
+        logger.info(f"Google Sheets {sheet}: {len(new_rows)} rânduri noi, {len(mutations)} scrieri în {len(updates)} range-uri")
+
+    def _resolve_rows(
+        self,
+        worksheet,
+        mutations: List[Dict[str, Any]],
+        index: RowIndex
+    ) -> List[Tuple[Optional[int], Dict[str, Any]]]:
+        """
+        Rândul fiecărei mutații, în ordine. Cheile scrise de o mutație (ex: Bet ID
+        la plasare) sunt adăugate în index, ca mutațiile următoare să le găsească.
+        """
+        targets = []
+        for mutation in mutations:
+            column, value = mutation["key"]
+            row_num = index.find(column, value)
+            if row_num is not None and mutation["kind"] != PROGRESSION:
+                index.updated(row_num, mutation["values"])
+            targets.append((row_num, mutation))
+        return targets
+
+    def drain_writes(self) -> int:
+        """
+        Scrie toată coada (folosit la oprire).
+
+        Returns:
+            Numărul de mutații rămase nescrise (păstrate în jurnal)
+        """
+        while self._writes.depth() and self.flush_writes():
+            pass
+        remaining = self._writes.depth()
+        if remaining:
+            logger.warning(f"{remaining} scrieri Google Sheets rămân în jurnal pentru următoarea pornire")
+        return remaining
+
+    def start_write_behind(self, interval_seconds: float = 5.0, max_pending: int = 50) -> None:
+        """
+        Pornește scrierea în fundal a cozii: la fiecare interval_seconds sau
+        imediat ce coada ajunge la max_pending mutații.
+        """
+        self._flush_interval = interval_seconds
+        self._flush_max_pending = max_pending
+        if self._flush_task is None or self._flush_task.done():
+            self._loop = asyncio.get_running_loop()
+            self._flush_wakeup = asyncio.Event()
+            self._flush_task = self._loop.create_task(self._flush_loop())
+            logger.info(f"Scrieri Google Sheets amânate (flush la {interval_seconds:.0f}s sau {max_pending} scrieri)")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wakeup.clear()
+
+            try:
+                while self._writes.depth() and await self._loop.run_in_executor(self._executor, self.flush_writes):
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Eroare la scrierea cozii Google Sheets: {e}")
+
+    async def stop_write_behind(self) -> None:
+        """Oprește scrierea în fundal și golește coada."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.drain_writes)
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._flush_task is not None and not self._flush_task.done(),
+            **self._writes.stats()
+        }
+
+    def add_write_listener(self, callback: Callable[[], None]) -> None:
+        """
+        Înregistrează un hook apelat după fiecare scriere care schimbă echipele
+        sau pariurile (save_team, delete_team, progresia și mizele echipelor,
+        update_match_status, update_bet_result, import_from_sheet). Poate fi
+        apelat din orice thread.
+        """
+        self._write_listeners.append(callback)
+
+    def _notify_write(self) -> None:
+        for callback in self._write_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Eroare în hook-ul de scriere Google Sheets: {e}")
+
+    def load_teams(self) -> List[Dict[str, Any]]:
+        """
+        Încarcă echipele (din starea locală).
+
+        Returns:
+            Lista de echipe ca dicționare
+        """
+        try:
+            teams = self._store.load_teams()
+            for team in teams:
+                team["betfair_id"] = team.get("betfair_id") or None
             return teams
 
         except Exception as e:
             logger.error(f"Eroare la încărcarea echipelor: {e}")
             return []
 
+    @instrumented
     def save_team(self, team: Dict[str, Any]) -> bool:
         """
-        Salvează sau actualizează o echipă în Google Sheets.
-        Creează și un sheet separat pentru echipă.
+        Salvează sau actualizează o echipă în Google Sheets și în starea locală.
+        Creează și un sheet separat pentru echipă (scris direct, nu prin coadă).
 
         Args:
             team: Datele echipei
@@ -218,45 +835,50 @@ class GoogleSheetsClient:
             return False
 
         try:
-            # Save to Index sheet
-            headers = ["id", "name", "betfair_id", "sport", "league", "country",
-                      "cumulative_loss", "last_stake", "progression_step", "status",
-                      "created_at", "updated_at", "initial_stake", "total_matches", "matches_won", "total_profit"]
-            worksheet = self._get_or_create_worksheet("Index", headers)
+            # Index-ul e modificat direct: serializat cu flush-urile din fundal
+            with self._flush_lock:
+                # Rândul e rescris complet: scrierile amânate trebuie aplicate înainte
+                self.drain_writes()
 
-            cell = worksheet.find(team["id"])
+                # Save to Index sheet
+                worksheet = self._get_or_create_worksheet("Index", INDEX_HEADERS)
 
-            row_data = [
-                team["id"],
-                team["name"],
-                team.get("betfair_id", ""),
-                team.get("sport", "football"),
-                team.get("league", ""),
-                team.get("country", ""),
-                team.get("cumulative_loss", 0),
-                team.get("last_stake", 0),
-                team.get("progression_step", 0),
-                team.get("status", "active"),
-                team.get("created_at", datetime.utcnow().isoformat()),
-                datetime.utcnow().isoformat(),
-                team.get("initial_stake", 5),
-                team.get("total_matches", 0),
-                team.get("matches_won", 0),
-                team.get("total_profit", 0)
-            ]
+                row_num = self._find_row(worksheet, "id", team["id"])
 
-            if cell:
-                row_num = cell.row
-                worksheet.update(f"A{row_num}:P{row_num}", [row_data])
-            else:
-                worksheet.append_row(row_data)
+                row_data = [
+                    team["id"],
+                    team["name"],
+                    team.get("betfair_id", ""),
+                    team.get("sport", "football"),
+                    team.get("league", ""),
+                    team.get("country", ""),
+                    team.get("cumulative_loss", 0),
+                    team.get("last_stake", 0),
+                    team.get("progression_step", 0),
+                    team.get("status", "active"),
+                    team.get("created_at", datetime.utcnow().isoformat()),
+                    datetime.utcnow().isoformat(),
+                    team.get("initial_stake", 5),
+                    team.get("total_matches", 0),
+                    team.get("matches_won", 0),
+                    team.get("total_profit", 0)
+                ]
 
-            # Create separate sheet for team
-            self._create_team_sheet(team["name"])
+                if row_num:
+                    worksheet.update(values=[row_data], range_name=row_range(INDEX_HEADERS, row_num))
+                    self._row_index(worksheet).updated(row_num, row_record(INDEX_HEADERS, row_data))
+                else:
+                    self._append_row(worksheet, INDEX_HEADERS, row_data)
 
-            self.invalidate_cache("teams")
-            logger.info(f"Echipă salvată: {team['name']}")
-            return True
+                # Create separate sheet for team
+                self._create_team_sheet(team["name"])
+
+                with self._state_lock:
+                    self._store.save_team(team)
+                    self._local_writes["Index"] = self._local_writes.get("Index", 0) + 1
+                self._notify_write()
+                logger.info(f"Echipă salvată: {team['name']}")
+                return True
 
         except Exception as e:
             logger.error(f"Eroare la salvarea echipei: {e}")
@@ -266,16 +888,17 @@ class GoogleSheetsClient:
         """Creează un sheet separat pentru o echipă."""
         try:
             try:
-                worksheet = self._spreadsheet.worksheet(team_name)
+                worksheet = self._worksheet(team_name)
                 logger.info(f"Sheet '{team_name}' există deja")
                 self._apply_status_formatting(worksheet)
                 return worksheet
             except:
                 pass
 
-            headers = ["Data", "Meci", "Competiție", "Cotă", "Miză", "Status", "Profit", "Bet ID"]
-            worksheet = self._spreadsheet.add_worksheet(title=team_name, rows=100, cols=len(headers))
-            worksheet.append_row(headers)
+            worksheet = self._spreadsheet.add_worksheet(title=team_name, rows=100, cols=len(TEAM_SHEET_HEADERS))
+            worksheet.append_row(TEAM_SHEET_HEADERS)
+            self._worksheets[team_name] = worksheet
+            self._index_records(team_name, [])
             self._apply_status_formatting(worksheet)
 
             logger.info(f"Sheet creat pentru echipa: {team_name}")
@@ -296,7 +919,8 @@ class GoogleSheetsClient:
             rules = ConditionalFormatRules(worksheet)
             rules.clear()
 
-            range_f = GridRange.from_a1_range("F2:F1000", worksheet)
+            status_col = column_letter(column_index(TEAM_SHEET_HEADERS, "Status"))
+            range_f = GridRange.from_a1_range(f"{status_col}2:{status_col}1000", worksheet)
 
             won_rule = ConditionalFormatRule(
                 ranges=[range_f],
@@ -358,6 +982,7 @@ class GoogleSheetsClient:
             logger.error(f"Eroare la aplicarea formatting-ului: {e}")
             return False
 
+    @instrumented
     def apply_formatting_to_all_teams(self) -> int:
         """Aplică conditional formatting pe toate sheet-urile echipelor existente."""
         if not self._connected:
@@ -368,8 +993,8 @@ class GoogleSheetsClient:
 
         count = 0
         try:
-            all_sheets = self._spreadsheet.worksheets()
-            for sheet in all_sheets:
+            self._worksheets = {ws.title: ws for ws in self._spreadsheet.worksheets()}
+            for sheet in self._worksheets.values():
                 if sheet.title in ["Index", "Istoric"]:
                     continue
                 if self._apply_status_formatting(sheet):
@@ -379,9 +1004,12 @@ class GoogleSheetsClient:
             logger.error(f"Eroare la aplicarea formatting-ului global: {e}")
         return count
 
+    @instrumented
     def save_matches_for_team(self, team_name: str, matches: List[Dict[str, Any]]) -> bool:
         """
-        Salvează meciurile programate în sheet-ul echipei.
+        Salvează meciurile programate ale echipei în starea locală (meciurile
+        existente sunt sărite); meciurile noi sunt adăugate în sheet prin coadă,
+        cu un singur append_rows.
 
         Args:
             team_name: Numele echipei
@@ -390,149 +1018,93 @@ class GoogleSheetsClient:
         Returns:
             True dacă salvarea a reușit
         """
-        if not self._connected:
-            return False
-
         try:
-            worksheet = self._spreadsheet.worksheet(team_name)
-
-            for match in matches:
-                # Check if match already exists (by event_name)
-                try:
-                    cell = worksheet.find(match.get("event_name", ""))
-                    if cell:
-                        continue  # Skip existing match
-                except:
-                    pass
+            records = [
+                {
+                    "Data": match.get("start_time", ""),
+                    "Meci": str(match.get("event_name", "")).strip(),
+                    "Competiție": match.get("competition", ""),
+                    "Cotă": match.get("odds", ""),
+                    "Miză": "",  # Se completează la plasare
+                    "Status": "PROGRAMAT",
+                    "Profit": "",
+                    "Bet ID": ""
+                }
+                for match in matches
+            ]
 
-                row_data = [
-                    match.get("start_time", ""),
-                    match.get("event_name", ""),
-                    match.get("competition", ""),
-                    match.get("odds", ""),
-                    "",  # Miză - se completează la plasare
-                    "PROGRAMAT",
-                    "",  # Profit
-                    ""   # Bet ID
-                ]
-                worksheet.append_row(row_data)
+            with self._state_lock:
+                added = self._store.add_matches(team_name, records)
+                for record in added:
+                    self._enqueue_write(team_name, ("Meci", record["Meci"]), record, kind=APPEND)
+            if added:
+                self._schedule_flush()
 
-            logger.info(f"Salvate {len(matches)} meciuri pentru {team_name}")
+            logger.info(f"Salvate {len(added)} meciuri noi pentru {team_name} ({len(matches) - len(added)} existente)")
             return True
 
         except Exception as e:
             logger.error(f"Eroare la salvarea meciurilor pentru {team_name}: {e}")
             return False
 
+    @instrumented
     def update_team_progression(self, team_name: str, cumulative_loss: float, step: int, last_stake: float) -> bool:
-        """Actualizează progresia în Index sheet."""
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet("Index")
-            cell = worksheet.find(team_name)
-
-            if cell:
-                row = cell.row
-                worksheet.update_cell(row, 7, cumulative_loss)
-                worksheet.update_cell(row, 8, last_stake)
-                worksheet.update_cell(row, 9, step)
-                worksheet.update_cell(row, 12, datetime.utcnow().isoformat())
-                logger.info(f"Progresie actualizată în Index pentru {team_name}")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea progresiei pentru {team_name}: {e}")
-            return False
+        """Actualizează progresia echipei (local, replicată în Index)."""
+        self._update_team(team_name, {
+            "cumulative_loss": cumulative_loss,
+            "last_stake": last_stake,
+            "progression_step": step,
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"Progresie actualizată în Index pentru {team_name}")
+        return True
 
+    @instrumented
     def update_team_initial_stake(self, team_name: str, initial_stake: float) -> bool:
-        """Actualizează miza inițială pentru o echipă în Index sheet."""
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet("Index")
-            cell = worksheet.find(team_name)
-
-            if cell:
-                row = cell.row
-                worksheet.update_cell(row, 13, initial_stake)  # Coloana M = initial_stake
-                worksheet.update_cell(row, 12, datetime.utcnow().isoformat())  # updated_at
-                logger.info(f"Miză inițială actualizată pentru {team_name}: {initial_stake} RON")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea mizei inițiale pentru {team_name}: {e}")
-            return False
+        """Actualizează miza inițială pentru o echipă (local, replicată în Index)."""
+        self._update_team(team_name, {
+            "initial_stake": initial_stake,
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"Miză inițială actualizată pentru {team_name}: {initial_stake} RON")
+        return True
 
+    @instrumented
     def update_last_stake(self, team_name: str, stake: float) -> bool:
-        """Actualizează ultima miză plasată pentru o echipă în Index sheet."""
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet("Index")
-            cell = worksheet.find(team_name)
-
-            if cell:
-                row = cell.row
-                worksheet.update_cell(row, 8, stake)  # Coloana H = last_stake
-                worksheet.update_cell(row, 12, datetime.utcnow().isoformat())  # updated_at
-                logger.info(f"Ultima miză actualizată pentru {team_name}: {stake} RON")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea ultimei mize pentru {team_name}: {e}")
-            return False
+        """Actualizează ultima miză plasată pentru o echipă (local, replicată în Index)."""
+        self._update_team(team_name, {
+            "last_stake": stake,
+            "updated_at": datetime.utcnow().isoformat()
+        })
+        logger.info(f"Ultima miză actualizată pentru {team_name}: {stake} RON")
+        return True
 
+    @instrumented
     def update_match_status(self, team_name: str, event_name: str, status: str, stake: float = None, profit: float = None, bet_id: str = None) -> bool:
-        """Actualizează statusul unui meci în sheet-ul echipei."""
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet(team_name)
-            cell = worksheet.find(event_name)
-
-            if cell:
-                row = cell.row
-                if stake is not None:
-                    worksheet.update_cell(row, 5, stake)  # Miză
-                worksheet.update_cell(row, 6, status)  # Status
-                if profit is not None:
-                    worksheet.update_cell(row, 7, profit)  # Profit
-                if bet_id:
-                    worksheet.update_cell(row, 8, bet_id)  # Bet ID
-                return True
-            return False
-
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea meciului {event_name}: {e}")
-            return False
+        """Actualizează statusul unui meci (local, replicat în sheet-ul echipei)."""
+        values: Dict[str, Any] = {"Status": status}
+        if stake is not None:
+            values["Miză"] = stake
+        if profit is not None:
+            values["Profit"] = profit
+        if bet_id:
+            values["Bet ID"] = bet_id
+        updated = self._update_match(team_name, ("Meci", event_name), values)
+        self._notify_write()
+        return updated
 
     def get_scheduled_matches(self, team_name: str) -> List[Dict[str, Any]]:
-        """Obține meciurile programate pentru o echipă."""
-        if not self._connected:
-            return []
-
+        """Obține meciurile programate pentru o echipă (din starea locală)."""
         try:
-            worksheet = self._spreadsheet.worksheet(team_name)
-            records = worksheet.get_all_records()
-
-            matches = []
-            for record in records:
-                if record.get("Status") == "PROGRAMAT":
-                    matches.append(record)
-
-            return matches
+            return self._store.matches_with_status("PROGRAMAT", team_name)
 
         except Exception as e:
             logger.error(f"Eroare la citirea meciurilor pentru {team_name}: {e}")
             return []
 
+    @instrumented
     def delete_team(self, team_id: str) -> bool:
-        """Șterge o echipă din Google Sheets (Index + sheet-ul echipei)."""
+        """Șterge o echipă din Google Sheets (Index + sheet-ul echipei) și din starea locală."""
         if not self._connected:
             self.connect()
 
@@ -540,41 +1112,47 @@ class GoogleSheetsClient:
             return False
 
         try:
-            worksheet = self._spreadsheet.worksheet("Index")
-            cell = worksheet.find(team_id)
-
-            if cell:
-                row_values = worksheet.row_values(cell.row)
-                team_name = row_values[1] if len(row_values) > 1 else None
-
-                worksheet.delete_rows(cell.row)
-                logger.info(f"Echipă ștearsă din Index: {team_id}")
-
-                if team_name:
-                    try:
-                        team_sheet = self._spreadsheet.worksheet(team_name)
-                        self._spreadsheet.del_worksheet(team_sheet)
-                        logger.info(f"Sheet șters: {team_name}")
-                    except Exception as e:
-                        logger.warning(f"Nu s-a putut șterge sheet-ul {team_name}: {e}")
-
-                return True
-            return False
+            # Index-ul e modificat direct: serializat cu flush-urile din fundal
+            with self._flush_lock:
+                self.drain_writes()
+
+                worksheet = self._worksheet("Index")
+                row_num = self._find_row(worksheet, "id", team_id)
+
+                if row_num:
+                    team_name = row_record(INDEX_HEADERS, worksheet.row_values(row_num))["name"] or None
+
+                    worksheet.delete_rows(row_num)
+                    self._row_index(worksheet).deleted(row_num)
+                    logger.info(f"Echipă ștearsă din Index: {team_id}")
+
+                    if team_name:
+                        try:
+                            team_sheet = self._worksheet(team_name)
+                            self._spreadsheet.del_worksheet(team_sheet)
+                            self._forget_worksheets(team_name)
+                            logger.info(f"Sheet șters: {team_name}")
+                        except Exception as e:
+                            logger.warning(f"Nu s-a putut șterge sheet-ul {team_name}: {e}")
+
+            with self._state_lock:
+                deleted = self._store.delete_team(team_id)
+                self._local_writes["Index"] = self._local_writes.get("Index", 0) + 1
+            self._notify_write()
+            return bool(row_num) or deleted is not None
 
         except Exception as e:
             logger.error(f"Eroare la ștergerea echipei: {e}")
             return False
 
+    @instrumented
     def save_bet(self, bet: Dict[str, Any]) -> bool:
         """Salvează un pariu în Google Sheets."""
         if not self._connected:
             return False
 
         try:
-            headers = ["id", "team_id", "team_name", "event_name", "pronostic",
-                      "odds", "stake", "potential_profit", "result", "status",
-                      "placed_at", "settled_at", "created_at"]
-            worksheet = self._get_or_create_worksheet("Istoric", headers)
+            worksheet = self._get_or_create_worksheet("Istoric", BET_HEADERS)
 
             row_data = [
                 bet["id"],
@@ -592,13 +1170,12 @@ class GoogleSheetsClient:
                 bet.get("created_at", datetime.utcnow().isoformat())
             ]
 
-            cell = worksheet.find(bet["id"]) if worksheet.row_count > 1 else None
+            row_num = self._find_row(worksheet, "id", bet["id"])
 
-            if cell:
-                row_num = cell.row
-                worksheet.update(f"A{row_num}:M{row_num}", [row_data])
+            if row_num:
+                worksheet.update(values=[row_data], range_name=row_range(BET_HEADERS, row_num))
             else:
-                worksheet.append_row(row_data)
+                self._append_row(worksheet, BET_HEADERS, row_data)
 
             return True
 
@@ -606,13 +1183,14 @@ class GoogleSheetsClient:
             logger.error(f"Eroare la salvarea pariului: {e}")
             return False
 
+    @instrumented
     def load_bets(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Încarcă pariurile din Google Sheets."""
         if not self._connected:
             return []
 
         try:
-            worksheet = self._spreadsheet.worksheet("Istoric")
+            worksheet = self._worksheet("Istoric")
             records = worksheet.get_all_records()
 
             bets = []
@@ -628,7 +1206,7 @@ class GoogleSheetsClient:
 
     def get_pending_bets(self, team_name: str = None) -> List[Dict[str, Any]]:
         """
-        Obține pariurile cu status PENDING.
+        Obține pariurile cu status PENDING (din starea locală).
 
         Args:
             team_name: Dacă e specificat, returnează doar pentru acea echipă.
@@ -637,58 +1215,17 @@ class GoogleSheetsClient:
         Returns:
             Lista de pariuri pending cu team_name inclus
         """
-        if not self._connected:
-            return []
-
-        pending_bets = []
-
         try:
-            # Dacă avem team_name specific, căutăm doar în acel sheet
-            if team_name:
-                try:
-                    worksheet = self._spreadsheet.worksheet(team_name)
-                    records = worksheet.get_all_records()
-
-                    for record in records:
-                        if record.get("Status") == "PENDING":
-                            record["team_name"] = team_name
-                            pending_bets.append(record)
-                except Exception as e:
-                    logger.warning(f"Nu s-a putut citi sheet-ul pentru {team_name}: {e}")
-
-                return pending_bets
-
-            # Altfel, căutăm în toate echipele
-            teams = self.load_teams()
-
-            for team in teams:
-                t_name = team.get("name", "")
-                if not t_name:
-                    continue
-
-                try:
-                    worksheet = self._spreadsheet.worksheet(t_name)
-                    records = worksheet.get_all_records()
-
-                    for record in records:
-                        if record.get("Status") == "PENDING":
-                            record["team_name"] = t_name
-                            pending_bets.append(record)
-
-                except Exception as e:
-                    logger.warning(f"Nu s-a putut citi sheet-ul pentru {t_name}: {e}")
-                    continue
-
-            logger.info(f"Găsite {len(pending_bets)} pariuri PENDING")
-            return pending_bets
+            return self._store.matches_with_status("PENDING", team_name)
 
         except Exception as e:
             logger.error(f"Eroare la citirea pariurilor pending: {e}")
             return []
 
+    @instrumented
     def update_bet_result(self, team_name: str, bet_id: str, status: str, profit: float = 0) -> bool:
         """
-        Actualizează rezultatul unui pariu în sheet-ul echipei.
+        Actualizează rezultatul unui pariu (local, replicat în sheet-ul echipei).
 
         Args:
             team_name: Numele echipei
@@ -697,89 +1234,40 @@ class GoogleSheetsClient:
             profit: Profitul (pozitiv pentru WIN, negativ pentru LOSE)
 
         Returns:
-            True dacă actualizarea a reușit
+            True dacă pariul a fost găsit și actualizat în starea locală
         """
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet(team_name)
-
-            # Find the row with this bet_id
-            cell = worksheet.find(str(bet_id))
-
-            if not cell:
-                logger.warning(f"Nu s-a găsit pariul {bet_id} în sheet-ul {team_name}")
-                return False
-
-            row = cell.row
-
-            # Update Status (column F) and Profit (column G)
-            worksheet.update_cell(row, 6, status)  # Status
-            worksheet.update_cell(row, 7, profit)  # Profit
-
+        updated = self._update_match(team_name, ("Bet ID", str(bet_id)), {"Status": status, "Profit": profit})
+        self._notify_write()
+        if updated:
             logger.info(f"Actualizat pariu {bet_id}: {status}, profit: {profit}")
-            return True
-
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea pariului {bet_id}: {e}")
-            return False
+        return updated
 
+    @instrumented
     def update_team_progression_after_result(self, team_name: str, won: bool, stake: float, profit: float = 0) -> bool:
         """
-        Actualizează progresia echipei în Index sheet după rezultatul unui pariu.
-        Actualizează și statisticile: total_matches, matches_won, total_profit
+        Actualizează progresia echipei după rezultatul unui pariu.
+        Actualizează și statisticile: total_matches, matches_won, total_profit.
+        Noile valori sunt calculate în starea locală și replicate în Index ca
+        valori fixe; o echipă necunoscută local e calculată în sheet, la scriere
+        (vezi sheets_write_queue.apply_mutation).
         """
-        if not self._connected:
-            return False
-
-        try:
-            worksheet = self._spreadsheet.worksheet("Index")
-            cell = worksheet.find(team_name)
-
-            if not cell:
-                logger.warning(f"Echipa {team_name} nu a fost găsită în Index")
-                return False
-
-            row = cell.row
-            row_values = worksheet.row_values(row)
-
-            current_loss = float(row_values[6]) if len(row_values) > 6 and row_values[6] else 0
-            current_step = int(row_values[8]) if len(row_values) > 8 and row_values[8] else 0
-
-            current_total_matches = int(row_values[13]) if len(row_values) > 13 and row_values[13] else 0
-            current_matches_won = int(row_values[14]) if len(row_values) > 14 and row_values[14] else 0
-            current_total_profit = float(row_values[15]) if len(row_values) > 15 and row_values[15] else 0
+        if won:
+            logger.info(f"WIN pentru {team_name} - Reset progresie")
+        else:
+            logger.info(f"LOSE pentru {team_name} - Progresie: +{stake} la pierderea cumulată")
 
-            if won:
-                new_cumulative_loss = 0
-                new_step = 0
-                logger.info(f"WIN pentru {team_name} - Reset progresie")
+        result = {"won": won, "stake": stake, "profit": profit, "updated_at": datetime.utcnow().isoformat()}
+        with self._state_lock:
+            values = self._store.apply_result(team_name, **result)
+            if values is None:
+                self._enqueue_write("Index", ("name", team_name), result, kind=PROGRESSION)
             else:
-                new_cumulative_loss = current_loss + stake
-                new_step = current_step + 1
-                logger.info(f"LOSE pentru {team_name} - Progresie: loss={new_cumulative_loss}, step={new_step}")
-
-            new_total_matches = current_total_matches + 1
-            new_matches_won = current_matches_won + (1 if won else 0)
-            new_total_profit = current_total_profit + profit
-
-            worksheet.update_cell(row, 7, new_cumulative_loss)
-            worksheet.update_cell(row, 8, stake)
-            worksheet.update_cell(row, 9, new_step)
-            worksheet.update_cell(row, 12, datetime.utcnow().isoformat())
-            worksheet.update_cell(row, 14, new_total_matches)
-            worksheet.update_cell(row, 15, new_matches_won)
-            worksheet.update_cell(row, 16, new_total_profit)
-
-            self.invalidate_cache("teams")
-
-            return True
-
-        except Exception as e:
-            logger.error(f"Eroare la actualizarea progresiei pentru {team_name}: {e}")
-            return False
+                self._enqueue_write("Index", ("name", team_name), values)
+        self._notify_write()
+        self._schedule_flush()
+        return True
 
+    @instrumented
     def migrate_index_columns(self) -> bool:
         """
         Migrează sheet-ul Index pentru a adăuga coloanele lipsă:
@@ -796,14 +1284,10 @@ class GoogleSheetsClient:
             return False
 
         try:
-            worksheet = self._spreadsheet.worksheet("Index")
+            worksheet = self._worksheet("Index")
             headers = worksheet.row_values(1)
 
-            expected_headers = ["id", "name", "betfair_id", "sport", "league", "country",
-                              "cumulative_loss", "last_stake", "progression_step", "status",
-                              "created_at", "updated_at", "initial_stake", "total_matches", "matches_won", "total_profit"]
-
-            need_column_creation = len(headers) < 16 or "total_matches" not in headers
+            need_column_creation = len(headers) < len(INDEX_HEADERS) or "total_matches" not in headers
 
             if not need_column_creation:
                 logger.info("Migrare Index: coloanele există, verificare sincronizare date...")
@@ -811,41 +1295,46 @@ class GoogleSheetsClient:
                 logger.info(f"Migrare Index: găsite {len(headers)} coloane, adaug coloanele lipsă...")
 
             current_cols = worksheet.col_count
-            if current_cols < 16:
-                worksheet.resize(cols=16)
-                logger.info(f"Migrare Index: extins sheet-ul de la {current_cols} la 16 coloane")
+            if current_cols < len(INDEX_HEADERS):
+                worksheet.resize(cols=len(INDEX_HEADERS))
+                logger.info(f"Migrare Index: extins sheet-ul de la {current_cols} la {len(INDEX_HEADERS)} coloane")
 
-            if len(headers) < 14 or "total_matches" not in headers:
-                worksheet.update_cell(1, 14, "total_matches")
-            if len(headers) < 15 or "matches_won" not in headers:
-                worksheet.update_cell(1, 15, "matches_won")
-            if len(headers) < 16 or "total_profit" not in headers:
-                worksheet.update_cell(1, 16, "total_profit")
+            # Toate modificările (header + rânduri) pleacă într-un singur batch_update
+            updates = row_updates(INDEX_HEADERS, 1, {
+                name: name
+                for name in ("total_matches", "matches_won", "total_profit")
+                if column_index(INDEX_HEADERS, name) > len(headers) or name not in headers
+            })
 
             all_values = worksheet.get_all_values()
             num_rows = len(all_values)
 
             if num_rows > 1:
                 for row_num in range(2, num_rows + 1):
-                    row_values = all_values[row_num - 1]
+                    record = row_record(INDEX_HEADERS, all_values[row_num - 1])
+                    values: Dict[str, Any] = {}
 
-                    progression_step = int(row_values[8]) if len(row_values) > 8 and row_values[8] else 0
-                    current_total_matches = int(row_values[13]) if len(row_values) > 13 and row_values[13] else 0
+                    progression_step = int(record["progression_step"] or 0)
+                    current_total_matches = int(record["total_matches"] or 0)
 
                     if progression_step > 0 and current_total_matches == 0:
-                        worksheet.update_cell(row_num, 14, progression_step)
+                        values["total_matches"] = progression_step
                         logger.info(f"Migrare: sincronizat total_matches={progression_step} pentru rândul {row_num}")
-                    elif len(row_values) < 14 or not row_values[13]:
-                        worksheet.update_cell(row_num, 14, 0)
+                    elif not record["total_matches"]:
+                        values["total_matches"] = 0
+
+                    if not record["matches_won"]:
+                        values["matches_won"] = 0
+                    if not record["total_profit"]:
+                        values["total_profit"] = 0
 
-                    if len(row_values) < 15 or not row_values[14]:
-                        worksheet.update_cell(row_num, 15, 0)
-                    if len(row_values) < 16 or not row_values[15]:
-                        worksheet.update_cell(row_num, 16, 0)
+                    updates.extend(row_updates(INDEX_HEADERS, row_num, values))
 
                 logger.info(f"Migrare Index: populate {num_rows - 1} echipe")
 
-            self.invalidate_cache("teams")
+            if updates:
+                worksheet.batch_update(updates, raw=False)
+
             logger.info("Migrare Index completă!")
 
             self.sync_team_statistics()
@@ -856,6 +1345,7 @@ class GoogleSheetsClient:
             logger.error(f"Eroare la migrarea Index: {e}")
             return False
 
+    @instrumented
     def sync_team_statistics(self) -> bool:
         """
         Sincronizează statisticile echipelor din Index cu datele din sheet-urile individuale.
@@ -865,7 +1355,7 @@ class GoogleSheetsClient:
             return False
 
         try:
-            index_worksheet = self._spreadsheet.worksheet("Index")
+            index_worksheet = self._worksheet("Index")
             all_teams = index_worksheet.get_all_values()
 
             if len(all_teams) <= 1:
@@ -873,16 +1363,18 @@ class GoogleSheetsClient:
 
             logger.info("Sincronizare statistici echipe din sheet-uri individuale...")
 
-            for row_num in range(2, len(all_teams) + 1):
-                row_values = all_teams[row_num - 1]
-                team_name = row_values[1] if len(row_values) > 1 else ""
+            index_records = [row_record(INDEX_HEADERS, row) for row in all_teams[1:]]
+            records_by_team = self._fetch_team_records([r["name"] for r in index_records if r["name"]])
+
+            updates: List[Dict[str, Any]] = []
+            for row_num, index_record in enumerate(index_records, start=2):
+                team_name = index_record["name"]
 
-                if not team_name:
+                if team_name not in records_by_team:
                     continue
 
                 try:
-                    team_worksheet = self._spreadsheet.worksheet(team_name)
-                    team_records = team_worksheet.get_all_records()
+                    team_records = records_by_team[team_name]
 
                     total_matches = 0
                     matches_won = 0
@@ -900,20 +1392,24 @@ class GoogleSheetsClient:
                             stake = float(record.get("Miză", 0) or 0)
                             total_profit -= stake
 
-                    current_total = int(row_values[13]) if len(row_values) > 13 and row_values[13] else 0
-                    current_won = int(row_values[14]) if len(row_values) > 14 and row_values[14] else 0
+                    current_total = int(index_record["total_matches"] or 0)
+                    current_won = int(index_record["matches_won"] or 0)
 
                     if total_matches != current_total or matches_won != current_won:
-                        index_worksheet.update_cell(row_num, 14, total_matches)
-                        index_worksheet.update_cell(row_num, 15, matches_won)
-                        index_worksheet.update_cell(row_num, 16, total_profit)
+                        updates.extend(row_updates(INDEX_HEADERS, row_num, {
+                            "total_matches": total_matches,
+                            "matches_won": matches_won,
+                            "total_profit": total_profit
+                        }))
                         logger.info(f"Sincronizat {team_name}: matches={total_matches}, won={matches_won}, profit={total_profit}")
 
                 except Exception as e:
                     logger.warning(f"Nu s-a putut sincroniza {team_name}: {e}")
                     continue
 
-            self.invalidate_cache("teams")
+            if updates:
+                index_worksheet.batch_update(updates, raw=False)
+
             logger.info("Sincronizare statistici completă!")
             return True
 
@@ -922,6 +1418,178 @@ class GoogleSheetsClient:
             return False
 
 
+
+class AsyncGoogleSheetsClient:
+    """
+    Fațadă async pentru GoogleSheetsClient, folosită din codul async (rute,
+    WebSocket, BotEngine). Operațiile care fac I/O gspread (sau pot declanșa
+    un flush sincron al cozii) rulează pe un pool de thread-uri dedicat și
+    mărginit, deci event loop-ul nu așteaptă după Google Sheets. Citirile din
+    starea locală rulează direct.
+
+    Valorile derivate (statistici) sunt ținute în read_cache, golit de
+    hook-ul de scriere al clientului.
+    """
+
+    def __init__(
+        self,
+        client: GoogleSheetsClient,
+        max_workers: int = 4,
+        cache_size: int = 64,
+        cache_stale_seconds: float = 300.0
+    ):
+        """
+        Args:
+            client: Clientul sincron
+            max_workers: Thread-urile pool-ului (și conexiunile HTTP ale sesiunii gspread)
+            cache_size: Numărul maxim de valori derivate păstrate în read_cache
+            cache_stale_seconds: Cât timp după expirare o valoare e servită cât se recalculează
+        """
+        self.client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sheets")
+        client.set_executor(self._executor, http_pool_size=max_workers)
+        self.read_cache = AsyncTTLCache("sheets_reads", maxsize=cache_size, ttl=60.0, stale_ttl=cache_stale_seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        client.add_write_listener(self._on_write)
+
+    def _on_write(self) -> None:
+        """Hook de scriere: golește read_cache pe event loop (scrierile rulează pe pool)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self.read_cache.clear()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.read_cache.clear()
+        else:
+            loop.call_soon_threadsafe(self.read_cache.clear)
+
+    async def cached(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        """
+        Valoare derivată din read_cache (single-flight, stale-while-revalidate).
+
+        Args:
+            key: Cheia valorii
+            loader: Funcția async care o calculează (None = nu se salvează)
+            ttl: Durata de viață în secunde (implicit 60)
+
+        Returns:
+            Valoarea din cache sau proaspăt calculată
+        """
+        self._loop = asyncio.get_running_loop()
+        return await self.read_cache.get_or_load(key, loader, ttl=ttl)
+
+    def invalidate_cache(self, key: Optional[str] = None) -> None:
+        """Invalidează read_cache (tot sau o singură cheie)."""
+        if key:
+            self.read_cache.invalidate(key)
+        else:
+            self.read_cache.clear()
+
+    def read_cache_stats(self) -> Dict[str, Any]:
+        return self.read_cache.stats()
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Rulează func pe pool-ul Sheets (timpul de așteptare în pool e înregistrat)."""
+        submitted = time.perf_counter()
+        self._loop = asyncio.get_running_loop()
+
+        def call() -> T:
+            metrics.observe("sheets_pool_wait_seconds", time.perf_counter() - submitted)
+            return func(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    # Starea clientului (fără I/O)
+
+    def configure(self, spreadsheet_id: str, credentials_path: Optional[str] = None) -> bool:
+        return self.client.configure(spreadsheet_id, credentials_path)
+
+    def is_connected(self) -> bool:
+        return self.client.is_connected()
+
+    def is_ready(self) -> bool:
+        return self.client.is_ready()
+
+    def write_queue_stats(self) -> Dict[str, Any]:
+        return self.client.write_queue_stats()
+
+    def start_write_behind(self, interval_seconds: float = 5.0, max_pending: int = 50) -> None:
+        self.client.start_write_behind(interval_seconds, max_pending)
+
+    async def stop_write_behind(self) -> None:
+        await self.client.stop_write_behind()
+
+    # Citiri din starea locală
+
+    async def load_teams(self) -> List[Dict[str, Any]]:
+        return self.client.load_teams()
+
+    async def load_team_records(self, team_names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        return self.client.load_team_records(team_names)
+
+    async def get_pending_bets(self, team_name: str = None) -> List[Dict[str, Any]]:
+        return self.client.get_pending_bets(team_name)
+
+    async def get_scheduled_matches(self, team_name: str) -> List[Dict[str, Any]]:
+        return self.client.get_scheduled_matches(team_name)
+
+    # Operații pe pool
+
+    async def connect(self) -> bool:
+        return await self._run(self.client.connect)
+
+    async def import_from_sheet(self) -> bool:
+        return await self._run(self.client.import_from_sheet)
+
+    async def save_team(self, team: Dict[str, Any]) -> bool:
+        return await self._run(self.client.save_team, team)
+
+    async def delete_team(self, team_id: str) -> bool:
+        return await self._run(self.client.delete_team, team_id)
+
+    async def save_matches_for_team(self, team_name: str, matches: List[Dict[str, Any]]) -> bool:
+        return await self._run(self.client.save_matches_for_team, team_name, matches)
+
+    async def update_team_progression(self, team_name: str, cumulative_loss: float, step: int, last_stake: float) -> bool:
+        return await self._run(self.client.update_team_progression, team_name, cumulative_loss, step, last_stake)
+
+    async def update_team_initial_stake(self, team_name: str, initial_stake: float) -> bool:
+        return await self._run(self.client.update_team_initial_stake, team_name, initial_stake)
+
+    async def update_last_stake(self, team_name: str, stake: float) -> bool:
+        return await self._run(self.client.update_last_stake, team_name, stake)
+
+    async def update_match_status(
+        self,
+        team_name: str,
+        event_name: str,
+        status: str,
+        stake: float = None,
+        profit: float = None,
+        bet_id: str = None
+    ) -> bool:
+        return await self._run(
+            self.client.update_match_status, team_name, event_name, status,
+            stake=stake, profit=profit, bet_id=bet_id
+        )
+
+    async def update_bet_result(self, team_name: str, bet_id: str, status: str, profit: float = 0) -> bool:
+        return await self._run(self.client.update_bet_result, team_name, bet_id, status, profit)
+
+    async def update_team_progression_after_result(self, team_name: str, won: bool, stake: float, profit: float = 0) -> bool:
+        return await self._run(self.client.update_team_progression_after_result, team_name, won, stake, profit)
+
+    async def apply_formatting_to_all_teams(self) -> int:
+        return await self._run(self.client.apply_formatting_to_all_teams)
+
+    async def drain_writes(self) -> int:
+        return await self._run(self.client.drain_writes)
+
+
 google_sheets_client = GoogleSheetsClient()
 
 # Auto-configure from environment variables
@@ -943,3 +1611,18 @@ def auto_configure_google_sheets():
         logger.warning("GOOGLE_SHEETS_SPREADSHEET_ID not found in settings")
 
 auto_configure_google_sheets()
+
+
+def create_async_google_sheets_client() -> AsyncGoogleSheetsClient:
+    """Fațada async a clientului global, cu pool-ul dimensionat din settings."""
+    from app.config import get_settings
+
+    settings = get_settings()
+    return AsyncGoogleSheetsClient(
+        google_sheets_client,
+        max_workers=settings.sheets_max_workers,
+        cache_size=settings.sheets_read_cache_size,
+        cache_stale_seconds=settings.sheets_read_cache_stale_seconds
+    )
+
+async_google_sheets_client = create_async_google_sheets_client()
@@ -0,0 +1,193 @@
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Nivelurile de preț din ladder (EX_BEST_OFFERS întoarce 3)
+LADDER_DEPTH = 3
+
+
+class MarketBookFrame:
+    """
+    Rezultate listMarketBook ca array-uri NumPy contigue:
+    back/lay price și size de formă (piețe × runneri × nivel), plus
+    last traded (piețe × runneri) și total matched (piețe).
+
+    Array-urile sunt construite la primul acces, fiecare dintr-un singur
+    np.array peste liste (fără scrieri element cu element).
+
+    Pozițiile lipsă (runneri în plus, niveluri goale) sunt NaN, iar
+    selection_ids sunt -1. Calculele (cea mai bună cotă, spread, probabilitate
+    implicită, overround) se fac vectorizat pe toate piețele.
+    """
+
+    def __init__(self, books: List[Dict[str, Any]], depth: int = LADDER_DEPTH):
+        """
+        Args:
+            books: Market book-uri cu marketId (format listMarketBook sau cache-ul de stream)
+            depth: Nivelurile de ladder păstrate
+        """
+        self.depth = depth
+        self.market_ids = [str(b["marketId"]) for b in books]
+        self.statuses = [b.get("status", "") for b in books]
+        self._total_matched = [float(b.get("totalMatched") or 0.0) for b in books]
+        self.total_matched = np.array(self._total_matched)
+
+        self._runners: List[List[Dict[str, Any]]] = [b.get("runners") or [] for b in books]
+        self.num_runners = max(map(len, self._runners), default=0)
+        self._market_rows = {market_id: row for row, market_id in enumerate(self.market_ids)}
+
+    @classmethod
+    def from_books(cls, books: Iterable[Dict[str, Any]], depth: int = LADDER_DEPTH) -> "MarketBookFrame":
+        """
+        Construiește frame-ul dintr-un răspuns listMarketBook.
+
+        Args:
+            books: Market book-uri (format listMarketBook sau cache-ul de stream)
+            depth: Nivelurile de ladder păstrate
+        """
+        return cls([b for b in books if b.get("marketId")], depth)
+
+    def __len__(self) -> int:
+        return len(self.market_ids)
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id in self._market_rows
+
+    # ------------------------------------------------------------------
+    # Array-uri (construite la primul acces)
+    # ------------------------------------------------------------------
+
+    def _grid(self, cell, blank) -> List[List[Any]]:
+        """Valorile cell(runner) ca listă piețe × runneri, completată cu blank."""
+        padding = [blank] * self.num_runners
+        return [([cell(r) for r in runners] + padding)[:self.num_runners] for runners in self._runners]
+
+    def _ladder(self, key: str) -> np.ndarray:
+        """Ladder-ul unei părți (availableToBack / availableToLay) ca (piețe, runneri, nivel, [preț, size])."""
+        empty = [(np.nan, np.nan)] * self.depth
+
+        def levels(runner: Dict[str, Any]) -> List[Any]:
+            offers = (runner.get("ex") or {}).get(key) or []
+            return ([(o.get("price"), o.get("size")) for o in offers[:self.depth]] + empty)[:self.depth]
+
+        shape = (len(self), self.num_runners, self.depth, 2)
+        return np.array(self._grid(levels, empty), dtype=float).reshape(shape)
+
+    def _top_of_book(self, key: str) -> np.ndarray:
+        """Primul nivel al unei părți (piețe × runneri), fără restul ladder-ului."""
+        def price(runner: Dict[str, Any]) -> Optional[float]:
+            offers = (runner.get("ex") or {}).get(key)
+            return offers[0].get("price") if offers else None
+
+        return np.array(self._grid(price, None), dtype=float).reshape(len(self), self.num_runners)
+
+    @cached_property
+    def selection_ids(self) -> np.ndarray:
+        grid = self._grid(lambda r: int(r.get("selectionId", -1)), -1)
+        return np.array(grid, dtype=np.int64).reshape(len(self), self.num_runners)
+
+    @cached_property
+    def last_traded(self) -> np.ndarray:
+        grid = self._grid(lambda r: r.get("lastPriceTraded"), None)
+        return np.array(grid, dtype=float).reshape(len(self), self.num_runners)
+
+    @cached_property
+    def _back_ladder(self) -> np.ndarray:
+        return self._ladder("availableToBack")
+
+    @cached_property
+    def _lay_ladder(self) -> np.ndarray:
+        return self._ladder("availableToLay")
+
+    @cached_property
+    def _best_back(self) -> np.ndarray:
+        if "_back_ladder" in self.__dict__:
+            return self._back_ladder[:, :, 0, 0]
+        return self._top_of_book("availableToBack")
+
+    @cached_property
+    def _best_lay(self) -> np.ndarray:
+        if "_lay_ladder" in self.__dict__:
+            return self._lay_ladder[:, :, 0, 0]
+        return self._top_of_book("availableToLay")
+
+    @property
+    def back_price(self) -> np.ndarray:
+        return self._back_ladder[..., 0]
+
+    @property
+    def back_size(self) -> np.ndarray:
+        return self._back_ladder[..., 1]
+
+    @property
+    def lay_price(self) -> np.ndarray:
+        return self._lay_ladder[..., 0]
+
+    @property
+    def lay_size(self) -> np.ndarray:
+        return self._lay_ladder[..., 1]
+
+    # ------------------------------------------------------------------
+    # Calcule vectorizate (piețe × runneri)
+    # ------------------------------------------------------------------
+
+    def best_back(self) -> np.ndarray:
+        """Cea mai bună cotă BACK per runner (NaN dacă nu există ofertă)."""
+        return self._best_back
+
+    def best_lay(self) -> np.ndarray:
+        """Cea mai bună cotă LAY per runner (NaN dacă nu există ofertă)."""
+        return self._best_lay
+
+    def spread(self) -> np.ndarray:
+        """Diferența LAY - BACK la cel mai bun nivel."""
+        return self.best_lay() - self.best_back()
+
+    def back_prices(self, selections: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        """
+        Cea mai bună cotă BACK pentru câte un runner per piață, citită din
+        best_back() printr-o singură indexare după selection_ids.
+
+        Args:
+            selections: {market_id: selection_id}
+
+        Returns:
+            {market_id: cotă sau None} pentru piețele din frame
+        """
+        market_ids = [m for m, s in selections.items() if m in self._market_rows and s is not None]
+        if not market_ids:
+            return {}
+        if not self.num_runners:
+            return dict.fromkeys(market_ids)
+        rows = np.array([self._market_rows[m] for m in market_ids])
+        wanted = np.array([int(selections[m]) for m in market_ids], dtype=np.int64)
+
+        matches = self.selection_ids[rows] == wanted[:, None]
+        prices = self.best_back()[rows, matches.argmax(axis=1)]
+        prices = np.where(matches.any(axis=1), prices, np.nan)
+        return {m: None if np.isnan(p) else p for m, p in zip(market_ids, prices.tolist())}
+
+    def implied_probability(self) -> np.ndarray:
+        """Probabilitatea implicită a cotei BACK (1 / cotă)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 1.0 / self.best_back()
+
+    def overround(self) -> np.ndarray:
+        """
+        Suma probabilităților implicite per piață (1.0 = piață corectă).
+        Piețele fără nicio cotă au NaN.
+        """
+        probabilities = self.implied_probability()
+        priced = ~np.isnan(probabilities)
+        totals = np.where(priced, probabilities, 0.0).sum(axis=1)
+        return np.where(priced.any(axis=1), totals, np.nan)
+
+    # ------------------------------------------------------------------
+    # Acces punctual
+    # ------------------------------------------------------------------
+
+    def total_matched_of(self, market_id: str) -> float:
+        """Suma tranzacționată pe piață (0 dacă nu e în frame)."""
+        row = self._market_rows.get(market_id)
+        return self._total_matched[row] if row is not None else 0.0
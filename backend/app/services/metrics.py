@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Limitele (secunde) bucket-urilor pentru histogramele de latență
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        name + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class PhaseTimer:
+    """
+    Măsoară durata fazelor unei operații (ex: run_cycle: load_teams, prepare,
+    place, record) și durata totală. Fiecare phase() închide faza anterioară.
+    """
+
+    def __init__(self, registry: "Metrics", operation: str):
+        self._registry = registry
+        self.operation = operation
+        self._started = time.perf_counter()
+        self._phase: Optional[str] = None
+        self._phase_started = self._started
+
+    def phase(self, name: str) -> None:
+        """Începe o fază nouă (și o încheie pe cea curentă)."""
+        self._close_phase()
+        self._phase = name
+        self._phase_started = time.perf_counter()
+
+    def _close_phase(self) -> None:
+        if self._phase is not None:
+            self._registry.observe(
+                "bot_phase_seconds",
+                time.perf_counter() - self._phase_started,
+                operation=self.operation,
+                phase=self._phase
+            )
+            self._phase = None
+
+    def finish(self) -> None:
+        self._close_phase()
+        self._registry.observe("bot_operation_seconds", time.perf_counter() - self._started, operation=self.operation)
+
+
+class Metrics:
+    """
+    Registru simplu de metrici în memorie (contoare, gauge-uri și histograme cu label-uri).
+    Thread-safe: e folosit și din codul sincron care rulează în thread-uri (Sheets).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counters: Dict[str, Dict[LabelKey, float]] = defaultdict(lambda: defaultdict(float))
+        self._gauges: Dict[str, Dict[LabelKey, float]] = defaultdict(dict)
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = defaultdict(dict)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        """Incrementează un contor."""
+        with self._lock:
+            self._counters[name][_label_key(labels)] += value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Setează valoarea unui gauge."""
+        with self._lock:
+            self._gauges[name][_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Adaugă o observație (secunde) într-o histogramă."""
+        key = _label_key(labels)
+        with self._lock:
+            histogram = self._histograms[name].get(key)
+            if histogram is None:
+                histogram = self._histograms[name][key] = _Histogram(len(self._buckets))
+            for i, bound in enumerate(self._buckets):
+                if value <= bound:
+                    histogram.counts[i] += 1
+                    break
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Măsoară durata blocului într-o histogramă (funcționează și în cod async)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def phases(self, operation: str) -> Iterator[PhaseTimer]:
+        """Timer de faze pentru o operație; durata totală e înregistrată la ieșire."""
+        timer = PhaseTimer(self, operation)
+        try:
+            yield timer
+        finally:
+            timer.finish()
+
+    def get(self, name: str, **labels: Any) -> float:
+        """Valoarea curentă a unui contor sau gauge (0 dacă nu există)."""
+        key = _label_key(labels)
+        with self._lock:
+            if key in self._counters.get(name, {}):
+                return self._counters[name][key]
+            return self._gauges.get(name, {}).get(key, 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returnează toate metricile ca dicționar serializabil JSON.
+
+        Returns:
+            {"counters": {nume: [{labels, value}]}, "gauges": {...}, "histograms": {...}}
+        """
+        def dump(series: Dict[str, Dict[LabelKey, float]]) -> Dict[str, Any]:
+            return {
+                name: [{"labels": dict(key), "value": value} for key, value in values.items()]
+                for name, values in series.items()
+            }
+
+        with self._lock:
+            return {
+                "counters": dump(self._counters),
+                "gauges": dump(self._gauges),
+                "histograms": {
+                    name: [
+                        {"labels": dict(key), "count": h.count, "sum": round(h.sum, 6)}
+                        for key, h in values.items()
+                    ]
+                    for name, values in self._histograms.items()
+                }
+            }
+
+    def render_prometheus(self) -> str:
+        """Toate metricile în formatul text Prometheus (exposition format 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, values in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in values.items())
+
+            for name, values in sorted(self._gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(key)} {value}" for key, value in values.items())
+
+            for name, values in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in values.items():
+                    cumulative = 0
+                    for bound, count in zip(self._buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
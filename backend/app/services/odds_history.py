@@ -0,0 +1,363 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from app.services.market_frame import LADDER_DEPTH, MarketBookFrame
+
+logger = logging.getLogger(__name__)
+
+# Înregistrare de lățime fixă: un runner dintr-un market book la un moment dat.
+# Nivelurile lipsă din ladder sunt NaN.
+ODDS_RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("market_id", "S16"),
+    ("selection_id", "<i8"),
+    ("back_price", "<f4", (LADDER_DEPTH,)),
+    ("back_size", "<f4", (LADDER_DEPTH,)),
+    ("lay_price", "<f4", (LADDER_DEPTH,)),
+    ("lay_size", "<f4", (LADDER_DEPTH,)),
+    ("last_traded", "<f4"),
+    ("total_matched", "<f4")
+])
+
+
+def records_from_books(books: Iterable[Dict[str, Any]], ts: Optional[float] = None) -> np.ndarray:
+    """
+    Convertește rezultate listMarketBook în înregistrări ODDS_RECORD_DTYPE.
+
+    Args:
+        books: Market book-uri (format listMarketBook)
+        ts: Timestamp-ul snapshot-ului (implicit acum)
+
+    Returns:
+        Array structurat cu câte o înregistrare per runner
+    """
+    frame = MarketBookFrame.from_books(books, depth=LADDER_DEPTH)
+    present = frame.selection_ids >= 0
+    rows = np.nonzero(present)[0]
+
+    records = np.zeros(int(present.sum()), dtype=ODDS_RECORD_DTYPE)
+    records["ts"] = time.time() if ts is None else ts
+    records["market_id"] = np.array(frame.market_ids, dtype="S16")[rows]
+    records["selection_id"] = frame.selection_ids[present]
+    records["back_price"] = frame.back_price[present]
+    records["back_size"] = frame.back_size[present]
+    records["lay_price"] = frame.lay_price[present]
+    records["lay_size"] = frame.lay_size[present]
+    records["last_traded"] = frame.last_traded[present]
+    records["total_matched"] = frame.total_matched[rows]
+    return records
+
+
+def records_to_dicts(records: np.ndarray) -> List[Dict[str, Any]]:
+    """Înregistrările ca dicționare JSON (pentru API); NaN devine None."""
+    def clean(values) -> List[Optional[float]]:
+        return [None if np.isnan(v) else round(float(v), 2) for v in values]
+
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(float(r["ts"]), tz=timezone.utc).isoformat(),
+            "market_id": r["market_id"].decode(),
+            "selection_id": int(r["selection_id"]),
+            "back_prices": clean(r["back_price"]),
+            "back_sizes": clean(r["back_size"]),
+            "lay_prices": clean(r["lay_price"]),
+            "lay_sizes": clean(r["lay_size"]),
+            "last_traded": clean([r["last_traded"]])[0],
+            "total_matched": round(float(r["total_matched"]), 2)
+        }
+        for r in records
+    ]
+
+
+class OddsHistoryStore:
+    """
+    Istoric de cote în fișiere binare append-only, câte unul pe zi (UTC):
+    data/odds_history/odds-YYYYMMDD.bin, înregistrări ODDS_RECORD_DTYPE.
+
+    Citirile folosesc np.memmap, deci memoria nu crește cu mărimea istoricului;
+    înregistrările sunt scrise în ordinea timpului, așa că intervalele se
+    găsesc prin căutare binară pe câmpul ts.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = directory or (Path(__file__).parent.parent.parent / "data" / "odds_history")
+
+    def _path(self, day: date) -> Path:
+        return self.directory / f"odds-{day:%Y%m%d}.bin"
+
+    def days(self) -> List[date]:
+        """Zilele pentru care există istoric."""
+        if not self.directory.exists():
+            return []
+        days = []
+        for path in self.directory.glob("odds-*.bin"):
+            try:
+                days.append(datetime.strptime(path.stem[5:], "%Y%m%d").date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    def append(self, records: np.ndarray) -> None:
+        """Adaugă înregistrări la fișierele zilelor corespunzătoare."""
+        if len(records) == 0:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        day_numbers = (records["ts"] // 86400).astype(np.int64)
+        for day_number in np.unique(day_numbers):
+            day = date(1970, 1, 1) + timedelta(days=int(day_number))
+            with open(self._path(day), "ab") as f:
+                f.write(records[day_numbers == day_number].tobytes())
+
+    def open_day(self, day: date) -> Optional[np.memmap]:
+        """
+        Istoricul unei zile, mapat în memorie (read-only).
+
+        Returns:
+            np.memmap cu înregistrările zilei sau None dacă nu există
+        """
+        path = self._path(day)
+        if not path.exists():
+            return None
+        # O scriere întreruptă poate lăsa o înregistrare parțială la final
+        count = path.stat().st_size // ODDS_RECORD_DTYPE.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=ODDS_RECORD_DTYPE, mode="r", shape=(count,))
+
+    def slice(
+        self,
+        start: datetime,
+        end: datetime,
+        market_id: Optional[str] = None,
+        selection_id: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Înregistrările din intervalul [start, end), opțional filtrate pe piață / runner.
+
+        Args:
+            start: Începutul intervalului (UTC)
+            end: Sfârșitul intervalului (UTC)
+            market_id: Filtru piață (opțional)
+            selection_id: Filtru runner (opțional)
+
+        Returns:
+            Array ODDS_RECORD_DTYPE (copie, independent de fișiere)
+        """
+        start_ts = _timestamp(start)
+        end_ts = _timestamp(end)
+        parts = []
+
+        day = datetime.fromtimestamp(start_ts, tz=timezone.utc).date()
+        last_day = datetime.fromtimestamp(end_ts, tz=timezone.utc).date()
+        while day <= last_day:
+            records = self.open_day(day)
+            day += timedelta(days=1)
+            if records is None:
+                continue
+
+            timestamps = records["ts"]
+            lo = np.searchsorted(timestamps, start_ts, side="left")
+            hi = np.searchsorted(timestamps, end_ts, side="left")
+            window = records[lo:hi]
+
+            mask = np.ones(len(window), dtype=bool)
+            if market_id is not None:
+                mask &= window["market_id"] == market_id.encode()
+            if selection_id is not None:
+                mask &= window["selection_id"] == int(selection_id)
+            parts.append(np.array(window[mask]))
+
+        if not parts:
+            return np.zeros(0, dtype=ODDS_RECORD_DTYPE)
+        return np.concatenate(parts)
+
+    def prune(self, keep_days: int) -> int:
+        """Șterge fișierele mai vechi de keep_days zile. Returnează numărul de fișiere șterse."""
+        cutoff = datetime.utcnow().date() - timedelta(days=keep_days)
+        removed = 0
+        for day in self.days():
+            if day < cutoff:
+                self._path(day).unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        days = self.days()
+        total_bytes = sum(self._path(d).stat().st_size for d in days)
+        return {
+            "days": len(days),
+            "records": total_bytes // ODDS_RECORD_DTYPE.itemsize,
+            "size_mb": round(total_bytes / (1024 * 1024), 2)
+        }
+
+
+def _timestamp(value: datetime) -> float:
+    """Timestamp UTC; datetime-urile naive sunt considerate UTC (ca datetime.utcnow())."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class OddsRecorder:
+    """
+    Înregistrează periodic ladder-ele pieței pentru meciurile programate.
+
+    Piețele sunt adăugate prin track() (la actualizarea meciurilor echipelor)
+    și sunt urmărite până la AFTER_START după ora de start sau până se închid.
+    Lista piețelor urmărite e salvată lângă istoric, ca să supraviețuiască restartului.
+    """
+
+    AFTER_START = timedelta(hours=3)
+
+    def __init__(self, store: Optional[OddsHistoryStore] = None):
+        self.store = store or OddsHistoryStore()
+        self.interval = 60.0
+        self.retention_days = 30
+        # market_id -> timestamp-ul de start al meciului
+        self._markets: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._pruned_on: Optional[date] = None
+        self.snapshots = 0
+        self._load()
+
+    @property
+    def _tracked_file(self) -> Path:
+        return self.store.directory / "tracked_markets.json"
+
+    def _load(self) -> None:
+        if not self._tracked_file.exists():
+            return
+        try:
+            with open(self._tracked_file, "r") as f:
+                self._markets = {k: float(v) for k, v in json.load(f).items()}
+        except Exception as e:
+            logger.error(f"Eroare la încărcarea piețelor urmărite: {e}")
+
+    def _save(self) -> None:
+        try:
+            self.store.directory.mkdir(parents=True, exist_ok=True)
+            with open(self._tracked_file, "w") as f:
+                json.dump(self._markets, f)
+        except Exception as e:
+            logger.error(f"Eroare la salvarea piețelor urmărite: {e}")
+
+    def configure(self, interval_seconds: float = 60.0, retention_days: int = 30) -> None:
+        self.interval = interval_seconds
+        self.retention_days = retention_days
+
+    def track(self, markets: Iterable[Dict[str, Any]]) -> int:
+        """
+        Adaugă piețe de urmărit.
+
+        Args:
+            markets: Rezultate listMarketCatalogue (marketId, marketStartTime)
+
+        Returns:
+            Numărul de piețe noi
+        """
+        added = 0
+        for market in markets:
+            market_id = market.get("marketId")
+            start_time = market.get("marketStartTime")
+            if not market_id or not start_time:
+                continue
+            try:
+                start_ts = datetime.fromisoformat(start_time.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                continue
+            if market_id not in self._markets:
+                added += 1
+            self._markets[market_id] = start_ts
+
+        if added:
+            self._save()
+        return added
+
+    def tracked_markets(self) -> List[str]:
+        return list(self._markets)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.AFTER_START.total_seconds()
+        expired = [m for m, start_ts in self._markets.items() if start_ts < cutoff]
+        for market_id in expired:
+            del self._markets[market_id]
+        if expired:
+            self._save()
+
+    async def record_once(self, client) -> int:
+        """
+        Un snapshot pentru toate piețele urmărite.
+
+        Returns:
+            Numărul de înregistrări scrise
+        """
+        now = time.time()
+        self._expire(now)
+        if not self._markets or not client.is_connected():
+            return 0
+
+        # Fără subscripție: piețele urmărite (zeci per echipă) ar evacua din
+        # stream piețele pe care botul le cotează
+        books = await client.list_market_book(list(self._markets), subscribe=False)
+        records = records_from_books(books, ts=now)
+        await asyncio.to_thread(self.store.append, records)
+        self.snapshots += 1
+
+        closed = [b.get("marketId") for b in books if b.get("status") == "CLOSED"]
+        if closed:
+            for market_id in closed:
+                self._markets.pop(market_id, None)
+            self._save()
+
+        today = datetime.utcnow().date()
+        if self._pruned_on != today:
+            self._pruned_on = today
+            await asyncio.to_thread(self.store.prune, self.retention_days)
+
+        return len(records)
+
+    async def _run(self, client) -> None:
+        while True:
+            try:
+                count = await self.record_once(client)
+                if count:
+                    logger.debug(f"Istoric cote: {count} înregistrări pentru {len(self._markets)} piețe")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Eroare la înregistrarea cotelor: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, client) -> None:
+        """Pornește înregistrarea în fundal."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(client))
+            logger.info(f"Înregistrare istoric cote la fiecare {self.interval:.0f}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked_markets": len(self._markets),
+            "snapshots": self.snapshots,
+            **self.store.stats()
+        }
+
+
+odds_recorder = OddsRecorder()
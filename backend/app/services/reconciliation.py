@@ -0,0 +1,123 @@
+import logging
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Statusuri listClearedOrders pentru pariuri care nu mai sunt active, dar nu au fost decontate
+UNSETTLED_CLEARED_STATUSES = ["LAPSED", "CANCELLED", "VOIDED"]
+
+
+class PendingBetState(str, Enum):
+    SETTLED = "settled"
+    LIVE = "live"
+    LAPSED = "lapsed"
+    MISSING = "missing"
+
+
+class Reconciliation:
+    """Rezultatul reconcilierii: starea pe Betfair a fiecărui pariu PENDING."""
+
+    def __init__(self):
+        self.settled: Dict[str, Dict[str, Any]] = {}
+        self.live: Dict[str, Dict[str, Any]] = {}
+        self.lapsed: Dict[str, Dict[str, Any]] = {}
+        self.missing: List[str] = []
+
+    def classify(self, bet_id: str) -> Tuple[PendingBetState, Optional[Dict[str, Any]]]:
+        """
+        Starea unui pariu și ordinul Betfair corespunzător.
+
+        Returns:
+            (starea, ordinul) - ordinul e None pentru pariurile lipsă
+        """
+        for state, index in (
+            (PendingBetState.SETTLED, self.settled),
+            (PendingBetState.LIVE, self.live),
+            (PendingBetState.LAPSED, self.lapsed)
+        ):
+            if bet_id in index:
+                return state, index[bet_id]
+        return PendingBetState.MISSING, None
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "settled": len(self.settled),
+            "live": len(self.live),
+            "lapsed": len(self.lapsed),
+            "missing": len(self.missing)
+        }
+
+
+async def reconcile_pending_bets(
+    client,
+    bet_ids: List[str],
+    settled_orders: Iterable[Dict[str, Any]]
+) -> Reconciliation:
+    """
+    Clasifică pariurile PENDING într-o singură trecere: settled (din fluxul de
+    settlement), live (listCurrentOrders), settled înainte de watermark,
+    lapsed/cancelled/voided (listClearedOrders) sau lipsă. Fiecare sursă e
+    cerută o singură dată, filtrată pe betIds, doar pentru pariurile încă
+    neclasificate.
+
+    Args:
+        client: BetfairClient
+        bet_ids: ID-urile pariurilor PENDING
+        settled_orders: Ordinele settled deja citite pentru aceste pariuri
+
+    Returns:
+        Reconciliation cu indexurile bet_id -> ordin
+    """
+    result = Reconciliation()
+    wanted = set(bet_ids)
+
+    for order in settled_orders:
+        bet_id = str(order.get("betId", ""))
+        if bet_id in wanted:
+            result.settled[bet_id] = order
+
+    remaining = [b for b in bet_ids if b not in result.settled]
+    if remaining:
+        for order in await client.get_current_orders(bet_ids=remaining):
+            bet_id = str(order.get("betId", ""))
+            if bet_id in wanted:
+                result.live[bet_id] = order
+
+    remaining = [b for b in remaining if b not in result.live]
+
+    # Settlement-uri anterioare watermark-ului (settledDate întârziat sau o
+    # verificare anterioară care nu a salvat pariul): cerute fără interval de dată
+    if remaining:
+        try:
+            async for order in client.iter_cleared_orders(
+                settled_from=None,
+                bet_ids=remaining,
+                bet_status="SETTLED"
+            ):
+                bet_id = str(order.get("betId", ""))
+                if bet_id in wanted:
+                    result.settled[bet_id] = order
+        except Exception as e:
+            logger.error(f"Eroare la citirea ordinelor SETTLED fără interval: {e}")
+        remaining = [b for b in remaining if b not in result.settled]
+
+    for status in UNSETTLED_CLEARED_STATUSES:
+        if not remaining:
+            break
+        try:
+            async for order in client.iter_cleared_orders(
+                settled_from=None,
+                bet_ids=remaining,
+                bet_status=status
+            ):
+                bet_id = str(order.get("betId", ""))
+                if bet_id in wanted:
+                    result.lapsed[bet_id] = {**order, "betStatus": status}
+        except Exception as e:
+            logger.error(f"Eroare la citirea ordinelor {status}: {e}")
+        remaining = [b for b in remaining if b not in result.lapsed]
+
+    result.missing = remaining
+    logger.info(f"Reconciliere {len(bet_ids)} pariuri PENDING: {result.counts()}")
+    return result
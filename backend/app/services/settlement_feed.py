@@ -0,0 +1,98 @@
+import json
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SettlementFeed:
+    """
+    Flux incremental de pariuri settled: reține în data/settlement_watermark.json
+    până unde a fost citit listClearedOrders, iar la fiecare verificare cere doar
+    settlement-urile noi pentru pariurile PENDING.
+    """
+
+    # Suprapunere față de ultima sincronizare (settlement-urile apar cu întârziere în API)
+    OVERLAP = timedelta(minutes=15)
+
+    # Prima sincronizare (fără watermark) și vechimea maximă acceptată
+    INITIAL_LOOKBACK = timedelta(days=3)
+    MAX_LOOKBACK = timedelta(days=90)
+
+    def __init__(self, storage_file: Optional[Path] = None):
+        self._storage_file = storage_file or (
+            Path(__file__).parent.parent.parent / "data" / "settlement_watermark.json"
+        )
+        self._watermark: Optional[datetime] = None
+        self._sync_to: Optional[datetime] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self._storage_file.exists():
+            return
+        try:
+            with open(self._storage_file, "r") as f:
+                data = json.load(f)
+            self._watermark = datetime.fromisoformat(data["settled_from"])
+            logger.info(f"Watermark settlement: {self._watermark.isoformat()}")
+        except Exception as e:
+            logger.error(f"Eroare la încărcarea watermark-ului de settlement: {e}")
+
+    def _save(self) -> None:
+        try:
+            self._storage_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._storage_file, "w") as f:
+                json.dump({"settled_from": self._watermark.isoformat()}, f, indent=2)
+        except Exception as e:
+            logger.error(f"Eroare la salvarea watermark-ului de settlement: {e}")
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        """Începutul intervalului cerut la următoarea sincronizare (UTC)."""
+        return self._watermark
+
+    def _settled_from(self, now: datetime) -> datetime:
+        if self._watermark is None:
+            return now - self.INITIAL_LOOKBACK
+        return max(self._watermark, now - self.MAX_LOOKBACK)
+
+    async def iter_settlements(self, client, bet_ids: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Settlement-urile noi pentru pariurile date, de la watermark până acum.
+
+        Args:
+            client: BetfairClient
+            bet_ids: ID-urile pariurilor PENDING
+
+        Yields:
+            Cleared orders (betStatus SETTLED)
+        """
+        now = datetime.utcnow()
+        settled_from = self._settled_from(now)
+        self._sync_to = now
+
+        logger.info(f"Sincronizare settlement de la {settled_from.isoformat()} pentru {len(bet_ids)} pariuri")
+
+        async for order in client.iter_cleared_orders(
+            settled_from=settled_from,
+            settled_to=now,
+            bet_ids=bet_ids
+        ):
+            yield order
+
+    def commit(self) -> None:
+        """
+        Avansează watermark-ul după o sincronizare procesată complet.
+        Nu se apelează dacă vreun settlement nu a putut fi salvat, ca să fie
+        cerut din nou la următoarea verificare.
+        """
+        if self._sync_to is None:
+            return
+        self._watermark = self._sync_to - self.OVERLAP
+        self._sync_to = None
+        self._save()
+
+
+settlement_feed = SettlementFeed()
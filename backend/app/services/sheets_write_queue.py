@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tipuri de mutații: "set" scrie valori fixe, "append" adaugă rândul (sau îl
+# scrie, dacă există deja), "progression" aplică rezultatul unui pariu peste
+# valorile curente ale rândului echipei din Index
+SET = "set"
+APPEND = "append"
+PROGRESSION = "progression"
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def apply_mutation(record: Dict[str, Any], mutation: Dict[str, Any]) -> None:
+    """
+    Aplică o mutație peste valorile unui rând (header -> valoare).
+    """
+    values = mutation["values"]
+    if mutation["kind"] in (SET, APPEND):
+        record.update(values)
+        return
+
+    won = values["won"]
+    stake = values["stake"]
+    record.update({
+        "cumulative_loss": 0 if won else _number(record.get("cumulative_loss")) + stake,
+        "last_stake": stake,
+        "progression_step": 0 if won else int(_number(record.get("progression_step"))) + 1,
+        "updated_at": values["updated_at"],
+        "total_matches": int(_number(record.get("total_matches"))) + 1,
+        "matches_won": int(_number(record.get("matches_won"))) + (1 if won else 0),
+        "total_profit": _number(record.get("total_profit")) + values["profit"]
+    })
+
+
+class SheetsWriteQueue:
+    """
+    Coada de scrieri amânate (write-behind) pentru Google Sheets.
+
+    Fiecare mutație e identificată prin sheet + cheia rândului (coloană, valoare).
+    Scrierile "set" succesive pe același rând sunt comasate într-una singură
+    (sau în adăugarea rândului, dacă aceasta nu a fost încă scrisă).
+    Mutațiile sunt jurnalizate (JSONL, fsync) înainte de a fi acceptate, iar la
+    pornire jurnalul e reîncărcat, deci nimic nu se pierde la un crash.
+    """
+
+    def __init__(self, journal_file: Optional[Path] = None):
+        self.journal_file = journal_file or (Path(__file__).parent.parent.parent / "data" / "sheets_write_journal.jsonl")
+        self._lock = threading.Lock()
+        self._mutations: List[Dict[str, Any]] = []
+        # Mutațiile preluate de un flush în curs (nu mai pot fi comasate)
+        self._in_flight: set = set()
+        self._seq = 0
+        self.coalesced = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.journal_file.exists():
+            return
+        try:
+            with open(self.journal_file, "r") as f:
+                lines = f.readlines()
+        except Exception as e:
+            logger.error(f"Eroare la citirea jurnalului Google Sheets: {e}")
+            return
+
+        for line in lines:
+            try:
+                mutation = json.loads(line)
+            except ValueError:
+                # O scriere întreruptă poate lăsa o linie incompletă la final
+                continue
+            self._add(mutation)
+
+        if self._mutations:
+            logger.info(f"Reîncărcate {len(self._mutations)} scrieri Google Sheets nescrise din jurnal")
+        self._update_gauge()
+
+    def _journal(self, mutation: Dict[str, Any]) -> None:
+        self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_file, "a") as f:
+            f.write(json.dumps(mutation) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self) -> None:
+        if not self._mutations:
+            self.journal_file.unlink(missing_ok=True)
+            return
+        tmp_file = self.journal_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            for mutation in self._mutations:
+                f.write(json.dumps(mutation) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.journal_file)
+
+    def _update_gauge(self) -> None:
+        metrics.set_gauge("sheets_write_queue_depth", len(self._mutations))
+
+    def _add(self, mutation: Dict[str, Any]) -> None:
+        key = tuple(mutation["key"])
+        if mutation["kind"] == SET:
+            # Doar ultima mutație a rândului poate fi comasată (ordinea contează pentru progresie)
+            for previous in reversed(self._mutations):
+                if previous["sheet"] == mutation["sheet"] and tuple(previous["key"]) == key:
+                    if previous["kind"] in (SET, APPEND) and previous["seq"] not in self._in_flight:
+                        previous["values"].update(mutation["values"])
+                        self.coalesced += 1
+                        metrics.inc("sheets_writes_coalesced_total")
+                        return
+                    break
+
+        self._seq = max(self._seq, mutation.get("seq", 0)) + 1
+        mutation["seq"] = self._seq
+        self._mutations.append(mutation)
+
+    def put(self, sheet: str, key: Tuple[str, Any], kind: str, values: Dict[str, Any]) -> None:
+        """
+        Adaugă o mutație (jurnalizată înainte de a fi acceptată).
+
+        Args:
+            sheet: Numele worksheet-ului
+            key: Rândul țintă, ca (coloană, valoare)
+            kind: SET, APPEND sau PROGRESSION
+            values: Valorile de scris (SET, APPEND) sau rezultatul pariului (PROGRESSION)
+        """
+        mutation = {"sheet": sheet, "key": [key[0], key[1]], "kind": kind, "values": dict(values)}
+        with self._lock:
+            self._journal(mutation)
+            self._add(mutation)
+            self._update_gauge()
+
+    def take(self, limit: int) -> List[Dict[str, Any]]:
+        """Preia (în ordine) până la limit mutații pentru scriere."""
+        with self._lock:
+            batch = [m for m in self._mutations if m["seq"] not in self._in_flight][:limit]
+            self._in_flight.update(m["seq"] for m in batch)
+            return [dict(m, values=dict(m["values"])) for m in batch]
+
+    def complete(self, mutations: List[Dict[str, Any]]) -> None:
+        """Scoate din coadă (și din jurnal) mutațiile scrise."""
+        done = {m["seq"] for m in mutations}
+        with self._lock:
+            self._mutations = [m for m in self._mutations if m["seq"] not in done]
+            self._in_flight -= done
+            self._rewrite_journal()
+            self._update_gauge()
+
+    def release(self, mutations: List[Dict[str, Any]]) -> None:
+        """Readuce în coadă mutațiile a căror scriere a eșuat (reîncercate la următorul flush)."""
+        with self._lock:
+            self._in_flight -= {m["seq"] for m in mutations}
+
+    def pending_sheets(self) -> set:
+        """Sheet-urile care au mutații nescrise."""
+        with self._lock:
+            return {m["sheet"] for m in self._mutations}
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._mutations)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._mutations),
+                "in_flight": len(self._in_flight),
+                "coalesced": self.coalesced
+            }
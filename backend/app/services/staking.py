@@ -1,5 +1,6 @@
 from typing import Tuple
 from app.config import get_settings
+from app.services.tick_ladder import snap_price
 
 
 class StakingService:
@@ -28,7 +29,7 @@ class StakingService:
 
         Args:
             cumulative_loss: Pierderea cumulată până acum pentru echipă
-            new_odds: Cota pentru următorul meci
+            new_odds: Cota pentru următorul meci (adusă pe ladder-ul Betfair, ca ordinul)
             progression_step: Pasul curent de progresie
             team_initial_stake: Miza inițială specifică echipei (dacă e setată)
 
@@ -47,6 +48,9 @@ class StakingService:
         if new_odds <= 1.0:
             raise ValueError(f"Cota trebuie să fie > 1.0, primită: {new_odds}")
 
+        # Miza se calculează la cota la care va fi trimis ordinul
+        new_odds = snap_price(new_odds, "BACK")
+
         stake = (cumulative_loss / (new_odds - 1)) + initial
 
         stake = round(stake, 2)
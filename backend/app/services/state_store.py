@@ -0,0 +1,322 @@
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.sheets_write_queue import PROGRESSION, apply_mutation
+
+logger = logging.getLogger(__name__)
+
+# Coloanele tabelei teams (aceleași cu header-ele sheet-ului Index)
+TEAM_COLUMNS = [
+    "id", "name", "betfair_id", "sport", "league", "country",
+    "cumulative_loss", "last_stake", "progression_step", "status",
+    "created_at", "updated_at", "initial_stake", "total_matches", "matches_won", "total_profit"
+]
+TEAM_NUMERIC_COLUMNS = {
+    "cumulative_loss": float,
+    "last_stake": float,
+    "progression_step": int,
+    "initial_stake": float,
+    "total_matches": int,
+    "matches_won": int,
+    "total_profit": float
+}
+TEAM_DEFAULTS = {"sport": "football", "status": "active", "initial_stake": 5}
+
+# Coloanele sheet-ului unei echipe -> coloanele tabelei matches
+MATCH_COLUMNS = {
+    "Data": "start_time",
+    "Meci": "event_name",
+    "Competiție": "competition",
+    "Cotă": "odds",
+    "Miză": "stake",
+    "Status": "status",
+    "Profit": "profit",
+    "Bet ID": "bet_id"
+}
+
+# Coloanele fără tip păstrează valorile exact ca în sheet (număr sau text)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    betfair_id TEXT,
+    sport TEXT,
+    league TEXT,
+    country TEXT,
+    cumulative_loss REAL NOT NULL DEFAULT 0,
+    last_stake REAL NOT NULL DEFAULT 0,
+    progression_step INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at TEXT,
+    updated_at TEXT,
+    initial_stake REAL NOT NULL DEFAULT 5,
+    total_matches INTEGER NOT NULL DEFAULT 0,
+    matches_won INTEGER NOT NULL DEFAULT 0,
+    total_profit REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    team_name TEXT NOT NULL,
+    start_time,
+    event_name TEXT NOT NULL,
+    competition,
+    odds,
+    stake,
+    status TEXT NOT NULL DEFAULT '',
+    profit,
+    bet_id TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS matches_team_event ON matches (team_name, event_name);
+CREATE INDEX IF NOT EXISTS matches_status ON matches (status, team_name);
+CREATE INDEX IF NOT EXISTS matches_bet_id ON matches (bet_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _blank(value: Any) -> Any:
+    return "" if value is None else value
+
+
+def _number(value: Any, cast: type) -> Any:
+    try:
+        return cast(float(value or 0))
+    except (TypeError, ValueError):
+        return cast(0)
+
+
+def team_row(team: Dict[str, Any]) -> Dict[str, Any]:
+    """Valorile unei echipe pentru tabela teams (numerele normalizate, lipsurile completate)."""
+    now = datetime.utcnow().isoformat()
+    row = {}
+    for column in TEAM_COLUMNS:
+        value = team.get(column)
+        if column in TEAM_NUMERIC_COLUMNS:
+            value = _number(TEAM_DEFAULTS.get(column, 0) if value in (None, "") else value, TEAM_NUMERIC_COLUMNS[column])
+        elif value in (None, ""):
+            value = TEAM_DEFAULTS.get(column, now if column in ("created_at", "updated_at") else "")
+        row[column] = str(value) if column in ("id", "name", "betfair_id") else value
+    return row
+
+
+def match_params(team_name: str, record: Dict[str, Any]) -> List[Any]:
+    """Valorile unui meci (header -> valoare) pentru tabela matches, în ordinea MATCH_COLUMNS."""
+    return [team_name] + [
+        str(_blank(record.get(header))).strip() if header == "Meci" else _blank(record.get(header))
+        for header in MATCH_COLUMNS
+    ]
+
+
+def match_record(row: sqlite3.Row) -> Dict[str, Any]:
+    """Rândul din tabela matches ca înregistrare de sheet (header -> valoare)."""
+    return {header: _blank(row[column]) for header, column in MATCH_COLUMNS.items()}
+
+
+class SQLiteStateStore:
+    """
+    Starea botului (echipe, meciuri programate, pariuri și progresie) în SQLite
+    (data/state.db, mod WAL). Înregistrările folosesc aceleași chei ca sheet-urile
+    (Index și sheet-urile echipelor); citirile sunt interogări locale, iar
+    scrierile sunt durabile înainte de a fi replicate în Google Sheets.
+    O singură conexiune, serializată printr-un lock (e folosită și din thread-uri).
+    """
+
+    def __init__(self, db_file: Optional[Path] = None):
+        self.db_file = db_file or (Path(__file__).parent.parent.parent / "data" / "state.db")
+        self._lock = threading.RLock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.db_file.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.db_file), check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            db = self._connection()
+            with db:
+                yield db
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def is_seeded(self) -> bool:
+        """Verifică dacă starea a fost importată cel puțin o dată."""
+        return bool(self._query("SELECT 1 FROM meta WHERE key = 'imported_at'"))
+
+    def load_teams(self) -> List[Dict[str, Any]]:
+        """Toate echipele, în ordinea adăugării."""
+        return [dict(row) for row in self._query("SELECT * FROM teams ORDER BY rowid")]
+
+    def save_team(self, team: Dict[str, Any]) -> None:
+        """Adaugă sau înlocuiește o echipă (după id)."""
+        row = team_row(team)
+        with self._transaction() as db:
+            # Numele e unic: o echipă cu același nume dar alt id e înlocuită
+            db.execute("DELETE FROM teams WHERE name = ? AND id != ?", (row["name"], row["id"]))
+            db.execute(
+                f"INSERT INTO teams ({', '.join(TEAM_COLUMNS)}) VALUES ({', '.join('?' * len(TEAM_COLUMNS))}) "
+                f"ON CONFLICT (id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in TEAM_COLUMNS[1:])}",
+                [row[c] for c in TEAM_COLUMNS]
+            )
+
+    def delete_team(self, team_id: str) -> Optional[str]:
+        """Șterge echipa și meciurile ei; returnează numele echipei șterse."""
+        with self._transaction() as db:
+            row = db.execute("SELECT name FROM teams WHERE id = ?", (str(team_id),)).fetchone()
+            if row is None:
+                return None
+            db.execute("DELETE FROM teams WHERE id = ?", (str(team_id),))
+            db.execute("DELETE FROM matches WHERE team_name = ?", (row["name"],))
+            return row["name"]
+
+    def update_team(self, team_name: str, values: Dict[str, Any]) -> bool:
+        """Actualizează câmpuri ale unei echipe; False dacă echipa nu există."""
+        columns = [c for c in values if c in TEAM_COLUMNS and c not in ("id", "name")]
+        if not columns:
+            return False
+        params = [
+            _number(values[c], TEAM_NUMERIC_COLUMNS[c]) if c in TEAM_NUMERIC_COLUMNS else values[c]
+            for c in columns
+        ]
+        with self._transaction() as db:
+            cursor = db.execute(
+                f"UPDATE teams SET {', '.join(f'{c} = ?' for c in columns)} WHERE name = ?",
+                params + [team_name]
+            )
+            return cursor.rowcount > 0
+
+    def apply_result(self, team_name: str, won: bool, stake: float, profit: float, updated_at: str) -> Optional[Dict[str, Any]]:
+        """Aplică rezultatul unui pariu peste progresia echipei; returnează valorile noi."""
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM teams WHERE name = ?", (team_name,)).fetchone()
+            if row is None:
+                return None
+
+            record = dict(row)
+            apply_mutation(record, {
+                "kind": PROGRESSION,
+                "values": {"won": won, "stake": stake, "profit": profit, "updated_at": updated_at}
+            })
+            values = {
+                c: record[c]
+                for c in ("cumulative_loss", "last_stake", "progression_step", "updated_at",
+                          "total_matches", "matches_won", "total_profit")
+            }
+            db.execute(
+                f"UPDATE teams SET {', '.join(f'{c} = ?' for c in values)} WHERE name = ?",
+                list(values.values()) + [team_name]
+            )
+            return values
+
+    def team_records(self, team_names: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Meciurile echipelor, ca rândurile sheet-urilor lor."""
+        if team_names is None:
+            team_names = [row["name"] for row in self._query("SELECT name FROM teams ORDER BY rowid")]
+
+        team_records: Dict[str, List[Dict[str, Any]]] = {name: [] for name in dict.fromkeys(team_names)}
+        if not team_records:
+            return team_records
+
+        rows = self._query(
+            f"SELECT * FROM matches WHERE team_name IN ({', '.join('?' * len(team_records))}) ORDER BY id",
+            tuple(team_records)
+        )
+        for row in rows:
+            team_records[row["team_name"]].append(match_record(row))
+        return team_records
+
+    def matches_with_status(self, status: str, team_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Meciurile cu statusul dat (cu team_name inclus)."""
+        if team_name:
+            rows = self._query("SELECT * FROM matches WHERE status = ? AND team_name = ? ORDER BY id", (status, team_name))
+        else:
+            rows = self._query("SELECT * FROM matches WHERE status = ? ORDER BY id", (status,))
+        return [dict(match_record(row), team_name=row["team_name"]) for row in rows]
+
+    def add_matches(self, team_name: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Adaugă meciurile care nu există deja; returnează meciurile adăugate."""
+        columns = ["team_name"] + list(MATCH_COLUMNS.values())
+        added = []
+        with self._transaction() as db:
+            for record in records:
+                cursor = db.execute(
+                    f"INSERT OR IGNORE INTO matches ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    match_params(team_name, record)
+                )
+                if cursor.rowcount:
+                    added.append(record)
+        return added
+
+    def update_match(self, team_name: str, key: Tuple[str, Any], values: Dict[str, Any]) -> bool:
+        """Actualizează meciul identificat prin (coloană, valoare); False dacă nu există."""
+        key_column = MATCH_COLUMNS[key[0]]
+        columns = [(MATCH_COLUMNS[header], value) for header, value in values.items() if header in MATCH_COLUMNS]
+        if not columns:
+            return False
+        with self._transaction() as db:
+            cursor = db.execute(
+                f"UPDATE matches SET {', '.join(f'{c} = ?' for c, _ in columns)} "
+                f"WHERE id = (SELECT id FROM matches WHERE team_name = ? AND {key_column} = ? ORDER BY id LIMIT 1)",
+                [_blank(v) for _, v in columns] + [team_name, str(key[1]).strip()]
+            )
+            return cursor.rowcount > 0
+
+    def import_snapshot(
+        self,
+        teams: Optional[List[Dict[str, Any]]],
+        team_records: Dict[str, List[Dict[str, Any]]]
+    ) -> None:
+        """Înlocuiește echipele (dacă teams nu e None) și meciurile echipelor date cu cele importate."""
+        columns = ["team_name"] + list(MATCH_COLUMNS.values())
+        with self._transaction() as db:
+            if teams is not None:
+                db.execute("DELETE FROM teams")
+                rows = [team_row(team) for team in teams]
+                db.executemany(
+                    f"INSERT OR REPLACE INTO teams ({', '.join(TEAM_COLUMNS)}) VALUES ({', '.join('?' * len(TEAM_COLUMNS))})",
+                    [[row[c] for c in TEAM_COLUMNS] for row in rows]
+                )
+                # Meciurile echipelor care nu mai există în Index
+                db.execute("DELETE FROM matches WHERE team_name NOT IN (SELECT name FROM teams)")
+
+            for team_name, records in team_records.items():
+                db.execute("DELETE FROM matches WHERE team_name = ?", (team_name,))
+                # La meciuri duplicate (editate manual) rămâne primul rând, ca la căutarea în sheet
+                db.executemany(
+                    f"INSERT OR IGNORE INTO matches ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [
+                        match_params(team_name, record)
+                        for record in records
+                        if str(record.get("Meci", "")).strip()
+                    ]
+                )
+
+            db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_at', ?)",
+                (datetime.utcnow().isoformat(),)
+            )
+
+
+state_store = SQLiteStateStore()
@@ -0,0 +1,74 @@
+from typing import Union
+
+import numpy as np
+
+# Incrementele ladder-ului de cote Betfair: (de la, până la, pas)
+TICK_BANDS = [
+    (1.01, 2.0, 0.01),
+    (2.0, 3.0, 0.02),
+    (3.0, 4.0, 0.05),
+    (4.0, 6.0, 0.1),
+    (6.0, 10.0, 0.2),
+    (10.0, 20.0, 0.5),
+    (20.0, 30.0, 1.0),
+    (30.0, 50.0, 2.0),
+    (50.0, 100.0, 5.0),
+    (100.0, 1000.0, 10.0)
+]
+
+
+def _build_ladder() -> np.ndarray:
+    # Calcul în sutimi (întregi), ca să nu apară erori de rotunjire float
+    ticks = []
+    for low, high, step in TICK_BANDS:
+        ticks.extend(range(round(low * 100), round(high * 100), round(step * 100)))
+    ticks.append(round(TICK_BANDS[-1][1] * 100))
+    return np.array(ticks, dtype=np.int64) / 100.0
+
+
+# Toate cotele valide, crescător (1.01 ... 1000)
+TICKS = _build_ladder()
+MIN_PRICE = float(TICKS[0])
+MAX_PRICE = float(TICKS[-1])
+
+# Toleranță pentru cote citite ca text (ex: "2.1" -> 2.0999999)
+_EPSILON = 1e-9
+
+ArrayLike = Union[float, np.ndarray, list]
+
+
+def snap_prices(prices: ArrayLike, side: str = "BACK") -> np.ndarray:
+    """
+    Aduce cotele pe ladder-ul Betfair (vectorizat).
+    BACK rotunjește în jos, LAY în sus, astfel încât ordinul nu cere o cotă
+    mai bună decât cea cotată. Cotele din afara ladder-ului sunt limitate la
+    [1.01, 1000].
+
+    Args:
+        prices: Cote (scalar sau array)
+        side: BACK sau LAY
+
+    Returns:
+        Array cu cotele valide
+    """
+    values = np.clip(np.asarray(prices, dtype=float), MIN_PRICE, MAX_PRICE)
+    if side == "LAY":
+        index = np.searchsorted(TICKS, values - _EPSILON, side="left")
+    else:
+        index = np.searchsorted(TICKS, values + _EPSILON, side="right") - 1
+    return TICKS[np.clip(index, 0, len(TICKS) - 1)]
+
+
+def snap_price(price: float, side: str = "BACK") -> float:
+    """Cota validă cea mai apropiată de price (vezi snap_prices)."""
+    return float(snap_prices(price, side))
+
+
+def is_valid_price(price: float) -> bool:
+    """Verifică dacă price e exact pe ladder."""
+    return MIN_PRICE <= price <= MAX_PRICE and abs(snap_price(price) - price) < _EPSILON
+
+
+def format_price(price: float) -> str:
+    """Cota ca text pentru placeOrders (ex: 2.5, 1.01, 110)."""
+    return f"{price:.2f}".rstrip("0").rstrip(".")
@@ -0,0 +1,295 @@
+"""
+Server local care imită Betfair Exchange Stream API (doar subscripții la piețe).
+Folosit pentru teste și benchmark-uri fără credențiale Betfair.
+
+Rulare server:   python -m app.testing.fake_stream_server --port 9443
+Benchmark:       python -m app.testing.fake_stream_server --bench 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class FakeStreamServer:
+    """
+    Server TCP (fără SSL) care vorbește protocolul Exchange Stream:
+    mesaj `connection` la conectare, `status` la authentication/subscription,
+    imagine completă (`SUB_IMAGE`) sau `RESUB_DELTA` când clientul trimite clk,
+    apoi delta-uri periodice de preț și heartbeat-uri.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tick_interval: float = 0.2,
+        runners_per_market: int = 3,
+        seed: Optional[int] = None
+    ):
+        self.host = host
+        self.port = port
+        self.tick_interval = tick_interval
+        self.runners_per_market = runners_per_market
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Set["_ClientSession"] = set()
+        self._markets: Dict[str, Dict[int, Dict[str, List[float]]]] = {}
+        self._clk = 0
+        self._ticker: Optional[asyncio.Task] = None
+        self.deltas_sent = 0
+
+    async def start(self) -> int:
+        """Pornește serverul și returnează portul efectiv."""
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.get_running_loop().create_task(self._tick_loop())
+        logger.info(f"Fake stream server pe {self.host}:{self.port}")
+        return self.port
+
+    async def stop(self) -> None:
+        """Oprește serverul și închide conexiunile."""
+        if self._ticker:
+            self._ticker.cancel()
+        for client in list(self._clients):
+            client.writer.close()
+            if client.task:
+                client.task.cancel()
+        tasks = [c.task for c in self._clients if c.task]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def add_market(self, market_id: str, prices: Optional[Dict[int, float]] = None) -> None:
+        """
+        Adaugă o piață cu prețuri BACK inițiale per selecție.
+
+        Args:
+            market_id: ID-ul pieței
+            prices: selectionId -> cotă BACK (generate aleator dacă lipsesc)
+        """
+        if prices is None:
+            base = 1000 + len(self._markets) * 10
+            prices = {base + i: round(self._random.uniform(1.5, 6.0), 2)
+                      for i in range(self.runners_per_market)}
+        self._markets[market_id] = {
+            selection_id: {"back": [price, 100.0], "lay": [round(price + 0.02, 2), 100.0]}
+            for selection_id, price in prices.items()
+        }
+
+    def set_price(self, market_id: str, selection_id: int, back: float, size: float = 100.0) -> None:
+        """Setează cota BACK pentru o selecție și trimite delta-ul către clienții subscriși."""
+        if market_id not in self._markets:
+            self.add_market(market_id, {selection_id: back})
+        runner = self._markets[market_id].setdefault(selection_id, {"back": [back, size], "lay": [back, size]})
+        runner["back"] = [back, size]
+        runner["lay"] = [round(back + 0.02, 2), size]
+        self._broadcast_delta({market_id: [selection_id]})
+
+    def _next_clk(self) -> str:
+        self._clk += 1
+        return str(self._clk)
+
+    def _market_change(self, market_id: str, selection_ids: Optional[List[int]] = None, img: bool = False) -> Dict[str, Any]:
+        runners = self._markets[market_id]
+        rc = []
+        for selection_id in (selection_ids or list(runners.keys())):
+            runner = runners[selection_id]
+            rc.append({
+                "id": selection_id,
+                "bdatb": [[0, runner["back"][0], runner["back"][1]]],
+                "bdatl": [[0, runner["lay"][0], runner["lay"][1]]],
+                "ltp": runner["back"][0]
+            })
+        mc: Dict[str, Any] = {"id": market_id, "rc": rc}
+        if img:
+            mc["img"] = True
+            mc["marketDefinition"] = {
+                "status": "OPEN",
+                "inPlay": False,
+                "runners": [{"id": sid, "status": "ACTIVE"} for sid in runners]
+            }
+        return mc
+
+    def _broadcast_delta(self, changes: Dict[str, List[int]]) -> None:
+        for client in list(self._clients):
+            mc = [
+                self._market_change(market_id, selection_ids)
+                for market_id, selection_ids in changes.items()
+                if market_id in client.market_ids
+            ]
+            if mc:
+                client.send({"op": "mcm", "id": client.subscription_id, "clk": self._next_clk(),
+                             "pt": int(time.time() * 1000), "mc": mc})
+                self.deltas_sent += 1
+
+    async def _tick_loop(self) -> None:
+        """Mișcări aleatoare de preț pe piețele subscrise + heartbeat-uri."""
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            subscribed = set()
+            for client in self._clients:
+                subscribed.update(client.market_ids)
+
+            changes: Dict[str, List[int]] = {}
+            for market_id in subscribed:
+                if market_id not in self._markets or self._random.random() > 0.5:
+                    continue
+                selection_id = self._random.choice(list(self._markets[market_id].keys()))
+                runner = self._markets[market_id][selection_id]
+                new_price = max(1.01, round(runner["back"][0] + self._random.choice([-0.02, 0.02]), 2))
+                runner["back"] = [new_price, round(self._random.uniform(10, 500), 2)]
+                runner["lay"] = [round(new_price + 0.02, 2), round(self._random.uniform(10, 500), 2)]
+                changes.setdefault(market_id, []).append(selection_id)
+
+            if changes:
+                self._broadcast_delta(changes)
+
+            now = time.time()
+            for client in list(self._clients):
+                if client.market_ids and now - client.last_sent > client.heartbeat_ms / 1000.0:
+                    client.send({"op": "mcm", "id": client.subscription_id, "ct": "HEARTBEAT",
+                                 "clk": self._next_clk(), "pt": int(now * 1000)})
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = _ClientSession(writer)
+        client.task = asyncio.current_task()
+        self._clients.add(client)
+        client.send({"op": "connection", "connectionId": f"fake-{id(client)}"})
+
+        try:
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                request = json.loads(line)
+                op = request.get("op")
+
+                if op == "authentication":
+                    if not request.get("session"):
+                        client.send({"op": "status", "id": request.get("id"), "statusCode": "FAILURE",
+                                     "errorCode": "NO_SESSION", "connectionClosed": True})
+                        break
+                    client.send({"op": "status", "id": request.get("id"), "statusCode": "SUCCESS",
+                                 "connectionClosed": False})
+
+                elif op == "marketSubscription":
+                    self._subscribe(client, request)
+
+                elif op == "heartbeat":
+                    client.send({"op": "status", "id": request.get("id"), "statusCode": "SUCCESS"})
+
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+    def _subscribe(self, client: "_ClientSession", request: Dict[str, Any]) -> None:
+        market_ids = request.get("marketFilter", {}).get("marketIds", [])
+        for market_id in market_ids:
+            if market_id not in self._markets:
+                self.add_market(market_id)
+
+        client.market_ids = set(market_ids)
+        client.subscription_id = request.get("id")
+        client.heartbeat_ms = request.get("heartbeatMs", 5000)
+
+        client.send({"op": "status", "id": request.get("id"), "statusCode": "SUCCESS"})
+
+        clk = self._next_clk()
+        if request.get("clk"):
+            # Clientul reia subscripția: trimitem starea curentă ca delta
+            client.send({"op": "mcm", "id": client.subscription_id, "ct": "RESUB_DELTA",
+                         "initialClk": request.get("initialClk"), "clk": clk, "pt": int(time.time() * 1000),
+                         "mc": [self._market_change(m) for m in market_ids]})
+        else:
+            client.send({"op": "mcm", "id": client.subscription_id, "ct": "SUB_IMAGE",
+                         "initialClk": f"init-{clk}", "clk": clk, "pt": int(time.time() * 1000),
+                         "mc": [self._market_change(m, img=True) for m in market_ids]})
+
+
+class _ClientSession:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.market_ids: Set[str] = set()
+        self.subscription_id: Optional[int] = None
+        self.heartbeat_ms = 5000
+        self.last_sent = 0.0
+        self.task: Optional[asyncio.Task] = None
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.writer.write(json.dumps(message).encode("utf-8") + b"\r\n")
+        self.last_sent = time.time()
+
+
+async def run_benchmark(num_markets: int, duration: float = 5.0) -> Dict[str, Any]:
+    """
+    Măsoară timpul până la imaginea completă și rata de update-uri primite
+    de MarketStreamClient de la serverul local.
+    """
+    from app.services.betfair_stream import MarketStreamClient
+
+    server = FakeStreamServer(tick_interval=0.05, seed=1)
+    port = await server.start()
+
+    client = MarketStreamClient(host="127.0.0.1", port=port, use_ssl=False, heartbeat_ms=1000,
+                                resubscribe_delay=0.0)
+    client.set_credentials("bench-app-key", lambda: "bench-session")
+
+    market_ids = [f"1.{100000 + i}" for i in range(num_markets)]
+    started = time.perf_counter()
+    await client.subscribe(market_ids)
+
+    while len(client.cache.market_ids()) < num_markets:
+        await asyncio.sleep(0.001)
+    image_time = time.perf_counter() - started
+
+    messages_before = client.messages_received
+    await asyncio.sleep(duration)
+    messages = client.messages_received - messages_before
+
+    lookup_started = time.perf_counter()
+    for market_id in market_ids:
+        client.get_market_book(market_id)
+    lookup_time = time.perf_counter() - lookup_started
+
+    await client.stop()
+    await server.stop()
+
+    return {
+        "markets": num_markets,
+        "image_ms": round(image_time * 1000, 2),
+        "messages_per_sec": round(messages / duration, 1),
+        "lookup_us_per_market": round(lookup_time / num_markets * 1e6, 2)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Betfair Exchange Stream server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--tick", type=float, default=0.2, help="Interval între delta-uri (secunde)")
+    parser.add_argument("--bench", type=int, default=0, help="Rulează benchmark cu N piețe și iese")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.bench:
+        print(asyncio.run(run_benchmark(args.bench)))
+        return
+
+    async def serve() -> None:
+        server = FakeStreamServer(host=args.host, port=args.port, tick_interval=args.tick)
+        await server.start()
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,591 @@
+"""
+Server HTTP local care imită endpoint-urile Betfair identity (certlogin, keepAlive)
+și betting REST (listEvents, listMarketCatalogue, listMarketBook, placeOrders,
+listCurrentOrders, listClearedOrders, getAccountFunds).
+
+Răspunsurile vin din înregistrări (directorul creat cu BETFAIR_RECORD_DIR) sau
+dintr-o lume sintetică de competiții / echipe / meciuri. Latența și erorile
+APING pot fi injectate.
+
+Rulare server:   python -m app.testing.fixture_server --port 8790 --latency-ms 40
+Replay:          python -m app.testing.fixture_server --fixtures ./recordings
+Benchmark:       python -m app.testing.fixture_server --bench 100
+
+Clientul se îndreaptă spre server prin:
+    BETFAIR_API_URL=http://127.0.0.1:8790/exchange/betting/rest/v1.0
+    BETFAIR_IDENTITY_URL=http://127.0.0.1:8790/api/certlogin
+    BETFAIR_KEEP_ALIVE_URL=http://127.0.0.1:8790/api/keepAlive
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Câmpuri dependente de momentul request-ului, ignorate la potrivirea înregistrărilor
+VOLATILE_PARAMS = {"marketStartTime", "settledDateRange", "dateRange"}
+
+DRAW_SELECTION_ID = 58805
+
+
+def canonical_params(params: Any) -> str:
+    """Cheia de potrivire a unui request: parametrii fără intervalele de timp."""
+    def strip(value: Any) -> Any:
+        if isinstance(value, dict):
+            return {k: strip(v) for k, v in value.items() if k not in VOLATILE_PARAMS}
+        if isinstance(value, list):
+            return [strip(v) for v in value]
+        return value
+
+    return json.dumps(strip(params), sort_keys=True)
+
+
+class ApiRecorder:
+    """
+    Salvează fiecare request API-NG și răspunsul lui în
+    <directory>/<endpoint>/<nr>.json, pentru replay cu FixtureServer.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._counter = 0
+
+    def record(self, endpoint: str, params: Dict[str, Any], status_code: int, response: Any) -> None:
+        self._counter += 1
+        endpoint_dir = self.directory / endpoint
+        endpoint_dir.mkdir(exist_ok=True)
+        path = endpoint_dir / f"{int(time.time() * 1000)}-{self._counter:06d}.json"
+        try:
+            with open(path, "w") as f:
+                json.dump({
+                    "endpoint": endpoint,
+                    "params": params,
+                    "status_code": status_code,
+                    "response": response,
+                    "recorded_at": datetime.utcnow().isoformat()
+                }, f, indent=2)
+        except Exception as e:
+            logger.error(f"Eroare la înregistrarea {endpoint}: {e}")
+
+
+class FixtureServer:
+    """
+    Starea serverului: înregistrări pentru replay, lumea sintetică, ordinele
+    plasate, configurația de latență / erori și statisticile de apeluri.
+    """
+
+    def __init__(
+        self,
+        num_teams: int = 40,
+        teams_per_competition: int = 20,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_code: str = "TOO_MANY_REQUESTS",
+        fixtures_dir: Optional[str] = None,
+        settle_after: float = 0.0,
+        seed: int = 1
+    ):
+        """
+        Args:
+            num_teams: Numărul de echipe din lumea sintetică
+            teams_per_competition: Echipe per competiție
+            latency_ms: Latența adăugată fiecărui request
+            latency_jitter_ms: Variație aleatoare peste latență
+            error_rate: Probabilitatea unei erori APING injectate (0-1)
+            error_code: errorCode-ul erorilor injectate
+            fixtures_dir: Director cu înregistrări (ApiRecorder) pentru replay
+            settle_after: Secunde după care un pariu plasat devine settled
+            seed: Seed pentru datele sintetice
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.endpoint_errors: Dict[str, str] = {}
+        self.settle_after = settle_after
+        self._random = random.Random(seed)
+
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.injected_errors: Dict[str, int] = defaultdict(int)
+
+        self._recordings: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self._latest_recording: Dict[str, Any] = {}
+        if fixtures_dir:
+            self._load_recordings(Path(fixtures_dir))
+
+        self._orders: List[Dict[str, Any]] = []
+        self._next_bet_id = 300000000000
+        self._build_world(num_teams, teams_per_competition)
+
+    # ------------------------------------------------------------------
+    # Date
+    # ------------------------------------------------------------------
+
+    def _load_recordings(self, directory: Path) -> None:
+        count = 0
+        for path in sorted(directory.glob("*/*.json")):
+            try:
+                with open(path, "r") as f:
+                    record = json.load(f)
+            except Exception as e:
+                logger.warning(f"Înregistrare invalidă {path}: {e}")
+                continue
+            endpoint = record.get("endpoint") or path.parent.name
+            self._recordings[endpoint][canonical_params(record.get("params", {}))] = record
+            self._latest_recording[endpoint] = record
+            count += 1
+        logger.info(f"Încărcate {count} înregistrări din {directory}")
+
+    def _build_world(self, num_teams: int, teams_per_competition: int) -> None:
+        """Competiții, echipe și 3 etape de meciuri în următoarele 7 zile."""
+        self.teams = [
+            {
+                "name": f"Fixture Team {i + 1:03d}",
+                "selection_id": 100000 + i,
+                "competition_id": str(1000 + i // teams_per_competition)
+            }
+            for i in range(num_teams)
+        ]
+
+        by_competition: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for team in self.teams:
+            by_competition[team["competition_id"]].append(team)
+
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self.markets: Dict[str, Dict[str, Any]] = {}
+        self.prices: Dict[str, Dict[int, float]] = {}
+        event_id = 32000000
+
+        for competition_id, teams in by_competition.items():
+            for round_number in range(3):
+                rotated = teams[round_number:] + teams[:round_number]
+                for home, away in zip(rotated[0::2], rotated[1::2]):
+                    event_id += 1
+                    open_date = now + timedelta(days=1 + round_number * 2, hours=self._random.randint(0, 8))
+                    event = {
+                        "id": str(event_id),
+                        "name": f"{home['name']} v {away['name']}",
+                        "countryCode": "RO",
+                        "timezone": "GMT",
+                        "openDate": open_date.isoformat() + ".000Z"
+                    }
+                    market_id = f"1.{200000000 + event_id}"
+                    self.events[event["id"]] = {"event": event, "competition_id": competition_id}
+                    self.markets[market_id] = {
+                        "marketId": market_id,
+                        "marketName": "Match Odds",
+                        "marketStartTime": event["openDate"],
+                        "totalMatched": round(self._random.uniform(1000, 50000), 2),
+                        "competition": {"id": competition_id, "name": f"Fixture League {competition_id}"},
+                        "event": event,
+                        "eventType": {"id": "1", "name": "Soccer"},
+                        "runners": [
+                            {"selectionId": home["selection_id"], "runnerName": home["name"], "handicap": 0, "sortPriority": 1},
+                            {"selectionId": away["selection_id"], "runnerName": away["name"], "handicap": 0, "sortPriority": 2},
+                            {"selectionId": DRAW_SELECTION_ID, "runnerName": "The Draw", "handicap": 0, "sortPriority": 3}
+                        ]
+                    }
+                    self.prices[market_id] = {
+                        home["selection_id"]: round(self._random.uniform(1.5, 5.0), 2),
+                        away["selection_id"]: round(self._random.uniform(1.5, 5.0), 2),
+                        DRAW_SELECTION_ID: round(self._random.uniform(3.0, 4.5), 2)
+                    }
+
+    def team_names(self) -> List[str]:
+        return [team["name"] for team in self.teams]
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Actualizează latența / erorile (folosit de endpoint-ul /_fixture/config)."""
+        for key in ("latency_ms", "latency_jitter_ms", "error_rate", "error_code", "settle_after"):
+            if key in config:
+                setattr(self, key, config[key])
+        if "endpoint_errors" in config:
+            self.endpoint_errors = dict(config["endpoint_errors"] or {})
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.injected_errors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "total_calls": sum(self.calls.values()),
+            "injected_errors": dict(self.injected_errors),
+            "orders": len(self._orders)
+        }
+
+    async def delay(self) -> None:
+        latency = self.latency_ms + self._random.uniform(0, self.latency_jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000.0)
+
+    def injected_error(self, endpoint: str) -> Optional[str]:
+        if endpoint in self.endpoint_errors:
+            return self.endpoint_errors[endpoint]
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            return self.error_code
+        return None
+
+    # ------------------------------------------------------------------
+    # Endpoint-uri betting
+    # ------------------------------------------------------------------
+
+    def handle(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        """Răspunsul pentru un endpoint: înregistrare potrivită sau date sintetice."""
+        if endpoint in self._recordings:
+            recorded = self._recordings[endpoint].get(canonical_params(params), self._latest_recording[endpoint])
+            return recorded.get("response")
+
+        handler = getattr(self, f"_{endpoint}", None)
+        if handler is None:
+            return None
+        return handler(params)
+
+    def _listEvents(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        market_filter = params.get("filter", {})
+        query = (market_filter.get("textQuery") or "").lower()
+        competitions = set(market_filter.get("competitionIds") or [])
+        results = []
+        for entry in self.events.values():
+            if query and query not in entry["event"]["name"].lower():
+                continue
+            if competitions and entry["competition_id"] not in competitions:
+                continue
+            results.append({"event": entry["event"], "marketCount": 1})
+        return results
+
+    def _listCompetitions(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        competitions = sorted({entry["competition_id"] for entry in self.events.values()})
+        return [
+            {"competition": {"id": c, "name": f"Fixture League {c}"}, "marketCount": 1, "competitionRegion": "ROU"}
+            for c in competitions
+        ]
+
+    def _listMarketCatalogue(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        event_ids = set(params.get("filter", {}).get("eventIds") or [])
+        max_results = int(params.get("maxResults", 1000))
+        results = [m for m in self.markets.values() if not event_ids or m["event"]["id"] in event_ids]
+        return results[:max_results]
+
+    def _listMarketBook(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        books = []
+        for market_id in params.get("marketIds", []):
+            prices = self.prices.get(market_id)
+            if prices is None:
+                continue
+            runners = []
+            for selection_id, price in prices.items():
+                # Mișcare mică de preț la fiecare citire
+                price = max(1.01, round(price + self._random.choice([-0.02, 0, 0.02]), 2))
+                prices[selection_id] = price
+                runners.append({
+                    "selectionId": selection_id,
+                    "handicap": 0,
+                    "status": "ACTIVE",
+                    "lastPriceTraded": price,
+                    "ex": {
+                        "availableToBack": [{"price": price, "size": round(self._random.uniform(10, 500), 2)}],
+                        "availableToLay": [{"price": round(price + 0.02, 2), "size": round(self._random.uniform(10, 500), 2)}],
+                        "tradedVolume": []
+                    }
+                })
+            books.append({
+                "marketId": market_id,
+                "isMarketDataDelayed": False,
+                "status": "OPEN",
+                "inplay": False,
+                "totalMatched": self.markets[market_id]["totalMatched"],
+                "runners": runners
+            })
+        return books
+
+    def _placeOrders(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        market_id = params.get("marketId")
+        reports = []
+        for instruction in params.get("instructions", []):
+            self._next_bet_id += 1
+            limit_order = instruction.get("limitOrder", {})
+            order = {
+                "betId": str(self._next_bet_id),
+                "marketId": market_id,
+                "selectionId": int(instruction.get("selectionId")),
+                "side": instruction.get("side", "BACK"),
+                "price": float(limit_order.get("price", 0)),
+                "size": float(limit_order.get("size", 0)),
+                "placedDate": datetime.utcnow().isoformat() + "Z",
+                "placed_at": time.time(),
+                "won": self._random.random() < 0.5
+            }
+            self._orders.append(order)
+            reports.append({
+                "status": "SUCCESS",
+                "orderStatus": "EXECUTION_COMPLETE",
+                "betId": order["betId"],
+                "placedDate": order["placedDate"],
+                "averagePriceMatched": order["price"],
+                "sizeMatched": order["size"],
+                "instruction": instruction
+            })
+        return {"status": "SUCCESS", "marketId": market_id, "instructionReports": reports}
+
+    def _is_settled(self, order: Dict[str, Any]) -> bool:
+        return time.time() - order["placed_at"] >= self.settle_after
+
+    @staticmethod
+    def _page(items: List[Dict[str, Any]], params: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], bool]:
+        from_record = int(params.get("fromRecord", 0))
+        record_count = int(params.get("recordCount", 1000)) or 1000
+        page = items[from_record:from_record + record_count]
+        return page, from_record + record_count < len(items)
+
+    def _listCurrentOrders(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        bet_ids = set(params.get("betIds") or [])
+        orders = [
+            {
+                "betId": o["betId"],
+                "marketId": o["marketId"],
+                "selectionId": o["selectionId"],
+                "side": o["side"],
+                "priceSize": {"price": o["price"], "size": o["size"]},
+                "status": "EXECUTION_COMPLETE",
+                "placedDate": o["placedDate"],
+                "sizeMatched": o["size"]
+            }
+            for o in self._orders
+            if not self._is_settled(o) and (not bet_ids or o["betId"] in bet_ids)
+        ]
+        page, more = self._page(orders, params)
+        return {"currentOrders": page, "moreAvailable": more}
+
+    def _listClearedOrders(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if params.get("betStatus", "SETTLED") != "SETTLED":
+            return {"clearedOrders": [], "moreAvailable": False}
+
+        bet_ids = set(params.get("betIds") or [])
+        orders = []
+        for o in self._orders:
+            if not self._is_settled(o) or (bet_ids and o["betId"] not in bet_ids):
+                continue
+            profit = round(o["size"] * (o["price"] - 1), 2) if o["won"] else -o["size"]
+            orders.append({
+                "eventTypeId": "1",
+                "marketId": o["marketId"],
+                "selectionId": o["selectionId"],
+                "betId": o["betId"],
+                "placedDate": o["placedDate"],
+                "side": o["side"],
+                "betOutcome": "WON" if o["won"] else "LOST",
+                "priceMatched": o["price"],
+                "settledDate": datetime.utcfromtimestamp(o["placed_at"] + self.settle_after).isoformat() + "Z",
+                "sizeSettled": o["size"],
+                "profit": profit
+            })
+        page, more = self._page(orders, params)
+        return {"clearedOrders": page, "moreAvailable": more}
+
+    def _getAccountFunds(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        exposure = sum(o["size"] for o in self._orders if not self._is_settled(o))
+        return {"availableToBetBalance": round(10000 - exposure, 2), "exposure": -exposure, "wallet": "UK"}
+
+
+def create_app(server: FixtureServer) -> FastAPI:
+    """Aplicația FastAPI care expune serverul de fixture-uri."""
+    app = FastAPI(title="Betfair fixture server")
+
+    def aping_error(code: str) -> JSONResponse:
+        return JSONResponse(status_code=400, content={
+            "faultcode": "Client",
+            "faultstring": "ANGX-0001",
+            "detail": {"APINGException": {"errorCode": code, "errorDetails": "injected by fixture server"}}
+        })
+
+    @app.post("/api/certlogin")
+    async def certlogin():
+        server.calls["certlogin"] += 1
+        await server.delay()
+        return {"sessionToken": f"fixture-session-{int(time.time())}", "loginStatus": "SUCCESS"}
+
+    @app.post("/api/keepAlive")
+    async def keep_alive(request: Request):
+        server.calls["keepAlive"] += 1
+        await server.delay()
+        return {"token": request.headers.get("X-Authentication", ""), "product": "fixture", "status": "SUCCESS", "error": ""}
+
+    @app.post("/exchange/betting/rest/v1.0/{endpoint}/")
+    async def betting(endpoint: str, request: Request):
+        server.calls[endpoint] += 1
+        await server.delay()
+
+        if not request.headers.get("X-Authentication"):
+            return aping_error("NO_SESSION")
+
+        error_code = server.injected_error(endpoint)
+        if error_code:
+            server.injected_errors[endpoint] += 1
+            return aping_error(error_code)
+
+        try:
+            params = await request.json()
+        except Exception:
+            params = {}
+
+        response = server.handle(endpoint, params)
+        if response is None:
+            return aping_error("INVALID_INPUT_DATA")
+        return response
+
+    @app.get("/_fixture/stats")
+    async def stats():
+        return server.stats()
+
+    @app.post("/_fixture/config")
+    async def config(request: Request):
+        server.configure(await request.json())
+        return {"success": True}
+
+    @app.post("/_fixture/reset")
+    async def reset():
+        server.reset_stats()
+        return {"success": True}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_background(server: FixtureServer, port: int = 0):
+    """
+    Pornește serverul uvicorn în același event loop.
+
+    Returns:
+        (uvicorn.Server, task-ul care rulează serverul, base_url)
+    """
+    import uvicorn
+
+    port = port or _free_port()
+    uv_server = uvicorn.Server(uvicorn.Config(create_app(server), host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.get_running_loop().create_task(uv_server.serve())
+    while not uv_server.started:
+        await asyncio.sleep(0.01)
+    return uv_server, task, f"http://127.0.0.1:{port}"
+
+
+async def run_benchmark(num_teams: int, latency_ms: float = 40.0, error_rate: float = 0.0) -> Dict[str, Any]:
+    """
+    Rulează fluxul de actualizare a meciurilor + plasare grupată contra
+    serverului local și raportează durata și numărul de apeluri per endpoint.
+    """
+    from app.models.schemas import PlaceOrderRequest
+    from app.services.betfair_client import BetfairClient
+    from app.services.event_index import EventIndex
+
+    server = FixtureServer(num_teams=num_teams, latency_ms=latency_ms, latency_jitter_ms=latency_ms / 2,
+                           error_rate=error_rate)
+    uv_server, serve_task, base_url = await start_background(server)
+
+    client = BetfairClient()
+    client.configure("fixture-app-key", "fixture", "fixture")
+    # Competițiile învățate nu trebuie să ajungă în data/team_competitions.json
+    storage_dir = tempfile.TemporaryDirectory()
+    client.event_index = EventIndex(storage_file=Path(storage_dir.name) / "team_competitions.json")
+    client.configure_endpoints(
+        api_url=f"{base_url}/exchange/betting/rest/v1.0",
+        identity_url=f"{base_url}/api/certlogin",
+        keep_alive_url=f"{base_url}/api/keepAlive"
+    )
+    await client.connect()
+
+    async def refresh_team(team_name: str) -> Optional[PlaceOrderRequest]:
+        events = await client.find_team_events(team_name)
+        markets = await client.list_market_catalogue([e["event"]["id"] for e in events])
+        books = await client.list_market_book([m["marketId"] for m in markets])
+        for market in markets:
+            runner = next((r for r in market["runners"] if r["runnerName"] == team_name), None)
+            book = next((b for b in books if b["marketId"] == market["marketId"]), None)
+            if runner and book:
+                prices = {r["selectionId"]: r["ex"]["availableToBack"][0]["price"] for r in book["runners"]}
+                return PlaceOrderRequest(market_id=market["marketId"], selection_id=str(runner["selectionId"]),
+                                         size=5.0, price=prices[runner["selectionId"]])
+        return None
+
+    report: Dict[str, Any] = {"teams": num_teams, "latency_ms": latency_ms}
+    teams = [(name, None) for name in server.team_names()]
+
+    for label in ("cold", "warm"):
+        server.reset_stats()
+        started = time.perf_counter()
+        await client.discover_events(teams)
+        orders = [o for o in await asyncio.gather(*(refresh_team(name) for name, _ in teams)) if o]
+        placed = await client.place_bets(orders)
+        report[label] = {
+            "seconds": round(time.perf_counter() - started, 3),
+            "bets_placed": sum(1 for p in placed if p.success),
+            **server.stats()
+        }
+
+    await client.close()
+    storage_dir.cleanup()
+    uv_server.should_exit = True
+    await serve_task
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Betfair API fixture server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--teams", type=int, default=40, help="Echipe în lumea sintetică")
+    parser.add_argument("--fixtures", default=None, help="Director cu înregistrări pentru replay")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-code", default="TOO_MANY_REQUESTS")
+    parser.add_argument("--settle-after", type=float, default=0.0, help="Secunde până la settlement")
+    parser.add_argument("--bench", type=int, default=0, help="Rulează benchmark cu N echipe și iese")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    if args.bench:
+        print(json.dumps(asyncio.run(run_benchmark(args.bench, args.latency_ms or 40.0, args.error_rate)), indent=2))
+        return
+
+    import uvicorn
+
+    server = FixtureServer(
+        num_teams=args.teams,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_code=args.error_code,
+        fixtures_dir=args.fixtures,
+        settle_after=args.settle_after
+    )
+    uvicorn.run(create_app(server), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()